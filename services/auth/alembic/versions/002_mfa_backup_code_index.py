@@ -0,0 +1,43 @@
+"""Keyed lookup index for MFA backup codes
+
+Revision ID: 002_mfa_backup_code_index
+Revises: 001_complete_auth
+Create Date: 2026-10-17 09:00:00.000000
+
+Backup codes are now stored as {HMAC index: bcrypt hash}, so verification
+costs one bcrypt check instead of one per remaining code. Existing codes
+cannot be re-indexed (only their hashes are stored): they stay in
+users.mfa_backup_codes and keep verifying on the legacy path until the user
+regenerates them (POST /api/v1/auth/mfa/backup-codes).
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "002_mfa_backup_code_index"
+down_revision: Union[str, Sequence[str], None] = "001_complete_auth"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add indexed backup code storage."""
+    op.add_column("users", sa.Column("mfa_backup_code_index", postgresql.JSONB()))
+
+
+def downgrade() -> None:
+    """Move indexed codes back to the legacy list (hashes stay valid) and drop the column."""
+    op.execute(
+        """
+        UPDATE users
+        SET mfa_backup_codes = (
+            SELECT jsonb_agg(value) FROM jsonb_each(mfa_backup_code_index)
+        )
+        WHERE mfa_backup_code_index IS NOT NULL
+        """
+    )
+    op.drop_column("users", "mfa_backup_code_index")
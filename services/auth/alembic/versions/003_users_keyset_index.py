@@ -0,0 +1,33 @@
+"""Keyset pagination index for admin user listing
+
+Revision ID: 003_users_keyset_index
+Revises: 002_mfa_backup_code_index
+Create Date: 2026-10-17 12:00:00.000000
+
+The admin user list pages by (created_at, id) descending with a row-value
+comparison instead of OFFSET. A composite index lets PostgreSQL seek
+straight to the cursor; it also serves every query the single-column
+created_at index did, so that index is dropped.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "003_users_keyset_index"
+down_revision: Union[str, Sequence[str], None] = "002_mfa_backup_code_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Replace the created_at index with (created_at, id)."""
+    op.create_index("idx_users_created_at_id", "users", ["created_at", "id"])
+    op.drop_index("idx_users_created_at", table_name="users")
+
+
+def downgrade() -> None:
+    """Restore the single-column created_at index."""
+    op.create_index("idx_users_created_at", "users", ["created_at"])
+    op.drop_index("idx_users_created_at_id", table_name="users")
@@ -0,0 +1,62 @@
+"""Indexed admin user search
+
+Revision ID: 004_user_search_indexes
+Revises: 003_users_keyset_index
+Create Date: 2026-10-17 14:00:00.000000
+
+Admin search used ILIKE '%term%' on email, full_name and company_name, which
+no btree index can serve. pg_trgm GIN indexes make those substring matches
+index scans and provide similarity() for ranking. Expression indexes on
+lower(email) and upper(tax_code) plus a plain professional_id index serve
+the exact-match fast paths.
+
+Indexes are built CONCURRENTLY so the users table stays writable.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004_user_search_indexes"
+down_revision: Union[str, Sequence[str], None] = "003_users_keyset_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_COLUMNS = ("email", "full_name", "company_name")
+
+
+def upgrade() -> None:
+    """Enable pg_trgm and create search indexes."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        for column in TRIGRAM_COLUMNS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_{column}_trgm "
+                f"ON users USING gin ({column} gin_trgm_ops)"
+            )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_email_lower "
+            "ON users (lower(email))"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_tax_code_upper "
+            "ON users (upper(tax_code))"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_professional_id "
+            "ON users (professional_id)"
+        )
+
+
+def downgrade() -> None:
+    """Drop search indexes (the extension is left installed)."""
+    with op.get_context().autocommit_block():
+        for name in (
+            "idx_users_professional_id",
+            "idx_users_tax_code_upper",
+            "idx_users_email_lower",
+            *(f"idx_users_{column}_trgm" for column in TRIGRAM_COLUMNS),
+        ):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,34 @@
+"""Keyset pagination index for admin session listing
+
+Revision ID: 005_sessions_keyset_index
+Revises: 004_user_search_indexes
+Create Date: 2026-10-17 15:00:00.000000
+
+The admin session list pages by (created_at, id) descending instead of
+OFFSET; this index lets each page seek directly to its cursor.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005_sessions_keyset_index"
+down_revision: Union[str, Sequence[str], None] = "004_user_search_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the (created_at, id) index without blocking logins."""
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_created_at_id "
+            "ON sessions (created_at, id)"
+        )
+
+
+def downgrade() -> None:
+    """Drop the keyset index."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_sessions_created_at_id")
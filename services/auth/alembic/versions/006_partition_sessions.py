@@ -0,0 +1,152 @@
+"""Partition sessions by month and add archive tables
+
+Revision ID: 006_partition_sessions
+Revises: 005_sessions_keyset_index
+Create Date: 2026-10-17 16:00:00.000000
+
+Every login and refresh inserts a session row and nothing deleted them.
+`sessions` becomes a table range-partitioned by created_at month, so
+retention is a partition detach/drop instead of a bulk DELETE, and each
+partition has its own small JTI indexes. PostgreSQL requires unique
+constraints to include the partition key: the primary key becomes
+(id, created_at) and JTI uniqueness (access_token_jti, created_at).
+
+Monthly partitions are created for the existing data plus two months
+ahead; the reaper worker keeps creating future partitions and retires old
+ones. A DEFAULT partition catches rows outside the created ranges.
+
+The `archive` schema receives reaped token rows and retired session
+partitions.
+
+The data copy holds an exclusive lock on sessions: run this migration in a
+maintenance window (issued access tokens keep validating from Redis, but
+logins and refreshes wait for it).
+"""
+
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "006_partition_sessions"
+down_revision: Union[str, Sequence[str], None] = "005_sessions_keyset_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SESSION_COLUMNS = (
+    "id, user_id, access_token_jti, refresh_token_jti, access_expires_at, "
+    "refresh_expires_at, ip_address, user_agent, device_id, device_name, is_active, "
+    "revoked_at, revoked_reason, created_at, last_activity_at"
+)
+
+SESSION_TABLE_BODY = """
+    id UUID NOT NULL,
+    user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    access_token_jti UUID NOT NULL,
+    refresh_token_jti UUID,
+    access_expires_at TIMESTAMPTZ NOT NULL,
+    refresh_expires_at TIMESTAMPTZ,
+    ip_address INET NOT NULL,
+    user_agent TEXT,
+    device_id VARCHAR(100),
+    device_name VARCHAR(100),
+    is_active BOOLEAN DEFAULT true,
+    revoked_at TIMESTAMPTZ,
+    revoked_reason VARCHAR(100),
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    last_activity_at TIMESTAMPTZ DEFAULT now(),
+    CONSTRAINT chk_expiry CHECK (access_expires_at > created_at)
+"""
+
+TOKEN_TABLES = ("password_reset_tokens", "email_verification_tokens")
+
+
+def _next_month(month: date) -> date:
+    """First day of the month after `month`."""
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _month_starts(first: date, last: date):
+    """Yield the first day of every month from `first` to `last` inclusive."""
+    current = first.replace(day=1)
+    while current <= last:
+        yield current
+        current = _next_month(current)
+
+
+def upgrade() -> None:
+    """Rebuild sessions as a partitioned table and create archive tables."""
+    conn = op.get_bind()
+
+    op.execute("CREATE SCHEMA IF NOT EXISTS archive")
+    for table in TOKEN_TABLES:
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS archive.{table} "
+            f"(LIKE public.{table} INCLUDING DEFAULTS)"
+        )
+
+    # Partitioned copy of sessions
+    op.execute(
+        f"CREATE TABLE sessions_partitioned ({SESSION_TABLE_BODY}, "
+        "CONSTRAINT sessions_partitioned_pkey PRIMARY KEY (id, created_at)) "
+        "PARTITION BY RANGE (created_at)"
+    )
+
+    oldest, today = conn.exec_driver_sql(
+        "SELECT COALESCE(min(created_at), now())::date, now()::date FROM sessions"
+    ).one()
+    last_month = _next_month(_next_month(today.replace(day=1)))
+    for month in _month_starts(oldest, last_month):
+        op.execute(
+            f"CREATE TABLE sessions_y{month.year}m{month.month:02d} "
+            f"PARTITION OF sessions_partitioned "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+        )
+    op.execute("CREATE TABLE sessions_default PARTITION OF sessions_partitioned DEFAULT")
+
+    op.execute("LOCK TABLE sessions IN EXCLUSIVE MODE")
+    op.execute(
+        "UPDATE sessions SET created_at = access_expires_at - interval '1 second' "
+        "WHERE created_at IS NULL"
+    )
+    op.execute(
+        f"INSERT INTO sessions_partitioned ({SESSION_COLUMNS}) "  # nosec B608 - module constant
+        f"SELECT {SESSION_COLUMNS} FROM sessions"
+    )
+    op.execute("DROP TABLE sessions")
+    op.execute("ALTER TABLE sessions_partitioned RENAME TO sessions")
+    op.execute("ALTER INDEX sessions_partitioned_pkey RENAME TO sessions_pkey")
+
+    # Indexes on the parent are created on every partition
+    op.execute(
+        "ALTER TABLE sessions ADD CONSTRAINT uq_sessions_access_jti "
+        "UNIQUE (access_token_jti, created_at)"
+    )
+    op.execute(
+        "ALTER TABLE sessions ADD CONSTRAINT uq_sessions_refresh_jti "
+        "UNIQUE (refresh_token_jti, created_at)"
+    )
+    op.create_index("idx_sessions_user_id", "sessions", ["user_id"])
+    op.create_index("idx_sessions_expires", "sessions", ["access_expires_at"])
+    op.create_index("idx_sessions_created_at_id", "sessions", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    """Rebuild sessions as a plain table (archived rows are kept)."""
+    op.execute(f"CREATE TABLE sessions_plain ({SESSION_TABLE_BODY}, PRIMARY KEY (id))")
+    op.execute("LOCK TABLE sessions IN EXCLUSIVE MODE")
+    op.execute(
+        f"INSERT INTO sessions_plain ({SESSION_COLUMNS}) "  # nosec B608 - module constant
+        f"SELECT {SESSION_COLUMNS} FROM sessions"
+    )
+    op.execute("DROP TABLE sessions CASCADE")
+    op.execute("ALTER TABLE sessions_plain RENAME TO sessions")
+    op.execute("ALTER INDEX sessions_plain_pkey RENAME TO sessions_pkey")
+    op.execute("ALTER TABLE sessions ADD UNIQUE (access_token_jti)")
+    op.execute("ALTER TABLE sessions ADD UNIQUE (refresh_token_jti)")
+    op.create_index("idx_sessions_user_id", "sessions", ["user_id"])
+    op.create_index("idx_sessions_access_jti", "sessions", ["access_token_jti"])
+    op.create_index("idx_sessions_refresh_jti", "sessions", ["refresh_token_jti"])
+    op.create_index("idx_sessions_expires", "sessions", ["access_expires_at"])
+    op.create_index("idx_sessions_created_at_id", "sessions", ["created_at", "id"])
@@ -0,0 +1,66 @@
+"""Transactional outbox for auth events
+
+Revision ID: 007_outbox
+Revises: 006_partition_sessions
+Create Date: 2026-10-17 18:00:00.000000
+
+Endpoints write their events to `outbox` in the same transaction as the
+state change, instead of publishing to RabbitMQ after the commit. The
+outbox relay claims rows with FOR UPDATE SKIP LOCKED, publishes them in id
+order per aggregate and deletes them once confirmed.
+
+An AFTER INSERT statement trigger sends NOTIFY auth_outbox, delivered at
+commit, so the relay wakes up without polling.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "007_outbox"
+down_revision: Union[str, Sequence[str], None] = "006_partition_sessions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the outbox table and its NOTIFY trigger."""
+    op.create_table(
+        "outbox",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), primary_key=True),
+        sa.Column("aggregate_id", sa.String(64), nullable=False),
+        sa.Column("event_type", sa.String(100), nullable=False),
+        sa.Column("routing_key", sa.String(100), nullable=False),
+        sa.Column("correlation_id", sa.String(64), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "available_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()
+        ),
+        sa.Column("last_error", sa.Text()),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()
+        ),
+    )
+    op.create_index("idx_outbox_available_at_id", "outbox", ["available_at", "id"])
+    op.create_index("idx_outbox_aggregate_id_id", "outbox", ["aggregate_id", "id"])
+
+    op.execute(
+        "CREATE OR REPLACE FUNCTION outbox_notify() RETURNS trigger AS $$ "
+        "BEGIN PERFORM pg_notify('auth_outbox', ''); RETURN NULL; END; "
+        "$$ LANGUAGE plpgsql"
+    )
+    op.execute(
+        "CREATE TRIGGER outbox_notify AFTER INSERT ON outbox "
+        "FOR EACH STATEMENT EXECUTE FUNCTION outbox_notify()"
+    )
+
+
+def downgrade() -> None:
+    """Drop the outbox table and trigger function."""
+    op.execute("DROP TRIGGER IF EXISTS outbox_notify ON outbox")
+    op.drop_table("outbox")
+    op.execute("DROP FUNCTION IF EXISTS outbox_notify()")
@@ -5,14 +5,13 @@ Core authentication endpoints for user registration, login, and token management
 """
 
 import logging
-import secrets
 from datetime import datetime, timezone
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import commit_session, get_db
+from app.core.password_hasher import password_hasher
 from app.core.rate_limit import rate_limit
 from app.core.redis import redis_client
-from app.core.security import get_password_hash, verify_password
 from app.models.user import Session, User
 from app.schemas.auth import (
     EmailVerification,
@@ -23,8 +22,11 @@ from app.schemas.auth import (
     TokenResponse,
     UserRegister,
 )
+from app.services.backup_code_service import backup_code_service
 from app.services.event_service import event_service
 from app.services.jwt_service import jwt_service
+from app.services.login_attempt_service import login_attempt_service
+from app.services.principal_cache import AuthPrincipal, principal_cache
 from app.services.token_service import token_service
 from app.utils.validators import validate_password_strength
 from fastapi import APIRouter, Depends, HTTPException, Request, status
@@ -61,10 +63,11 @@ async def register(user_data: UserRegister, request: Request, db: AsyncSession =
         )
 
     # Create user
+    password_hash = await password_hasher.hash(user_data.password)
     user = User(
         email=user_data.email.lower(),
         email_normalized=user_data.email.lower().replace(".", "").replace("+", ""),
-        password_hash=get_password_hash(user_data.password),
+        password_hash=password_hash,
         full_name=user_data.full_name,
         phone_number=getattr(user_data, "phone_number", None),
         tax_code=getattr(user_data, "tax_code", None),
@@ -74,8 +77,7 @@ async def register(user_data: UserRegister, request: Request, db: AsyncSession =
     )
 
     db.add(user)
-    await db.commit()
-    await db.refresh(user)
+    await db.flush()
 
     # Send verification email with hybrid token storage
     verification_token = await token_service.create_email_verification_token(
@@ -83,18 +85,23 @@ async def register(user_data: UserRegister, request: Request, db: AsyncSession =
         db=db,
         ip_address=request.client.host if request else None,
         user_agent=request.headers.get("User-Agent") if request else None,
+        commit=False,
     )
 
-    logger.info(f"New user registered: {user.email}")
-
-    # Publish event to RabbitMQ (Notification Service will send the email)
+    # Published once the user is committed (Notification Service will send the email)
     await event_service.publish_user_registered(
         user_id=str(user.id),
         email=user.email,
         full_name=user.full_name,
         verification_token=verification_token,
+        db=db,
     )
 
+    await commit_session(db)
+    await db.refresh(user)
+
+    logger.info(f"New user registered: {user.email}")
+
     return MessageResponse(
         message="Registration successful. Please check your email to verify your account.",
         success=True,
@@ -116,6 +123,15 @@ async def login(
     - Generates JWT tokens
     - Records session
     """
+    ip_address = request.client.host if request else None
+
+    # Refuse IPs that exceeded their failed-login budget
+    if await login_attempt_service.is_ip_blocked(ip_address):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, try again later",
+        )
+
     # Get user
     result = await db.execute(select(User).where(User.email == form_data.username.lower()))
     user = result.scalar_one_or_none()
@@ -123,6 +139,7 @@ async def login(
     if not user:
         # Log failed attempt for security monitoring
         logger.warning(f"Login attempt for non-existent user: {form_data.username}")
+        await login_attempt_service.record_failure(None, ip_address)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
     # Check if account is locked
@@ -136,19 +153,14 @@ async def login(
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account is not active")
 
-    # Verify password
-    if not verify_password(form_data.password, user.password_hash):
-        # Increment failed login count
-        user.failed_login_count += 1
-
-        # Lock account after 5 failed attempts
-        if user.failed_login_count >= 5:
-            user.locked_until = datetime.now(timezone.utc).replace(
-                hour=datetime.now(timezone.utc).hour + 1
-            )
-            logger.warning(f"Account locked due to failed attempts: {user.email}")
-
-        await db.commit()
+    # Verify password (rehashed transparently if the bcrypt cost changed)
+    is_valid, new_password_hash = await password_hasher.verify_and_update(
+        form_data.password, user.password_hash
+    )
+    if not is_valid:
+        # Count in Redis; the users row is written only when a lock triggers
+        if await login_attempt_service.record_failure(user, ip_address):
+            await db.commit()
 
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
@@ -159,10 +171,15 @@ async def login(
             detail="Please verify your email before logging in",
         )
 
+    if new_password_hash:
+        user.password_hash = new_password_hash
+        logger.info(f"Password hash upgraded for user: {user.email}")
+
     # Reset failed login count on successful login
+    await login_attempt_service.reset(str(user.id))
     user.failed_login_count = 0
     user.last_login_at = datetime.now(timezone.utc)
-    user.last_login_ip = request.client.host if request else None
+    user.last_login_ip = ip_address
 
     # Generate tokens
     tokens = await jwt_service.create_tokens(
@@ -171,20 +188,23 @@ async def login(
         ip_address=request.client.host if request else "unknown",
         user_agent=request.headers.get("User-Agent"),
         device_id=request.headers.get("X-Device-Id"),
+        commit=False,
     )
 
-    await db.commit()
-
-    logger.info(f"User logged in: {user.email}")
-
-    # Publish event to RabbitMQ
+    # Outbox event, committed with the session
     await event_service.publish_user_logged_in(
         user_id=str(user.id),
         email=user.email,
         ip_address=request.client.host if request else None,
         user_agent=request.headers.get("User-Agent"),
+        db=db,
     )
 
+    # One commit for session + event, then the session is stored in Redis
+    await commit_session(db)
+
+    logger.info(f"User logged in: {user.email}")
+
     return TokenResponse(**tokens)
 
 
@@ -192,7 +212,7 @@ async def login(
 async def logout(
     request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(jwt_service.get_current_user),
+    current_user: AuthPrincipal = Depends(jwt_service.get_current_principal),
 ):
     """
     Logout current session.
@@ -223,17 +243,16 @@ async def logout(
     session = result.scalar_one_or_none()
 
     if session:
-        await jwt_service.revoke_session(session.id, db, "user_logout")
-
-    logger.info(f"User logged out: {current_user.email}")
-
-    # Publish event to RabbitMQ
-    if session:
+        # Outbox event, committed with the revocation
         await event_service.publish_user_logged_out(
             user_id=str(current_user.id),
             email=current_user.email,
             session_id=str(session.id),
+            db=db,
         )
+        await jwt_service.revoke_session(session.id, db, "user_logout")
+
+    logger.info(f"User logged out: {current_user.email}")
 
     return MessageResponse(message="Logged out successfully", success=True)
 
@@ -283,19 +302,21 @@ async def verify_email(data: EmailVerification, db: AsyncSession = Depends(get_d
     user.email_verified = True
     user.email_verified_at = datetime.now(timezone.utc)
 
+    # Outbox event, committed with the verification
+    await event_service.publish_user_email_verified(
+        user_id=str(user.id),
+        email=user.email,
+        db=db,
+    )
+
     # Mark token as used (removes from Redis + updates PostgreSQL)
-    await token_service.mark_email_verification_token_used(data.token, db)
+    await token_service.mark_email_verification_token_used(data.token, db, commit=False)
 
     await db.commit()
+    await principal_cache.store(user)
 
     logger.info(f"Email verified for user: {user.email}")
 
-    # Publish event to RabbitMQ
-    await event_service.publish_user_email_verified(
-        user_id=str(user.id),
-        email=user.email,
-    )
-
     return MessageResponse(message="Email verified successfully", success=True)
 
 
@@ -328,19 +349,23 @@ async def forgot_password(
         db=db,
         ip_address=request.client.host if request else None,
         user_agent=request.headers.get("User-Agent") if request else None,
+        commit=False,
     )
 
-    logger.info(f"Password reset requested for: {user.email}")
-
-    # Publish event to RabbitMQ (Notification Service will send the email)
+    # Published once the token is committed (Notification Service will send the email)
     await event_service.publish_password_reset_requested(
         user_id=str(user.id),
         email=user.email,
         full_name=user.full_name,
         reset_token=reset_token,
         ip_address=request.client.host if request else None,
+        db=db,
     )
 
+    await commit_session(db)
+
+    logger.info(f"Password reset requested for: {user.email}")
+
     return MessageResponse(message="If the email exists, a reset link has been sent", success=True)
 
 
@@ -371,32 +396,36 @@ async def reset_password(data: PasswordReset, db: AsyncSession = Depends(get_db)
         )
 
     # Update password
-    user.password_hash = get_password_hash(data.new_password)
+    user.password_hash = await password_hasher.hash(data.new_password)
     user.password_changed_at = datetime.now(timezone.utc)
 
     # Revoke all sessions for security
-    await jwt_service.revoke_all_user_sessions(user.id, db, "password_reset")
+    await jwt_service.revoke_all_user_sessions(user.id, db, "password_reset", commit=False)
 
-    # Mark token as used (removes from Redis + updates PostgreSQL)
-    await token_service.mark_password_reset_token_used(data.token, db)
-
-    await db.commit()
-
-    logger.info(f"Password reset completed for: {user.email}")
-
-    # Publish event to RabbitMQ
+    # Outbox event, committed with the new password
     await event_service.publish_user_password_changed(
         user_id=str(user.id),
         email=user.email,
         changed_by="password_reset",
+        db=db,
     )
 
+    # Mark token as used (removes from Redis + updates PostgreSQL)
+    await token_service.mark_password_reset_token_used(data.token, db, commit=False)
+
+    # One commit for password, revocations, token and event; then Redis revocations
+    await commit_session(db)
+    await principal_cache.store(user)
+
+    logger.info(f"Password reset completed for: {user.email}")
+
     return MessageResponse(message="Password reset successfully", success=True)
 
 
 @router.post("/mfa/enable", response_model=dict)
 async def enable_mfa(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(jwt_service.get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(jwt_service.get_current_principal),
 ):
     """
     Enable two-factor authentication.
@@ -415,7 +444,7 @@ async def enable_mfa(
     secret = pyotp.random_base32()
 
     # Generate backup codes
-    backup_codes = [secrets.token_hex(4) for _ in range(10)]
+    backup_codes = backup_code_service.generate()
 
     # Store temporarily in Redis (user must verify to confirm)
     await redis_client.setex(
@@ -466,21 +495,21 @@ async def verify_mfa(
         # Enable MFA
         current_user.mfa_secret = setup_data["secret"]
         current_user.mfa_enabled = True
-        current_user.mfa_backup_codes = [
-            get_password_hash(code) for code in setup_data["backup_codes"]
-        ]
-
-        await db.commit()
-        await redis_client.delete(f"mfa_setup:{current_user.id}")
-
-        logger.info(f"MFA enabled for user: {current_user.email}")
+        await backup_code_service.store(current_user, setup_data["backup_codes"])
 
-        # Publish event to RabbitMQ
+        # Outbox event, committed with the MFA settings
         await event_service.publish_user_2fa_enabled(
             user_id=str(current_user.id),
             email=current_user.email,
+            db=db,
         )
 
+        await db.commit()
+        await principal_cache.store(current_user)
+        await redis_client.delete(f"mfa_setup:{current_user.id}")
+
+        logger.info(f"MFA enabled for user: {current_user.email}")
+
         return MessageResponse(
             message="Two-factor authentication enabled successfully", success=True
         )
@@ -499,19 +528,51 @@ async def verify_mfa(
         if totp.verify(data.code, valid_window=1):
             return MessageResponse(message="MFA verification successful", success=True)
 
-        # Try backup codes
-        for hashed_code in current_user.mfa_backup_codes or []:
-            if verify_password(data.code, hashed_code):
-                # Remove used backup code
-                current_user.mfa_backup_codes.remove(hashed_code)
-                await db.commit()
+        # Try backup codes (one bcrypt check, used code is removed)
+        if await backup_code_service.verify_and_consume(current_user, data.code):
+            await db.commit()
 
-                logger.info(f"Backup code used for MFA: {current_user.email}")
+            logger.info(f"Backup code used for MFA: {current_user.email}")
 
-                return MessageResponse(
-                    message="MFA verification successful (backup code used)", success=True
-                )
+            return MessageResponse(
+                message="MFA verification successful (backup code used)", success=True
+            )
 
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid verification code"
         )
+
+
+@router.post("/mfa/backup-codes", response_model=dict)
+async def regenerate_backup_codes(
+    data: MFAVerify,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(jwt_service.get_current_user),
+):
+    """
+    Regenerate MFA backup codes.
+
+    - Requires a valid TOTP code
+    - Invalidates every previous backup code
+    - Returns the new codes (shown once)
+    """
+    import pyotp
+
+    if not current_user.mfa_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="MFA is not enabled for this account",
+        )
+
+    if not pyotp.TOTP(current_user.mfa_secret).verify(data.code, valid_window=1):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid verification code"
+        )
+
+    backup_codes = backup_code_service.generate()
+    await backup_code_service.store(current_user, backup_codes)
+    await db.commit()
+
+    logger.info(f"MFA backup codes regenerated for user: {current_user.email}")
+
+    return {"backup_codes": backup_codes}
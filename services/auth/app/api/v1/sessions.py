@@ -4,16 +4,23 @@ Session Management API Endpoints (Admin)
 Administrative endpoints for session and user management
 """
 
+import ipaddress
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, and_, func, true
 import logging
 
 from app.core.database import get_db
 from app.models.user import User, Session
+from app.services.admin_stats_service import admin_stats_service
+from app.services.backup_code_service import backup_code_service
 from app.services.jwt_service import jwt_service
+from app.services.login_attempt_service import login_attempt_service
+from app.services.principal_cache import AuthPrincipal, principal_cache
+from app.services.user_search import build_user_search
 from app.schemas.admin import (
     SessionAdminInfo,
     UserAdminInfo,
@@ -23,6 +30,7 @@ from app.schemas.admin import (
     AdminStats
 )
 from app.core.permissions import require_admin, require_role
+from app.utils.pagination import encode_cursor, estimate_count, keyset_before
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/admin", tags=["Admin"])
@@ -32,54 +40,80 @@ router = APIRouter(prefix="/api/v1/admin", tags=["Admin"])
 @require_role(["admin", "support"])
 async def list_all_sessions(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(jwt_service.get_current_user),
-    page: int = Query(1, ge=1),
+    current_user: AuthPrincipal = Depends(jwt_service.get_current_principal),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     limit: int = Query(50, ge=1, le=100),
     active_only: bool = Query(False),
     user_id: Optional[str] = Query(None),
-    ip_address: Optional[str] = Query(None)
+    ip_address: Optional[str] = Query(None),
+    include_total: bool = Query(False, description="Include an estimated total")
 ):
     """
     List all sessions with filtering.
 
-    Admin only endpoint to view all user sessions.
+    Admin only endpoint to view all user sessions. Pages are ordered by
+    (created_at, id) descending and fetched by cursor (keyset). The total is
+    only returned on request, estimated from planner statistics.
     """
-    # Build query
-    query = select(Session).join(User)
+    # Validate filters (also rendered inline by the total estimate)
+    try:
+        user_uuid = uuid.UUID(user_id) if user_id else None
+        ip = str(ipaddress.ip_address(ip_address)) if ip_address else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid user_id or ip_address"
+        )
 
     # Apply filters
+    filters = []
     if active_only:
-        query = query.where(Session.is_active == True)
+        filters.append(Session.is_active == True)
 
-    if user_id:
-        query = query.where(Session.user_id == user_id)
+    if user_uuid:
+        filters.append(Session.user_id == user_uuid)
 
-    if ip_address:
-        query = query.where(Session.ip_address == ip_address)
+    if ip:
+        filters.append(Session.ip_address == ip)
 
-    # Count total
-    count_query = select(func.count()).select_from(Session)
-    if active_only:
-        count_query = count_query.where(Session.is_active == True)
-    if user_id:
-        count_query = count_query.where(Session.user_id == user_id)
+    total = None
+    if include_total:
+        total = await estimate_count(db, select(Session.id).where(*filters))
 
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    # Build query (user email in the same round trip)
+    query = (
+        select(Session, User.email)
+        .join(User, Session.user_id == User.id)
+        .where(*filters)
+    )
 
-    # Apply pagination
-    query = query.order_by(Session.created_at.desc())
-    query = query.offset((page - 1) * limit).limit(limit)
+    # Apply keyset pagination
+    if cursor:
+        try:
+            query = query.where(keyset_before(Session.created_at, Session.id, cursor))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+
+    query = query.order_by(Session.created_at.desc(), Session.id.desc()).limit(limit + 1)
 
     result = await db.execute(query)
-    sessions = result.scalars().all()
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_session = rows[-1][0]
+        next_cursor = encode_cursor(last_session.created_at, last_session.id)
 
     return PaginatedResponse(
         items=[
             SessionAdminInfo(
                 id=str(session.id),
                 user_id=str(session.user_id),
-                user_email=session.user.email,
+                user_email=user_email,
                 device_name=session.device_name,
                 ip_address=str(session.ip_address),
                 user_agent=session.user_agent,
@@ -90,12 +124,11 @@ async def list_all_sessions(
                 revoked_at=session.revoked_at,
                 revoked_reason=session.revoked_reason
             )
-            for session in sessions
+            for session, user_email in rows
         ],
         total=total,
-        page=page,
         limit=limit,
-        pages=(total + limit - 1) // limit
+        next_cursor=next_cursor
     )
 
 
@@ -105,7 +138,7 @@ async def revoke_session_admin(
     session_id: str,
     reason: str = Query(..., description="Reason for revocation"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(jwt_service.get_current_user)
+    current_user: AuthPrincipal = Depends(jwt_service.get_current_principal)
 ):
     """
     Revoke a specific session (admin).
@@ -158,77 +191,94 @@ async def revoke_session_admin(
 @require_role(["admin", "support"])
 async def list_users(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(jwt_service.get_current_user),
-    page: int = Query(1, ge=1),
+    current_user: AuthPrincipal = Depends(jwt_service.get_current_principal),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     limit: int = Query(50, ge=1, le=100),
     search: Optional[str] = Query(None),
     role: Optional[str] = Query(None),
-    status: Optional[str] = Query(None),
-    verified_only: bool = Query(False)
+    user_status: Optional[str] = Query(None, alias="status"),
+    verified_only: bool = Query(False),
+    include_total: bool = Query(False, description="Include an estimated total")
 ):
     """
     List all users with filtering.
 
-    Admin endpoint to view and search users.
-    """
-    # Build query
-    query = select(User)
+    Admin endpoint to view and search users. Pages are ordered by
+    (created_at, id) descending and fetched by cursor (keyset), so deep
+    pages cost the same as the first one.
 
-    # Apply filters
-    if search:
-        query = query.where(
-            or_(
-                User.email.ilike(f"%{search}%"),
-                User.full_name.ilike(f"%{search}%"),
-                User.company_name.ilike(f"%{search}%")
-            )
-        )
+    Searching by email, tax code or professional ID is an exact indexed
+    lookup; other terms return the best `limit` matches ranked by
+    similarity (no further pages, so a cursor is rejected). The total is
+    only returned on request, estimated from planner statistics.
+    """
+    # Filters shared by the page and the total estimate
+    filters = []
+    user_search = build_user_search(search) if search and search.strip() else None
+    ranked = user_search is not None and not user_search.exact
+    if user_search is not None:
+        filters.append(user_search.condition)
 
     if role:
-        query = query.where(User.role == role)
+        filters.append(User.role == role)
 
-    if status:
-        query = query.where(User.status == status)
+    if user_status:
+        filters.append(User.status == user_status)
 
     if verified_only:
-        query = query.where(User.email_verified == True)
-
-    # Count total
-    count_query = select(func.count()).select_from(User)
-    if search:
-        count_query = count_query.where(
-            or_(
-                User.email.ilike(f"%{search}%"),
-                User.full_name.ilike(f"%{search}%")
+        filters.append(User.email_verified == True)
+
+    if ranked and cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ranked search results have a single page"
+        )
+
+    total = None
+    if include_total:
+        total = await estimate_count(db, select(User.id).where(*filters))
+
+    # Active session count per user, evaluated only for the rows of the page
+    active_sessions = (
+        select(func.count().label("active_sessions"))
+        .where(
+            and_(
+                Session.user_id == User.id,
+                Session.is_active == True
             )
         )
-    if role:
-        count_query = count_query.where(User.role == role)
-    if status:
-        count_query = count_query.where(User.status == status)
+        .lateral("active_sessions")
+    )
 
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    query = (
+        select(User, active_sessions.c.active_sessions)
+        .outerjoin(active_sessions, true())
+        .where(*filters)
+    )
 
-    # Apply pagination
-    query = query.order_by(User.created_at.desc())
-    query = query.offset((page - 1) * limit).limit(limit)
+    # Apply keyset pagination
+    if ranked:
+        query = query.order_by(user_search.rank.desc())
+    elif cursor:
+        try:
+            query = query.where(keyset_before(User.created_at, User.id, cursor))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+
+    query = query.order_by(User.created_at.desc(), User.id.desc()).limit(limit + 1)
 
     result = await db.execute(query)
-    users = result.scalars().all()
-
-    # Get session counts
-    session_counts = {}
-    for user in users:
-        count_result = await db.execute(
-            select(func.count()).select_from(Session).where(
-                and_(
-                    Session.user_id == user.id,
-                    Session.is_active == True
-                )
-            )
-        )
-        session_counts[user.id] = count_result.scalar()
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if not ranked:
+            last_user = rows[-1][0]
+            next_cursor = encode_cursor(last_user.created_at, last_user.id)
 
     return PaginatedResponse(
         items=[
@@ -246,14 +296,13 @@ async def list_users(
                 last_login_at=user.last_login_at,
                 is_locked=user.is_locked,
                 failed_login_count=user.failed_login_count,
-                active_sessions=session_counts.get(user.id, 0)
+                active_sessions=session_count or 0
             )
-            for user in users
+            for user, session_count in rows
         ],
         total=total,
-        page=page,
         limit=limit,
-        pages=(total + limit - 1) // limit
+        next_cursor=next_cursor
     )
 
 
@@ -263,7 +312,7 @@ async def lock_user(
     user_id: str,
     lock_data: UserLockRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(jwt_service.get_current_user)
+    current_user: AuthPrincipal = Depends(jwt_service.get_current_principal)
 ):
     """
     Lock a user account.
@@ -302,6 +351,7 @@ async def lock_user(
     )
 
     await db.commit()
+    await principal_cache.store(user)
 
     logger.warning(
         f"User locked by admin: {current_user.email}, "
@@ -319,7 +369,7 @@ async def lock_user(
 async def unlock_user(
     user_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(jwt_service.get_current_user)
+    current_user: AuthPrincipal = Depends(jwt_service.get_current_principal)
 ):
     """
     Unlock a user account.
@@ -345,6 +395,8 @@ async def unlock_user(
     user.failed_login_count = 0
 
     await db.commit()
+    await principal_cache.store(user)
+    await login_attempt_service.reset(str(user.id))
 
     logger.info(
         f"User unlocked by admin: {current_user.email}, "
@@ -362,7 +414,7 @@ async def unlock_user(
 async def force_verify_email(
     user_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(jwt_service.get_current_user)
+    current_user: AuthPrincipal = Depends(jwt_service.get_current_principal)
 ):
     """
     Force verify user email.
@@ -392,6 +444,7 @@ async def force_verify_email(
     user.email_verified_at = datetime.now(timezone.utc)
 
     await db.commit()
+    await principal_cache.store(user)
 
     logger.info(
         f"Email force-verified by admin: {current_user.email}, "
@@ -409,7 +462,7 @@ async def force_verify_email(
 async def reset_user_mfa(
     user_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(jwt_service.get_current_user)
+    current_user: AuthPrincipal = Depends(jwt_service.get_current_principal)
 ):
     """
     Reset user's MFA.
@@ -437,9 +490,10 @@ async def reset_user_mfa(
     # Reset MFA
     user.mfa_enabled = False
     user.mfa_secret = None
-    user.mfa_backup_codes = None
+    backup_code_service.clear(user)
 
     await db.commit()
+    await principal_cache.store(user)
 
     logger.warning(
         f"MFA reset by admin: {current_user.email}, "
@@ -456,69 +510,14 @@ async def reset_user_mfa(
 @require_role(["admin", "support"])
 async def get_admin_stats(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(jwt_service.get_current_user)
+    current_user: AuthPrincipal = Depends(jwt_service.get_current_principal)
 ):
     """
     Get administrative statistics.
 
-    Returns system-wide statistics for monitoring.
+    Returns system-wide statistics for monitoring, from a snapshot at most
+    ADMIN_STATS_MAX_STALENESS_SECONDS old (`timestamp` is when it was taken).
     """
-    # User stats
-    total_users = await db.execute(
-        select(func.count()).select_from(User)
-    )
-    active_users = await db.execute(
-        select(func.count()).select_from(User).where(User.status == "active")
-    )
-    verified_users = await db.execute(
-        select(func.count()).select_from(User).where(User.email_verified == True)
-    )
-    mfa_users = await db.execute(
-        select(func.count()).select_from(User).where(User.mfa_enabled == True)
-    )
-
-    # Session stats
-    total_sessions = await db.execute(
-        select(func.count()).select_from(Session)
-    )
-    active_sessions = await db.execute(
-        select(func.count()).select_from(Session).where(Session.is_active == True)
-    )
-
-    # Recent activity
-    recent_registrations = await db.execute(
-        select(func.count()).select_from(User).where(
-            User.created_at >= datetime.now(timezone.utc) - timedelta(days=7)
-        )
-    )
-    recent_logins = await db.execute(
-        select(func.count()).select_from(Session).where(
-            Session.created_at >= datetime.now(timezone.utc) - timedelta(days=1)
-        )
-    )
-
-    # Failed login attempts
-    failed_attempts = await db.execute(
-        select(func.sum(User.failed_login_count)).select_from(User)
-    )
-
-    # Locked accounts
-    locked_accounts = await db.execute(
-        select(func.count()).select_from(User).where(
-            User.locked_until > datetime.now(timezone.utc)
-        )
-    )
+    stats = await admin_stats_service.get(db)
 
-    return AdminStats(
-        total_users=total_users.scalar() or 0,
-        active_users=active_users.scalar() or 0,
-        verified_users=verified_users.scalar() or 0,
-        mfa_enabled_users=mfa_users.scalar() or 0,
-        total_sessions=total_sessions.scalar() or 0,
-        active_sessions=active_sessions.scalar() or 0,
-        recent_registrations=recent_registrations.scalar() or 0,
-        recent_logins=recent_logins.scalar() or 0,
-        failed_login_attempts=failed_attempts.scalar() or 0,
-        locked_accounts=locked_accounts.scalar() or 0,
-        timestamp=datetime.now(timezone.utc)
-    )
\ No newline at end of file
+    return AdminStats(**stats)
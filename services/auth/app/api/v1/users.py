@@ -13,9 +13,10 @@ import logging
 
 from app.core.database import get_db
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password
+from app.core.password_hasher import password_hasher
 from app.models.user import User, Session
 from app.services.jwt_service import jwt_service
+from app.services.principal_cache import AuthPrincipal, principal_cache
 from app.schemas.user import (
     UserProfile,
     UserUpdate,
@@ -78,6 +79,7 @@ async def update_profile(
 
     await db.commit()
     await db.refresh(current_user)
+    await principal_cache.store(current_user)
 
     logger.info(f"Profile updated for user: {current_user.email}")
 
@@ -98,14 +100,14 @@ async def change_password(
     - Revokes all sessions for security
     """
     # Verify current password
-    if not verify_password(password_data.current_password, current_user.password_hash):
+    if not await password_hasher.verify(password_data.current_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
 
     # Check if new password is same as current
-    if verify_password(password_data.new_password, current_user.password_hash):
+    if await password_hasher.verify(password_data.new_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="New password must be different from current password"
@@ -120,7 +122,7 @@ async def change_password(
         )
 
     # Update password
-    current_user.password_hash = get_password_hash(password_data.new_password)
+    current_user.password_hash = await password_hasher.hash(password_data.new_password)
     current_user.password_changed_at = datetime.now(timezone.utc)
 
     # Revoke all sessions except current (optional based on security policy)
@@ -132,6 +134,7 @@ async def change_password(
         )
 
     await db.commit()
+    await principal_cache.store(current_user)
 
     logger.info(f"Password changed for user: {current_user.email}")
 
@@ -144,7 +147,7 @@ async def change_password(
 @router.get("/me/sessions", response_model=List[SessionInfo])
 async def get_user_sessions(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(jwt_service.get_current_user),
+    current_user: AuthPrincipal = Depends(jwt_service.get_current_principal),
     active_only: bool = Query(True, description="Show only active sessions")
 ):
     """
@@ -182,7 +185,7 @@ async def get_user_sessions(
 async def revoke_session(
     session_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(jwt_service.get_current_user)
+    current_user: AuthPrincipal = Depends(jwt_service.get_current_principal)
 ):
     """
     Revoke a specific session.
@@ -236,7 +239,7 @@ async def revoke_session(
 @router.delete("/me/sessions", response_model=MessageResponse)
 async def revoke_all_sessions(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(jwt_service.get_current_user)
+    current_user: AuthPrincipal = Depends(jwt_service.get_current_principal)
 ):
     """
     Revoke all user sessions.
@@ -326,7 +329,7 @@ async def delete_account(
     - Anonymizes personal data after retention period
     """
     # Verify password
-    if not verify_password(password_confirmation, current_user.password_hash):
+    if not await password_hasher.verify(password_confirmation, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Password confirmation is incorrect"
@@ -353,6 +356,7 @@ async def delete_account(
     )
 
     await db.commit()
+    await principal_cache.store(current_user)
 
     logger.warning(f"Account deletion requested by user: {current_user.email}")
 
@@ -451,7 +455,7 @@ async def verify_phone_number(
 @router.post("/me/export-data", response_model=MessageResponse)
 async def export_user_data(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(jwt_service.get_current_user)
+    current_user: AuthPrincipal = Depends(jwt_service.get_current_principal)
 ):
     """
     Request GDPR data export.
@@ -0,0 +1,335 @@
+"""
+Redis Client-Side Cache
+=======================
+Per-worker cache of read-mostly Redis keys, invalidated by the server through
+client tracking (or by pub/sub broadcasts on servers without it)
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.metrics import (
+    client_cache_bytes,
+    client_cache_evictions_total,
+    client_cache_hit_ratio,
+    client_cache_hits_total,
+    client_cache_invalidations_total,
+    client_cache_misses_total,
+)
+from redis.exceptions import ResponseError
+
+if TYPE_CHECKING:
+    from app.core.redis import RedisClient
+
+logger = logging.getLogger(__name__)
+
+# Channel Redis publishes tracking invalidations on (RESP2 redirect mode)
+TRACKING_CHANNEL = "__redis__:invalidate"
+
+
+class ClientSideCache:
+    """
+    Memory-capped LRU of Redis values for keys under configured prefixes,
+    consulted by RedisClient reads and invalidated by its writes.
+
+    - `tracking` mode: a dedicated connection enables
+      `CLIENT TRACKING ON REDIRECT <subscriber> BCAST PREFIX ...`, so Redis
+      itself reports every write, expiry and eviction of a cached prefix
+    - `pubsub` mode (or tracking unsupported): writes made through RedisClient
+      broadcast invalidations to every replica; Redis-side expiries are only
+      bounded by `ttl_seconds`
+    - Entries (including "key missing") are only served while the
+      invalidation listener is connected; losing it drops everything
+    - A read racing an invalidation of the same key is not cached
+    """
+
+    RECONNECT_DELAY_SECONDS = 1.0
+    HEARTBEAT_SECONDS = 5.0
+    ENTRY_OVERHEAD_BYTES = 64
+
+    def __init__(
+        self,
+        prefixes: Sequence[str] = tuple(
+            prefix.strip() for prefix in settings.CLIENT_CACHE_PREFIXES.split(",") if prefix.strip()
+        ),
+        max_bytes: int = settings.CLIENT_CACHE_MAX_BYTES,
+        ttl_seconds: int = settings.CLIENT_CACHE_TTL_SECONDS,
+        mode: str = settings.CLIENT_CACHE_MODE,
+        channel: str = settings.CLIENT_CACHE_CHANNEL,
+    ):
+        self.prefixes = tuple(prefixes)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.mode = mode
+        self.channel = channel
+
+        # key -> (value or None if missing, size in bytes, monotonic expiry)
+        self._entries: "OrderedDict[str, Tuple[Optional[str], int, float]]" = OrderedDict()
+        self._bytes = 0
+        # key -> flags of in-flight reads, set when the key is invalidated meanwhile
+        self._pending: Dict[str, List[List[bool]]] = {}
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._listening = False
+        self._client: Optional["RedisClient"] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether caching is configured at all."""
+        return self.mode != "off" and bool(self.prefixes)
+
+    @property
+    def is_listening(self) -> bool:
+        """Whether invalidations are currently being received."""
+        return self._listening
+
+    @property
+    def hit_ratio(self) -> float:
+        """Share of cacheable reads served from memory."""
+        total = self._hits + self._misses
+        return self._hits / total if total else 0.0
+
+    def covers(self, key: str) -> bool:
+        """Whether a key falls under a cached prefix."""
+        return self.enabled and key.startswith(self.prefixes)
+
+    @property
+    def broadcasts_writes(self) -> bool:
+        """Whether writers must publish invalidations (no server tracking)."""
+        return self.enabled and self.mode == "pubsub"
+
+    def begin_read(self, keys: Sequence[str]) -> Tuple[int, List[List[bool]]]:
+        """
+        Register Redis reads in flight, so invalidations arriving before the
+        reply veto caching it. Pass the result to `finish_read`.
+        """
+        flags = []
+        for key in keys:
+            flag = [False]
+            self._pending.setdefault(key, []).append(flag)
+            flags.append(flag)
+        return self._generation, flags
+
+    def finish_read(
+        self,
+        keys: Sequence[str],
+        read: Tuple[int, List[List[bool]]],
+        values: Optional[Sequence[Optional[str]]],
+    ) -> None:
+        """
+        Complete reads started with `begin_read`, caching the values unless
+        they were invalidated meanwhile (None values means the read failed).
+        """
+        generation, flags = read
+        for index, (key, flag) in enumerate(zip(keys, flags)):
+            pending = self._pending.get(key)
+            if pending is not None:
+                pending.remove(flag)
+                if not pending:
+                    del self._pending[key]
+            if values is not None and not flag[0] and generation == self._generation:
+                self.store(key, values[index])
+
+    def lookup(self, key: str) -> Tuple[bool, Optional[str]]:
+        """
+        Look up a key in memory.
+
+        Returns:
+            (hit, value); value is None for keys known to be missing
+        """
+        if not self.covers(key):
+            return False, None
+
+        entry = self._entries.get(key) if self._listening else None
+        if entry is not None:
+            value, size, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self._record(hit=True)
+                return True, value
+            self._remove(key)
+
+        self._record(hit=False)
+        return False, None
+
+    def store(self, key: str, value: Optional[str]) -> None:
+        """Cache a value read from Redis (ignored while not listening or over the cap)."""
+        if not self._listening or not self.covers(key):
+            return
+
+        size = sys.getsizeof(key) + sys.getsizeof(value) + self.ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+
+        self._remove(key)
+        self._entries[key] = (value, size, time.monotonic() + self.ttl_seconds)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            client_cache_evictions_total.inc()
+        client_cache_bytes.set(self._bytes)
+
+    def invalidate(self, keys: Optional[Iterable[str]], source: str = "local") -> None:
+        """
+        Drop keys from memory (all of them if `keys` is None).
+
+        Args:
+            keys: Invalidated keys
+            source: Invalidation origin for metrics (local, tracking, pubsub)
+        """
+        if keys is None:
+            self.clear(source=source)
+            return
+
+        for key in keys:
+            for flag in self._pending.get(key, ()):
+                flag[0] = True
+            if self._remove(key):
+                client_cache_invalidations_total.labels(source=source).inc()
+        client_cache_bytes.set(self._bytes)
+
+    def clear(self, source: str = "reset") -> None:
+        """Drop every entry and discard reads in flight."""
+        if self._entries:
+            client_cache_invalidations_total.labels(source=source).inc(len(self._entries))
+        self._entries.clear()
+        self._bytes = 0
+        self._generation += 1
+        client_cache_bytes.set(0)
+
+    async def start(self, client: "RedisClient") -> None:
+        """
+        Start the background invalidation listener.
+
+        Args:
+            client: Redis client providing the dedicated connections
+        """
+        if not self.enabled or self._task is not None:
+            return
+        self._client = client
+        self._task = asyncio.create_task(self._listen())
+        logger.info(f"Client-side cache listener started (mode={self.mode})")
+
+    async def stop(self) -> None:
+        """Stop the background invalidation listener."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Client-side cache listener stopped")
+
+    async def _listen(self) -> None:
+        """Subscribe to invalidations (and enable tracking), reconnecting on failure."""
+        while True:
+            subscriber = tracker = None
+            try:
+                subscriber = await self._client.acquire_connection()
+                if subscriber is None:
+                    await asyncio.sleep(self.RECONNECT_DELAY_SECONDS)
+                    continue
+
+                channels = [self.channel]
+                if self.mode == "tracking":
+                    await subscriber.send_command("CLIENT", "ID")
+                    subscriber_id = await subscriber.read_response()
+                    channels.append(TRACKING_CHANNEL)
+
+                await subscriber.send_command("SUBSCRIBE", *channels)
+                for _ in channels:
+                    await subscriber.read_response()
+
+                if self.mode == "tracking":
+                    tracker = await self._client.acquire_connection()
+                    if not await self._enable_tracking(tracker, subscriber_id):
+                        await self._client.release_connection(tracker)
+                        tracker = None
+                        self.mode = "pubsub"
+
+                self.clear()
+                self._listening = True
+
+                while True:
+                    message = await subscriber.read_response(timeout=self.HEARTBEAT_SECONDS)
+                    if message is None:
+                        if tracker is not None:
+                            # Tracking ends silently with its connection
+                            await tracker.send_command("PING")
+                            await tracker.read_response()
+                        continue
+                    self._handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Client-side cache listener error: {e}")
+            finally:
+                self._listening = False
+                self.clear()
+                for connection in (tracker, subscriber):
+                    if connection is not None:
+                        try:
+                            await self._client.release_connection(connection)
+                        except Exception:
+                            pass
+
+            await asyncio.sleep(self.RECONNECT_DELAY_SECONDS)
+
+    async def _enable_tracking(self, tracker, subscriber_id: int) -> bool:
+        """Turn on broadcast tracking of the cached prefixes, redirected to the subscriber."""
+        args = ["CLIENT", "TRACKING", "ON", "REDIRECT", subscriber_id, "BCAST"]
+        for prefix in self.prefixes:
+            args += ["PREFIX", prefix]
+        await tracker.send_command(*args)
+        try:
+            await tracker.read_response()
+            return True
+        except ResponseError as e:
+            logger.warning(f"Redis client tracking unavailable, using pub/sub invalidation: {e}")
+            return False
+
+    def _handle_message(self, message) -> None:
+        """Apply an invalidation (tracking pushes a key list, or None on FLUSHALL)."""
+        try:
+            kind, channel, data = message
+        except (TypeError, ValueError):
+            return
+        if kind != "message":
+            return
+
+        if channel == TRACKING_CHANNEL:
+            self.invalidate(data, source="tracking")
+            return
+        try:
+            self.invalidate(json.loads(data), source="pubsub")
+        except (TypeError, ValueError):
+            logger.warning(f"Malformed cache invalidation message: {data!r}")
+
+    def _remove(self, key: str) -> bool:
+        """Remove an entry, returning whether it existed."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[1]
+        return True
+
+    def _record(self, hit: bool) -> None:
+        """Count a cacheable read."""
+        if hit:
+            self._hits += 1
+            client_cache_hits_total.inc()
+        else:
+            self._misses += 1
+            client_cache_misses_total.inc()
+        client_cache_hit_ratio.set(self.hit_ratio)
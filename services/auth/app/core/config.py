@@ -3,10 +3,11 @@ Configuration Management with Vault Integration
 ==============================================
 """
 
+import json
 import os
 import sys
 from functools import lru_cache
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import Field, validator
 from pydantic_settings import BaseSettings
@@ -43,9 +44,30 @@ class Settings(BaseSettings):
     REDIS_HOST: str = Field(default="localhost", env="REDIS_HOST")
     REDIS_PORT: int = Field(default=6379, env="REDIS_PORT")
     REDIS_DB: int = Field(default=0, env="REDIS_DB")
+    REDIS_MAX_CONNECTIONS: int = Field(default=50, env="REDIS_MAX_CONNECTIONS")
+    REDIS_SOCKET_TIMEOUT: float = Field(default=2.0, env="REDIS_SOCKET_TIMEOUT")
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = Field(default=2.0, env="REDIS_SOCKET_CONNECT_TIMEOUT")
+    REDIS_HEALTH_CHECK_INTERVAL: int = Field(default=30, env="REDIS_HEALTH_CHECK_INTERVAL")
+    REDIS_CIRCUIT_FAILURE_THRESHOLD: int = Field(default=5, env="REDIS_CIRCUIT_FAILURE_THRESHOLD")
+    REDIS_CIRCUIT_RESET_SECONDS: float = Field(default=10.0, env="REDIS_CIRCUIT_RESET_SECONDS")
+    REDIS_PARSER: str = Field(default="auto", env="REDIS_PARSER")  # auto, hiredis, python
+
+    # Redis client-side cache (read-mostly keys served from process memory)
+    CLIENT_CACHE_MODE: str = Field(
+        default="tracking", env="CLIENT_CACHE_MODE"
+    )  # tracking, pubsub, off
+    CLIENT_CACHE_PREFIXES: str = Field(
+        default="principal:,admin_stats:", env="CLIENT_CACHE_PREFIXES"
+    )  # comma-separated key prefixes
+    CLIENT_CACHE_MAX_BYTES: int = Field(default=16 * 1024 * 1024, env="CLIENT_CACHE_MAX_BYTES")
+    CLIENT_CACHE_TTL_SECONDS: int = Field(default=60, env="CLIENT_CACHE_TTL_SECONDS")
+    CLIENT_CACHE_CHANNEL: str = Field(
+        default="auth:cache_invalidations", env="CLIENT_CACHE_CHANNEL"
+    )
 
     # JWT Configuration (non-sensitive)
-    JWT_ALGORITHM: str = Field(default="HS256", env="JWT_ALGORITHM")
+    JWT_ALGORITHM: str = Field(default="RS256", env="JWT_ALGORITHM")  # RS*/ES*, or HS* (legacy)
+    JWKS_CACHE_MAX_AGE_SECONDS: int = Field(default=300, env="JWKS_CACHE_MAX_AGE_SECONDS")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(
         default=240, env="ACCESS_TOKEN_EXPIRE_MINUTES"
     )  # 4 hours
@@ -57,6 +79,73 @@ class Settings(BaseSettings):
         default=7, env="EMAIL_VERIFICATION_TOKEN_EXPIRE_DAYS"
     )
 
+    # Access Token Revocation Cache (per worker)
+    REVOCATION_CACHE_ENABLED: bool = Field(default=True, env="REVOCATION_CACHE_ENABLED")
+    REVOCATION_CACHE_MAX_ENTRIES: int = Field(default=50000, env="REVOCATION_CACHE_MAX_ENTRIES")
+    REVOCATION_CACHE_TTL_SECONDS: int = Field(default=60, env="REVOCATION_CACHE_TTL_SECONDS")
+    REVOCATION_CHANNEL: str = Field(default="auth:revocations", env="REVOCATION_CHANNEL")
+
+    # Auth Principal Cache (Redis + per worker LRU)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = Field(default=300, env="PRINCIPAL_CACHE_TTL_SECONDS")
+    PRINCIPAL_CACHE_LOCAL_TTL_SECONDS: int = Field(
+        default=10, env="PRINCIPAL_CACHE_LOCAL_TTL_SECONDS"
+    )
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = Field(default=10000, env="PRINCIPAL_CACHE_MAX_ENTRIES")
+
+    # Session Activity (write-behind last_activity_at, idle timeout; 0 disables)
+    SESSION_IDLE_TIMEOUT_MINUTES: int = Field(default=120, env="SESSION_IDLE_TIMEOUT_MINUTES")
+    SESSION_ACTIVITY_BUFFER_MAX_ENTRIES: int = Field(
+        default=100000, env="SESSION_ACTIVITY_BUFFER_MAX_ENTRIES"
+    )
+    SESSION_ACTIVITY_BUFFER_FLUSH_SECONDS: int = Field(
+        default=5, env="SESSION_ACTIVITY_BUFFER_FLUSH_SECONDS"
+    )
+    SESSION_ACTIVITY_FLUSH_INTERVAL_SECONDS: int = Field(
+        default=30, env="SESSION_ACTIVITY_FLUSH_INTERVAL_SECONDS"
+    )
+    SESSION_ACTIVITY_BATCH_SIZE: int = Field(default=1000, env="SESSION_ACTIVITY_BATCH_SIZE")
+
+    # Admin Statistics Snapshot (max age of the cached counters)
+    ADMIN_STATS_MAX_STALENESS_SECONDS: int = Field(
+        default=60, env="ADMIN_STATS_MAX_STALENESS_SECONDS"
+    )
+
+    # Retention (reaper worker, monthly session partitions)
+    REAPER_ENABLED: bool = Field(default=True, env="REAPER_ENABLED")
+    REAPER_INTERVAL_SECONDS: int = Field(default=3600, env="REAPER_INTERVAL_SECONDS")
+    REAPER_BATCH_SIZE: int = Field(default=1000, env="REAPER_BATCH_SIZE")
+    REAPER_ARCHIVE_ENABLED: bool = Field(default=True, env="REAPER_ARCHIVE_ENABLED")
+    SESSION_RETENTION_DAYS: int = Field(default=90, env="SESSION_RETENTION_DAYS")
+    SESSION_PARTITION_MONTHS_AHEAD: int = Field(default=2, env="SESSION_PARTITION_MONTHS_AHEAD")
+    TOKEN_RETENTION_DAYS: int = Field(default=30, env="TOKEN_RETENTION_DAYS")
+
+    # Health monitor (dependency probes behind /health and /ready)
+    HEALTH_CHECK_INTERVAL_SECONDS: float = Field(default=5.0, env="HEALTH_CHECK_INTERVAL_SECONDS")
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = Field(default=2.0, env="HEALTH_PROBE_TIMEOUT_SECONDS")
+
+    # RabbitMQ event publishing (non-sensitive)
+    RABBITMQ_HOST: str = Field(default="localhost", env="RABBITMQ_HOST")
+    RABBITMQ_PORT: int = Field(default=5672, env="RABBITMQ_PORT")
+    RABBITMQ_VHOST: str = Field(default="refertosicuro", env="RABBITMQ_VHOST")
+    RABBITMQ_USER: str = Field(default="admin", env="RABBITMQ_USER")
+    RABBITMQ_EXCHANGE: str = Field(default="refertosicuro.events", env="RABBITMQ_EXCHANGE")
+    EVENT_PUBLISHER_ENABLED: bool = Field(default=True, env="EVENT_PUBLISHER_ENABLED")
+    EVENT_CHANNEL_POOL_SIZE: int = Field(default=4, env="EVENT_CHANNEL_POOL_SIZE")
+    EVENT_MAX_IN_FLIGHT: int = Field(default=256, env="EVENT_MAX_IN_FLIGHT")  # unconfirmed
+    EVENT_BUFFER_SIZE: int = Field(default=10000, env="EVENT_BUFFER_SIZE")  # full: drop
+    EVENT_BATCH_SIZE: int = Field(default=100, env="EVENT_BATCH_SIZE")
+    EVENT_BATCH_LINGER_MS: float = Field(default=0.0, env="EVENT_BATCH_LINGER_MS")
+    EVENT_CONFIRM_TIMEOUT_SECONDS: float = Field(default=5.0, env="EVENT_CONFIRM_TIMEOUT_SECONDS")
+    EVENT_MAX_RETRIES: int = Field(default=3, env="EVENT_MAX_RETRIES")
+    EVENT_DRAIN_TIMEOUT_SECONDS: float = Field(default=5.0, env="EVENT_DRAIN_TIMEOUT_SECONDS")
+
+    # Transactional outbox (events committed with the state change, relayed to RabbitMQ;
+    # only used while EVENT_PUBLISHER_ENABLED)
+    OUTBOX_ENABLED: bool = Field(default=True, env="OUTBOX_ENABLED")
+    OUTBOX_BATCH_SIZE: int = Field(default=100, env="OUTBOX_BATCH_SIZE")
+    OUTBOX_POLL_INTERVAL_SECONDS: float = Field(default=5.0, env="OUTBOX_POLL_INTERVAL_SECONDS")
+    OUTBOX_MAX_BACKOFF_SECONDS: int = Field(default=300, env="OUTBOX_MAX_BACKOFF_SECONDS")
+
     # Security (non-sensitive configs)
     ALLOWED_HOSTS: List[str] = Field(
         default=["localhost", "auth-service", "*.refertosicuro.it"], env="ALLOWED_HOSTS"
@@ -79,9 +168,17 @@ class Settings(BaseSettings):
     PASSWORD_REQUIRE_DIGIT: bool = Field(default=True, env="PASSWORD_REQUIRE_DIGIT")
     PASSWORD_REQUIRE_SPECIAL: bool = Field(default=True, env="PASSWORD_REQUIRE_SPECIAL")
 
+    # Password Hashing (bcrypt runs off the event loop)
+    BCRYPT_ROUNDS: int = Field(default=12, env="BCRYPT_ROUNDS")  # changes rehash on login
+    PASSWORD_HASH_EXECUTOR: str = Field(default="thread", env="PASSWORD_HASH_EXECUTOR")
+    PASSWORD_HASH_WORKERS: int = Field(default=4, env="PASSWORD_HASH_WORKERS")
+    PASSWORD_HASH_MAX_QUEUE: int = Field(default=64, env="PASSWORD_HASH_MAX_QUEUE")
+
     # Account Lockout
     MAX_LOGIN_ATTEMPTS: int = Field(default=5, env="MAX_LOGIN_ATTEMPTS")
     LOCKOUT_DURATION_MINUTES: int = Field(default=15, env="LOCKOUT_DURATION_MINUTES")
+    LOGIN_FAILURE_WINDOW_SECONDS: int = Field(default=900, env="LOGIN_FAILURE_WINDOW_SECONDS")
+    MAX_LOGIN_ATTEMPTS_PER_IP: int = Field(default=50, env="MAX_LOGIN_ATTEMPTS_PER_IP")
 
     # Feature Flags
     REGISTRATION_ENABLED: bool = Field(default=True, env="REGISTRATION_ENABLED")
@@ -93,8 +190,11 @@ class Settings(BaseSettings):
     _vault_client: Optional[SecureConfig] = None
     _jwt_secret: Optional[str] = None
     _csrf_secret: Optional[str] = None
+    _jwt_signing_keys: Optional[Dict[str, str]] = None
+    _mfa_backup_code_key: Optional[str] = None
     _database_password: Optional[str] = None
     _redis_password: Optional[str] = None
+    _rabbitmq_password: Optional[str] = None
     _email_verification_secret: Optional[str] = None
     _password_reset_secret: Optional[str] = None
 
@@ -120,6 +220,33 @@ class Settings(BaseSettings):
                 self._jwt_secret = self.vault_client.get_required("jwt_secret")
         return self._jwt_secret
 
+    @property
+    def JWT_SIGNING_KEYS(self) -> Dict[str, str]:
+        """Get asymmetric JWT signing keys (kid -> private PEM) from Vault."""
+        if self._jwt_signing_keys is None:
+            raw = self.vault_client.get("jwt_signing_keys")
+            if isinstance(raw, str):
+                raw = json.loads(raw)
+            self._jwt_signing_keys = raw or {}
+        return self._jwt_signing_keys
+
+    @property
+    def JWT_ACTIVE_KID(self) -> Optional[str]:
+        """Get the key ID used to sign new tokens from Vault."""
+        return self.vault_client.get("jwt_active_kid")
+
+    @property
+    def MFA_BACKUP_CODE_KEY(self) -> str:
+        """Get HMAC key for MFA backup code lookup from Vault (with test fallback)."""
+        if self._mfa_backup_code_key is None:
+            if self.ENVIRONMENT == "test":
+                self._mfa_backup_code_key = os.getenv(
+                    "MFA_BACKUP_CODE_KEY", "test_mfa_backup_code_key_min_32_characters"
+                )
+            else:
+                self._mfa_backup_code_key = self.vault_client.get_required("mfa_backup_code_key")
+        return self._mfa_backup_code_key
+
     @property
     def SECRET_KEY(self) -> str:
         """Alias for JWT_SECRET for backwards compatibility."""
@@ -170,6 +297,24 @@ class Settings(BaseSettings):
             return f"redis://:{password}@{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
 
+    @property
+    def RABBITMQ_PASSWORD(self) -> str:
+        """Get RabbitMQ password from Vault."""
+        if self._rabbitmq_password is None:
+            self._rabbitmq_password = self.vault_client.get(
+                "rabbitmq_password", "dev_password_change_me"
+            )
+        return self._rabbitmq_password
+
+    @property
+    def RABBITMQ_URL(self) -> str:
+        """Construct RabbitMQ URL with password from Vault."""
+        password = self.RABBITMQ_PASSWORD
+        return (
+            f"amqp://{self.RABBITMQ_USER}:{password}"
+            f"@{self.RABBITMQ_HOST}:{self.RABBITMQ_PORT}/{self.RABBITMQ_VHOST}"
+        )
+
     @property
     def EMAIL_VERIFICATION_SECRET(self) -> str:
         """Get email verification secret from Vault."""
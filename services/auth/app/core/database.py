@@ -4,7 +4,7 @@ Database Configuration
 PostgreSQL with async SQLAlchemy
 """
 
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Awaitable, Callable
 
 from app.core.config import settings
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
@@ -42,6 +42,24 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
+def after_commit(db: AsyncSession, callback: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Queue async side effects (e.g. Redis writes) to run once `db` commits.
+
+    Used by services that let the caller own the transaction; the queue runs
+    in `commit_session` (and in `get_db` after its final commit).
+    """
+    db.info.setdefault("after_commit", []).append(callback)
+
+
+async def commit_session(db: AsyncSession) -> None:
+    """Commit, then run the side effects queued with `after_commit`."""
+    await db.commit()
+    callbacks = db.info.pop("after_commit", [])
+    for callback in callbacks:
+        await callback()
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency to get database session.
@@ -53,8 +71,9 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
+            await commit_session(session)
         except Exception:
+            session.info.pop("after_commit", None)
             await session.rollback()
             raise
         finally:
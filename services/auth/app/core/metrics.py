@@ -0,0 +1,297 @@
+"""
+Prometheus Metrics
+==================
+Application and security metrics for the Auth Service.
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# ============================================================================
+# TOKEN REVOCATION CACHE
+# ============================================================================
+
+revocation_cache_hits_total = Counter(
+    "auth_revocation_cache_hits_total",
+    "Access token validations answered by the in-process revocation cache",
+    ["result"],  # result: allow, deny
+)
+
+revocation_cache_misses_total = Counter(
+    "auth_revocation_cache_misses_total",
+    "Access token validations that required a Redis round trip",
+)
+
+revocation_cache_invalidations_total = Counter(
+    "auth_revocation_cache_invalidations_total",
+    "JTIs invalidated in the in-process revocation cache",
+    ["source"],  # source: local, pubsub, reset
+)
+
+revocation_cache_size = Gauge(
+    "auth_revocation_cache_size",
+    "Number of JTIs currently held in the in-process revocation cache",
+)
+
+# ============================================================================
+# AUTH PRINCIPAL CACHE
+# ============================================================================
+
+principal_cache_hits_total = Counter(
+    "auth_principal_cache_hits_total",
+    "Auth principal lookups answered from cache",
+    ["layer"],  # layer: local, redis
+)
+
+principal_cache_misses_total = Counter(
+    "auth_principal_cache_misses_total",
+    "Auth principal lookups that loaded the projection from PostgreSQL",
+)
+
+# ============================================================================
+# PASSWORD HASHING
+# ============================================================================
+
+password_hash_duration_seconds = Histogram(
+    "auth_password_hash_duration_seconds",
+    "bcrypt operation latency including executor queue wait",
+    ["operation"],  # operation: hash, verify
+    buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0],
+)
+
+password_hash_in_flight = Gauge(
+    "auth_password_hash_in_flight",
+    "bcrypt operations currently running on the executor",
+)
+
+password_hash_queue_depth = Gauge(
+    "auth_password_hash_queue_depth",
+    "bcrypt operations waiting for an executor worker",
+)
+
+password_hash_rejected_total = Counter(
+    "auth_password_hash_rejected_total",
+    "bcrypt operations shed because the executor queue was full",
+)
+
+# ============================================================================
+# RATE LIMITING
+# ============================================================================
+
+rate_limit_requests_total = Counter(
+    "auth_rate_limit_requests_total",
+    "Requests checked by the Redis rate limiter",
+    ["scope", "result"],  # scope: endpoint name or api; result: allowed, denied, error
+)
+
+# ============================================================================
+# SESSION ACTIVITY
+# ============================================================================
+
+session_activity_buffer_size = Gauge(
+    "auth_session_activity_buffer_size",
+    "Session touches buffered in this worker before the Redis flush",
+)
+
+session_activity_dropped_total = Counter(
+    "auth_session_activity_dropped_total",
+    "Session touches dropped because the buffer was full",
+)
+
+session_activity_flushed_total = Counter(
+    "auth_session_activity_flushed_total",
+    "Session last_activity_at updates written to PostgreSQL",
+)
+
+session_idle_revocations_total = Counter(
+    "auth_session_idle_revocations_total",
+    "Sessions revoked by the idle timeout",
+)
+
+# ============================================================================
+# RETENTION (REAPER)
+# ============================================================================
+
+reaper_rows_total = Counter(
+    "auth_reaper_rows_total",
+    "Expired rows removed by the reaper",
+    ["table", "action"],  # action: archived, deleted
+)
+
+reaper_partitions_total = Counter(
+    "auth_reaper_partitions_total",
+    "Session partitions managed by the reaper",
+    ["action"],  # action: created, archived, dropped
+)
+
+# ============================================================================
+# REDIS CLIENT
+# ============================================================================
+
+redis_command_duration_seconds = Histogram(
+    "auth_redis_command_duration_seconds",
+    "Redis command latency as seen by the client (including pool wait)",
+    ["command"],
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 2.5],
+)
+
+redis_command_errors_total = Counter(
+    "auth_redis_command_errors_total",
+    "Redis commands that failed or were not attempted",
+    ["command", "reason"],  # reason: error, timeout, circuit_open, not_connected
+)
+
+redis_circuit_open = Gauge(
+    "auth_redis_circuit_open",
+    "Whether the Redis circuit breaker is open (1) or closed (0)",
+)
+
+# ============================================================================
+# REDIS CLIENT-SIDE CACHE
+# ============================================================================
+
+client_cache_hits_total = Counter(
+    "auth_client_cache_hits_total",
+    "Redis reads answered from the in-process client-side cache",
+)
+
+client_cache_misses_total = Counter(
+    "auth_client_cache_misses_total",
+    "Redis reads of cacheable keys that required a Redis round trip",
+)
+
+client_cache_hit_ratio = Gauge(
+    "auth_client_cache_hit_ratio",
+    "Hit ratio of the client-side cache since process start",
+)
+
+client_cache_bytes = Gauge(
+    "auth_client_cache_bytes",
+    "Approximate memory held by the client-side cache",
+)
+
+client_cache_evictions_total = Counter(
+    "auth_client_cache_evictions_total",
+    "Client-side cache entries evicted to stay under the memory cap",
+)
+
+client_cache_invalidations_total = Counter(
+    "auth_client_cache_invalidations_total",
+    "Client-side cache entries invalidated",
+    ["source"],  # source: local, tracking, pubsub, reset
+)
+
+# ============================================================================
+# DEPENDENCY HEALTH
+# ============================================================================
+
+dependency_up = Gauge(
+    "auth_dependency_up",
+    "Whether the last health probe of a dependency succeeded",
+    ["dependency"],  # dependency: database, redis, vault
+)
+
+dependency_probe_duration_seconds = Histogram(
+    "auth_dependency_probe_duration_seconds",
+    "Health probe latency per dependency",
+    ["dependency"],
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
+)
+
+
+# ============================================================================
+# EVENT PUBLISHING (RABBITMQ)
+# ============================================================================
+
+events_published_total = Counter(
+    "auth_events_published_total",
+    "Events handed to RabbitMQ, by outcome",
+    ["result"],  # result: confirmed, retried, failed, dropped
+)
+
+event_buffer_size = Gauge(
+    "auth_event_buffer_size",
+    "Events waiting in the local publish buffer",
+)
+
+events_in_flight = Gauge(
+    "auth_events_in_flight",
+    "Published events awaiting a broker confirm",
+)
+
+event_confirm_duration_seconds = Histogram(
+    "auth_event_confirm_duration_seconds",
+    "Time from publish to broker confirm",
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0],
+)
+
+event_batch_size = Histogram(
+    "auth_event_batch_size",
+    "Events published per micro-batch",
+    buckets=[1, 2, 5, 10, 25, 50, 100, 250, 500],
+)
+
+
+# ============================================================================
+# TRANSACTIONAL OUTBOX
+# ============================================================================
+
+outbox_events_relayed_total = Counter(
+    "auth_outbox_events_relayed_total",
+    "Outbox rows handled by the relay, by outcome",
+    ["result"],  # result: delivered, failed, deferred
+)
+
+outbox_relay_lag_seconds = Histogram(
+    "auth_outbox_relay_lag_seconds",
+    "Time from outbox commit to broker confirm",
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 30.0, 300.0],
+)
+
+
+# ============================================================================
+# HELPER FUNCTIONS
+# ============================================================================
+
+
+def initialize_metrics() -> None:
+    """
+    Initialize all metrics with default values to ensure they are exported.
+
+    This function should be called at application startup to register
+    all metrics with the Prometheus client, even if they have no data yet.
+    """
+    revocation_cache_hits_total.labels(result="allow").inc(0)
+    revocation_cache_hits_total.labels(result="deny").inc(0)
+    revocation_cache_misses_total.inc(0)
+    revocation_cache_invalidations_total.labels(source="local").inc(0)
+    revocation_cache_invalidations_total.labels(source="pubsub").inc(0)
+    revocation_cache_invalidations_total.labels(source="reset").inc(0)
+    revocation_cache_size.set(0)
+    principal_cache_hits_total.labels(layer="local").inc(0)
+    principal_cache_hits_total.labels(layer="redis").inc(0)
+    principal_cache_misses_total.inc(0)
+    password_hash_in_flight.set(0)
+    password_hash_queue_depth.set(0)
+    password_hash_rejected_total.inc(0)
+    session_activity_buffer_size.set(0)
+    session_activity_dropped_total.inc(0)
+    session_activity_flushed_total.inc(0)
+    session_idle_revocations_total.inc(0)
+    for action in ("created", "archived", "dropped"):
+        reaper_partitions_total.labels(action=action).inc(0)
+    redis_circuit_open.set(0)
+    client_cache_hits_total.inc(0)
+    client_cache_misses_total.inc(0)
+    client_cache_hit_ratio.set(0)
+    client_cache_bytes.set(0)
+    client_cache_evictions_total.inc(0)
+    for source in ("local", "tracking", "pubsub", "reset"):
+        client_cache_invalidations_total.labels(source=source).inc(0)
+    for dependency in ("database", "redis", "vault"):
+        dependency_up.labels(dependency=dependency).set(0)
+    for result in ("confirmed", "retried", "failed", "dropped"):
+        events_published_total.labels(result=result).inc(0)
+    event_buffer_size.set(0)
+    events_in_flight.set(0)
+    for result in ("delivered", "failed", "deferred"):
+        outbox_events_relayed_total.labels(result=result).inc(0)
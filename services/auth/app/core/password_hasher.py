@@ -0,0 +1,155 @@
+"""
+Async Password Hashing
+======================
+Runs bcrypt on a bounded executor so hashing never blocks the event loop
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import (
+    password_hash_duration_seconds,
+    password_hash_in_flight,
+    password_hash_queue_depth,
+    password_hash_rejected_total,
+)
+from app.core.security import get_password_hash, verify_and_update_password, verify_password
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherOverloaded(Exception):
+    """Raised when the hashing queue is full and the request is shed."""
+
+
+class PasswordHasher:
+    """
+    Bounded executor for bcrypt operations.
+
+    - At most `workers` hashes run concurrently (threads by default: the
+      bcrypt C extension releases the GIL; "process" isolates CPU entirely)
+    - At most `max_queue` more wait for a worker; beyond that calls fail fast
+      with PasswordHasherOverloaded instead of piling up latency
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.PASSWORD_HASH_WORKERS,
+        max_queue: int = settings.PASSWORD_HASH_MAX_QUEUE,
+        executor: str = settings.PASSWORD_HASH_EXECUTOR,
+    ):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unsupported password hash executor: {executor}")
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor_type = executor
+
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Operations running or waiting for a worker."""
+        return self._pending
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password.
+
+        Args:
+            password: Plain text password
+
+        Returns:
+            Hashed password
+
+        Raises:
+            PasswordHasherOverloaded: If the queue is full
+        """
+        return await self._run("hash", get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Verify a password.
+
+        Args:
+            plain_password: Plain text password
+            hashed_password: Hashed password from database
+
+        Returns:
+            True if password matches
+
+        Raises:
+            PasswordHasherOverloaded: If the queue is full
+        """
+        return await self._run("verify", verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and rehash it if the cost parameters changed.
+
+        Args:
+            plain_password: Plain text password
+            hashed_password: Hashed password from database
+
+        Returns:
+            (True if password matches, new hash to store or None)
+
+        Raises:
+            PasswordHasherOverloaded: If the queue is full
+        """
+        return await self._run(
+            "verify", verify_and_update_password, plain_password, hashed_password
+        )
+
+    def shutdown(self) -> None:
+        """Stop the executor (waits for running operations)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def _run(self, operation: str, func: Callable[..., Any], *args: Any) -> Any:
+        """Submit an operation, shedding load when the queue is full."""
+        if self._pending >= self.workers + self.max_queue:
+            password_hash_rejected_total.inc()
+            logger.warning(f"Password hashing overloaded ({self._pending} pending), shedding")
+            raise PasswordHasherOverloaded("Password hashing capacity exceeded")
+
+        self._pending += 1
+        self._update_gauges()
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._pending -= 1
+            self._update_gauges()
+            password_hash_duration_seconds.labels(operation=operation).observe(
+                time.perf_counter() - start
+            )
+
+    def _get_executor(self) -> Executor:
+        """Create the executor on first use."""
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+            logger.info(f"Password hasher started ({self.workers} {self.executor_type} workers)")
+        return self._executor
+
+    def _update_gauges(self) -> None:
+        """Export running and queued operation counts."""
+        password_hash_in_flight.set(min(self._pending, self.workers))
+        password_hash_queue_depth.set(max(self._pending - self.workers, 0))
+
+
+# Global hasher instance
+password_hasher = PasswordHasher()
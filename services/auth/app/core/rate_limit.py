@@ -1,23 +1,123 @@
 """
-Rate limiting utilities using slowapi
+Rate limiting utilities backed by Redis (GCRA), shared by every worker and replica
 """
 
+import logging
+import math
+import re
 from functools import wraps
-from typing import Callable
+from typing import Any, Callable, Optional, Sequence, Tuple
 
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from app.core.config import settings
+from app.core.metrics import rate_limit_requests_total
+from app.core.redis import redis_client
+from fastapi import HTTPException, Request, status
 
-# Create limiter instance
-limiter = Limiter(key_func=get_remote_address)
+logger = logging.getLogger(__name__)
 
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_LIMIT_PATTERN = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(\d*)\s*(second|minute|hour|day)s?\s*$")
 
-def rate_limit(limit: str):
+
+def parse_rate_limit(limit: str) -> Tuple[int, int]:
+    """
+    Parse a rate limit string
+
+    Args:
+        limit: Rate limit (e.g., "5/minute", "10/5minutes", "100 per hour")
+
+    Returns:
+        (max requests, window in seconds)
+    """
+    match = _LIMIT_PATTERN.match(limit.lower())
+    if not match:
+        raise ValueError(f"Invalid rate limit: {limit}")
+    count, multiplier, period = match.groups()
+    return int(count), int(multiplier or 1) * _PERIODS[period]
+
+
+class RateLimiter:
+    """
+    Redis GCRA rate limiter
+
+    - One key (a single timestamp) per limited identity, so memory is bounded
+      and counters are shared across workers and replicas
+    - Keys compose the scope (endpoint or "api") with the client IP and/or user
+    - If Redis is unavailable requests are allowed (logged and counted as errors)
+    """
+
+    KEY_PREFIX = "ratelimit"
+
+    def __init__(self, enabled: bool = settings.RATE_LIMIT_ENABLED):
+        self.enabled = enabled
+
+    async def hit(
+        self, scope: str, identity: Sequence[str], limit: int, window_seconds: int
+    ) -> None:
+        """
+        Count a request and reject it if over the limit
+
+        Args:
+            scope: Limit scope (endpoint name or "api")
+            identity: Key parts identifying the caller (IP, user ID)
+            limit: Max requests per window
+            window_seconds: Window length
+
+        Raises:
+            HTTPException: 429 with Retry-After if the limit is exceeded
+        """
+        if not self.enabled:
+            return
+
+        key = ":".join([self.KEY_PREFIX, scope, *identity])
+        result = await redis_client.gcra_hit(key, limit, window_seconds)
+        if result is None:
+            rate_limit_requests_total.labels(scope=scope, result="error").inc()
+            logger.warning(f"Rate limiter unavailable, allowing request ({scope})")
+            return
+
+        allowed, remaining, retry_after = result
+        if allowed:
+            rate_limit_requests_total.labels(scope=scope, result="allowed").inc()
+            return
+
+        rate_limit_requests_total.labels(scope=scope, result="denied").inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={
+                "Retry-After": str(max(math.ceil(retry_after), 1)),
+                "X-RateLimit-Limit": str(limit),
+                "X-RateLimit-Remaining": str(remaining),
+            },
+        )
+
+    async def hit_user(self, user_id: Any, override: Optional[int] = None) -> None:
+        """
+        Apply the per-user API limit (requests per minute)
+
+        Args:
+            user_id: Authenticated user ID
+            override: User.api_rate_limit_override, if set
+        """
+        limit = override or settings.RATE_LIMIT_PER_MINUTE_AUTHENTICATED
+        await self.hit("api", [f"user:{user_id}"], limit, 60)
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter()
+
+
+def rate_limit(limit: str, key: Sequence[str] = ("ip", "user")):
     """
     Rate limit decorator for endpoints
 
+    The endpoint must accept `request: Request`; "user" is taken from a
+    `current_user` argument when the endpoint has one.
+
     Args:
         limit: Rate limit string (e.g., "5/minute", "100/hour")
+        key: Composite key parts ("ip", "user")
 
     Usage:
         @router.post("/login")
@@ -25,13 +125,24 @@ def rate_limit(limit: str):
         async def login(...):
             ...
     """
+    max_requests, window_seconds = parse_rate_limit(limit)
 
     def decorator(func: Callable):
+        scope = func.__name__
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
+            identity = []
+            request = kwargs.get("request")
+            if "ip" in key and isinstance(request, Request) and request.client:
+                identity.append(f"ip:{request.client.host}")
+            current_user = kwargs.get("current_user")
+            if "user" in key and current_user is not None:
+                identity.append(f"user:{current_user.id}")
+
+            await rate_limiter.hit(scope, identity, max_requests, window_seconds)
             return await func(*args, **kwargs)
 
-        # Apply rate limit using slowapi
-        return limiter.limit(limit)(wrapper)
+        return wrapper
 
     return decorator
@@ -2,114 +2,760 @@
 Redis client configuration and utilities
 """
 
+import asyncio
+import json
 import logging
-from typing import Optional
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
 
 import redis.asyncio as redis
+from app.core.client_cache import ClientSideCache
 from app.core.config import settings
+from app.core.metrics import (
+    redis_circuit_open,
+    redis_command_duration_seconds,
+    redis_command_errors_total,
+)
+from redis.asyncio.connection import _AsyncHiredisParser, _AsyncRESP2Parser
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import RedisError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+from redis.utils import HIREDIS_AVAILABLE
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Session key layout (shared with JWTService)
+SESSION_ACCESS_KEY = "session:access:{}"
+SESSION_REFRESH_KEY = "session:refresh:{}"
+BLACKLIST_ACCESS_KEY = "blacklist:access:{}"
+BLACKLIST_REFRESH_KEY = "blacklist:refresh:{}"
+SESSION_EPOCH_KEY = "session_epoch:{}"
+SESSION_ACTIVITY_KEY = "session_activity"  # access jti -> last activity (unix seconds)
+SESSION_ACTIVITY_DIRTY_KEY = "session_activity:dirty"  # touches not yet in PostgreSQL
+
+# KEYS: access, refresh, blacklist access, blacklist refresh
+# ARGV: blacklist ttl
+REVOKE_SESSION_SCRIPT = """
+local removed = redis.call('DEL', KEYS[1], KEYS[2])
+redis.call('SET', KEYS[3], 'revoked', 'EX', ARGV[1])
+redis.call('SET', KEYS[4], 'revoked', 'EX', ARGV[1])
+return removed
+"""
+
+# KEYS: old refresh, old access, old blacklist access, old blacklist refresh,
+#       new access, new refresh, user session epoch
+# ARGV: user id, access ttl, refresh ttl, blacklist ttl, token session epoch
+# The old refresh key is consumed only if it still belongs to the user and the
+# user's session epoch has not moved past the token's, so concurrent refreshes
+# with the same token cannot both succeed.
+ROTATE_REFRESH_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+if tonumber(redis.call('GET', KEYS[7]) or '0') > tonumber(ARGV[5]) then
+    return 0
+end
+redis.call('DEL', KEYS[1], KEYS[2])
+redis.call('SET', KEYS[3], 'revoked', 'EX', ARGV[4])
+redis.call('SET', KEYS[4], 'revoked', 'EX', ARGV[4])
+redis.call('SET', KEYS[5], ARGV[1], 'EX', ARGV[2])
+redis.call('SET', KEYS[6], ARGV[1], 'EX', ARGV[3])
+return 1
+"""
+
+# KEYS: sliding window counters (sorted sets of event timestamps)
+# ARGV: window ms, event member
+# Records one event in every counter and returns the counts within the window.
+SLIDING_WINDOW_HIT_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local counts = {}
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - tonumber(ARGV[1]))
+    redis.call('ZADD', key, now, ARGV[2])
+    redis.call('PEXPIRE', key, ARGV[1])
+    counts[i] = redis.call('ZCARD', key)
+end
+return counts
+"""
+
+# KEYS: sliding window counter
+# ARGV: window ms
+SLIDING_WINDOW_COUNT_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[1]))
+return redis.call('ZCARD', KEYS[1])
+"""
+
+# KEYS: rate limit key
+# ARGV: emission interval ms, burst (max requests per window)
+# Generic Cell Rate Algorithm: one timestamp (theoretical arrival time) per key.
+# Returns {allowed, remaining, retry after ms}.
+GCRA_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now)
+local new_tat = tat + interval
+local allow_at = new_tat - interval * burst
+if allow_at > now then
+    return {0, 0, allow_at - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {1, math.floor((now - allow_at) / interval), 0}
+"""
+
+# KEYS: sorted set
+# ARGV: max score, count
+# Removes and returns up to `count` members scored <= max score, so concurrent
+# callers never receive the same member.
+POP_BY_SCORE_SCRIPT = """
+local members = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, ARGV[2])
+for i = 1, #members, 2 do
+    redis.call('ZREM', KEYS[1], members[i])
+end
+return members
+"""
+
+
+class RedisUnavailable(Exception):
+    """Redis could not answer (not connected, circuit open, connection error or timeout)"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    Closed: calls go through. After `failure_threshold` consecutive failures
+    it opens and calls fail fast for `reset_timeout` seconds; then calls are
+    let through again (half-open) and the first outcome closes or re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """closed, open or half_open"""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted"""
+        return self.state != "open"
+
+    def record_success(self) -> None:
+        """Close the circuit"""
+        if self._opened_at is not None:
+            logger.info("Redis circuit closed")
+            redis_circuit_open.set(0)
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        """Count a failure, opening (or re-opening) the circuit at the threshold"""
+        self._failures += 1
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            if self._opened_at is None:
+                logger.error(f"Redis circuit opened after {self._failures} consecutive failures")
+            self._opened_at = time.monotonic()
+            redis_circuit_open.set(1)
+
+
+def _parser_class() -> Optional[type]:
+    """Response parser selected by REDIS_PARSER (None keeps redis-py's default)"""
+    if settings.REDIS_PARSER == "hiredis":
+        if HIREDIS_AVAILABLE:
+            return _AsyncHiredisParser
+        logger.warning("REDIS_PARSER=hiredis but hiredis is not installed, using Python parser")
+        return _AsyncRESP2Parser
+    if settings.REDIS_PARSER == "python":
+        return _AsyncRESP2Parser
+    return None
+
 
 class RedisClient:
-    """Redis async client wrapper"""
+    """
+    Redis async client wrapper
+
+    - Connection pool sized by REDIS_MAX_CONNECTIONS with socket timeouts
+    - Every command goes through a circuit breaker and records latency and
+      errors in Prometheus
+    - Convenience methods return None/False/empty on failure; pass
+      `strict=True` (or use the session primitives used for authorization)
+      to get RedisUnavailable instead, so "missing" and "down" differ
+    - Reads of keys under CLIENT_CACHE_PREFIXES are served from the
+      client-side cache while its invalidation listener is connected
+    """
 
     def __init__(self):
         self._client: Optional[redis.Redis] = None
+        self._scripts: Dict[str, Any] = {}
+        self._breaker = CircuitBreaker(
+            settings.REDIS_CIRCUIT_FAILURE_THRESHOLD, settings.REDIS_CIRCUIT_RESET_SECONDS
+        )
+        self.client_cache = ClientSideCache()
 
     async def connect(self):
         """Establish Redis connection"""
         try:
-            self._client = await redis.from_url(
-                settings.REDIS_URL,
-                encoding="utf-8",
-                decode_responses=True,
-                max_connections=10,
-            )
+            pool_options = {
+                "encoding": "utf-8",
+                "decode_responses": True,
+                "max_connections": settings.REDIS_MAX_CONNECTIONS,
+                "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+                "socket_connect_timeout": settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+                "health_check_interval": settings.REDIS_HEALTH_CHECK_INTERVAL,
+            }
+            parser_class = _parser_class()
+            if parser_class is not None:
+                pool_options["parser_class"] = parser_class
+            pool = redis.ConnectionPool.from_url(settings.REDIS_URL, **pool_options)
+            self._client = redis.Redis(connection_pool=pool)
+            self._scripts = {}
             # Test connection
             await self._client.ping()
-            logger.info("Redis connection established")
+            logger.info(
+                f"Redis connection established (max_connections="
+                f"{settings.REDIS_MAX_CONNECTIONS}, hiredis={HIREDIS_AVAILABLE})"
+            )
+            await self.client_cache.start(self)
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
 
     async def disconnect(self):
         """Close Redis connection"""
+        await self.client_cache.stop()
         if self._client:
             await self._client.close()
             logger.info("Redis connection closed")
 
-    async def get(self, key: str) -> Optional[str]:
-        """Get value from Redis"""
-        if not self._client:
-            return None
+    @property
+    def circuit_state(self) -> str:
+        """Circuit breaker state (closed, open, half_open)"""
+        return self._breaker.state
+
+    async def execute(self, command: str, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a Redis call through the circuit breaker with metrics.
+
+        Args:
+            command: Command name for metrics and logs
+            call: Zero-argument coroutine factory issuing the call
+
+        Returns:
+            Call result
+
+        Raises:
+            RedisUnavailable: If Redis is not connected, the circuit is open,
+                or the call failed
+        """
+        if self._client is None:
+            redis_command_errors_total.labels(command=command, reason="not_connected").inc()
+            raise RedisUnavailable("Redis not connected")
+        if not self._breaker.allow():
+            redis_command_errors_total.labels(command=command, reason="circuit_open").inc()
+            raise RedisUnavailable("Redis circuit open")
+
+        start = time.perf_counter()
         try:
-            return await self._client.get(key)
-        except Exception as e:
-            logger.error(f"Redis GET error: {e}")
-            return None
+            result = await call()
+        except (RedisConnectionError, RedisTimeoutError, OSError, asyncio.TimeoutError) as e:
+            # Availability failures trip the breaker
+            self._breaker.record_failure()
+            reason = (
+                "timeout" if isinstance(e, (RedisTimeoutError, asyncio.TimeoutError)) else "error"
+            )
+            redis_command_errors_total.labels(command=command, reason=reason).inc()
+            raise RedisUnavailable(f"Redis {command} failed: {e}") from e
+        except RedisError as e:
+            # Command errors (e.g. WRONGTYPE) mean Redis is up
+            self._breaker.record_success()
+            redis_command_errors_total.labels(command=command, reason="error").inc()
+            raise RedisUnavailable(f"Redis {command} failed: {e}") from e
+        finally:
+            redis_command_duration_seconds.labels(command=command).observe(
+                time.perf_counter() - start
+            )
 
-    async def set(self, key: str, value: str, expire: int = None) -> bool:
-        """Set value in Redis with optional expiration"""
-        if not self._client:
-            return False
+        self._breaker.record_success()
+        return result
+
+    async def _safe(
+        self, command: str, call: Callable[[], Awaitable[T]], default: T, strict: bool = False
+    ) -> T:
+        """Run `execute`, returning `default` on failure unless strict"""
         try:
+            return await self.execute(command, call)
+        except RedisUnavailable as e:
+            if strict:
+                raise
+            if self._client is not None and self._breaker.state == "open":
+                logger.debug(str(e))
+            else:
+                logger.error(str(e))
+            return default
+
+    async def get(self, key: str, strict: bool = False) -> Optional[str]:
+        """Get value from Redis (None if missing; raises RedisUnavailable if strict)"""
+        if self.client_cache.covers(key):
+            return (await self._cached_mget([key], strict))[0]
+        return await self._safe("get", lambda: self._client.get(key), None, strict)
+
+    async def mget(self, keys: Sequence[str], strict: bool = False) -> List[Optional[str]]:
+        """Get many values in one round trip (None per missing key)"""
+        if not keys:
+            return []
+        if any(self.client_cache.covers(key) for key in keys):
+            return await self._cached_mget(keys, strict)
+        return await self._safe(
+            "mget", lambda: self._client.mget(list(keys)), [None] * len(keys), strict
+        )
+
+    async def _cached_mget(self, keys: Sequence[str], strict: bool) -> List[Optional[str]]:
+        """Read keys through the client-side cache, fetching only the misses"""
+        values: List[Optional[str]] = [None] * len(keys)
+        missing = []
+        for index, key in enumerate(keys):
+            hit, value = self.client_cache.lookup(key)
+            if hit:
+                values[index] = value
+            else:
+                missing.append(index)
+        if not missing:
+            return values
+
+        missing_keys = [keys[index] for index in missing]
+        read = self.client_cache.begin_read(missing_keys)
+        loaded = None
+        try:
+            loaded = await self._safe(
+                "mget" if len(missing_keys) > 1 else "get",
+                lambda: self._client.mget(missing_keys),
+                None,
+                strict,
+            )
+        finally:
+            self.client_cache.finish_read(missing_keys, read, loaded)
+
+        for index, value in zip(missing, loaded or [None] * len(missing)):
+            values[index] = value
+        return values
+
+    async def _invalidate(self, keys: Sequence[str]) -> None:
+        """Drop written keys from the client-side cache of every replica"""
+        keys = [key for key in keys if self.client_cache.covers(key)]
+        if not keys:
+            return
+        self.client_cache.invalidate(keys, source="local")
+        if self.client_cache.broadcasts_writes:
+            await self.publish(self.client_cache.channel, json.dumps(keys))
+
+    async def set(self, key: str, value: str, expire: int = None, strict: bool = False) -> bool:
+        """Set value in Redis with optional expiration"""
+
+        async def call():
             if expire:
                 await self._client.setex(key, expire, value)
             else:
                 await self._client.set(key, value)
             return True
-        except Exception as e:
-            logger.error(f"Redis SET error: {e}")
-            return False
+
+        try:
+            return await self._safe("set", call, False, strict)
+        finally:
+            await self._invalidate([key])
+
+    async def mset(self, mapping: Dict[str, str], expire: int = None, strict: bool = False) -> bool:
+        """Set many values in one round trip (MSET, or pipelined SET EX with expiration)"""
+        if not mapping:
+            return True
+
+        def commands(pipe):
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=expire)
+
+        try:
+            if not expire:
+                return await self._safe("mset", lambda: self._client.mset(mapping), False, strict)
+            result = await self.execute_pipeline(commands, name="mset", strict=strict)
+            return result is not None
+        finally:
+            await self._invalidate(list(mapping))
 
     async def setex(self, key: str, seconds: int, value: str) -> bool:
         """Set value with expiration in seconds"""
         return await self.set(key, value, expire=seconds)
 
+    async def set_if_absent(self, key: str, value: str, expire: int) -> bool:
+        """Set value with expiration only if the key does not exist (SET NX)"""
+        result = await self._safe(
+            "set_nx", lambda: self._client.set(key, value, ex=expire, nx=True), False
+        )
+        if result:
+            await self._invalidate([key])
+        return bool(result)
+
     async def ping(self) -> bool:
         """Ping Redis to check connection"""
         if not self._client:
             await self.connect()
-        try:
-            await self._client.ping()
-            return True
-        except Exception as e:
-            logger.error(f"Redis PING error: {e}")
-            return False
+        return await self._safe("ping", self._client.ping, False)
 
     async def delete(self, key: str) -> bool:
         """Delete key from Redis"""
-        if not self._client:
-            return False
-        try:
+
+        async def call():
             await self._client.delete(key)
             return True
-        except Exception as e:
-            logger.error(f"Redis DELETE error: {e}")
-            return False
 
-    async def exists(self, key: str) -> bool:
-        """Check if key exists in Redis"""
-        if not self._client:
-            return False
         try:
+            return await self._safe("delete", call, False)
+        finally:
+            await self._invalidate([key])
+
+    async def exists(self, key: str, strict: bool = False) -> bool:
+        """Check if key exists in Redis"""
+
+        async def call():
             return await self._client.exists(key) > 0
-        except Exception as e:
-            logger.error(f"Redis EXISTS error: {e}")
-            return False
+
+        return await self._safe("exists", call, False, strict)
 
     async def expire(self, key: str, seconds: int) -> bool:
         """Set expiration on key"""
+
+        async def call():
+            await self._client.expire(key, seconds)
+            return True
+
+        return await self._safe("expire", call, False)
+
+    async def publish(self, channel: str, message: str) -> int:
+        """Publish message on a pub/sub channel, returns number of receivers"""
+        return await self._safe("publish", lambda: self._client.publish(channel, message), 0)
+
+    def pubsub(self) -> Optional[redis.client.PubSub]:
+        """Get a pub/sub handle bound to the connection pool"""
         if not self._client:
-            return False
+            return None
+        return self._client.pubsub()
+
+    async def acquire_connection(self) -> Optional[redis.Connection]:
+        """
+        Take a connection out of the pool for long-lived use (subscriptions,
+        client tracking). Return it with `release_connection`.
+        """
+        if not self._client:
+            return None
+        return await self._client.connection_pool.get_connection("_")
+
+    async def release_connection(self, connection: redis.Connection) -> None:
+        """Close a connection taken with `acquire_connection` and return it to the pool"""
         try:
-            await self._client.expire(key, seconds)
+            await connection.disconnect()
+        finally:
+            if self._client:
+                await self._client.connection_pool.release(connection)
+
+    def pipeline(self, transaction: bool = True) -> Optional[redis.client.Pipeline]:
+        """
+        Get a pipeline bound to the connection pool.
+
+        Commands queued on the pipeline are sent in one round trip by
+        `execute()`; with `transaction=True` they run atomically (MULTI/EXEC).
+        Prefer `execute_pipeline`, which adds the circuit breaker and metrics.
+        """
+        if not self._client:
+            return None
+        return self._client.pipeline(transaction=transaction)
+
+    async def execute_pipeline(
+        self,
+        commands: Callable[[redis.client.Pipeline], Any],
+        transaction: bool = False,
+        name: str = "pipeline",
+        strict: bool = False,
+    ) -> Optional[List[Any]]:
+        """
+        Queue commands on a pipeline and send them in one round trip.
+
+        Args:
+            commands: Callback queuing commands on the pipeline
+            transaction: Run atomically (MULTI/EXEC)
+            name: Name for metrics and logs
+            strict: Raise RedisUnavailable instead of returning None
+
+        Returns:
+            Command results, or None on failure
+        """
+
+        async def call():
+            pipe = self._client.pipeline(transaction=transaction)
+            commands(pipe)
+            return await pipe.execute()
+
+        return await self._safe(name, call, None, strict)
+
+    async def eval_script(
+        self, script: str, keys: Sequence[str], args: Sequence[Any], strict: bool = False
+    ) -> Optional[Any]:
+        """
+        Run a Lua script atomically.
+
+        Scripts are registered once per connection and invoked with EVALSHA
+        (falling back to EVAL when Redis does not know the script yet).
+        """
+
+        async def call():
+            if script not in self._scripts:
+                self._scripts[script] = self._client.register_script(script)
+            return await self._scripts[script](keys=list(keys), args=list(args))
+
+        return await self._safe("evalsha", call, None, strict)
+
+    async def sliding_window_hit(self, keys: Sequence[str], window_seconds: int) -> List[int]:
+        """
+        Record an event in sliding window counters atomically.
+
+        Returns:
+            Event count within the window per key (zeros on error)
+        """
+        counts = await self.eval_script(
+            SLIDING_WINDOW_HIT_SCRIPT,
+            keys=keys,
+            args=[window_seconds * 1000, uuid.uuid4().hex],
+        )
+        return [int(count) for count in counts] if counts else [0] * len(keys)
+
+    async def sliding_window_count(self, key: str, window_seconds: int) -> int:
+        """Count events within a sliding window (0 on error)"""
+        count = await self.eval_script(
+            SLIDING_WINDOW_COUNT_SCRIPT, keys=[key], args=[window_seconds * 1000]
+        )
+        return int(count or 0)
+
+    async def gcra_hit(
+        self, key: str, limit: int, window_seconds: int
+    ) -> Optional[Tuple[bool, int, float]]:
+        """
+        Count a request against a GCRA rate limit atomically.
+
+        Returns:
+            (allowed, remaining, retry after seconds), or None if Redis is unavailable
+        """
+        interval_ms = max(int(window_seconds * 1000 / limit), 1)
+        result = await self.eval_script(GCRA_SCRIPT, keys=[key], args=[interval_ms, limit])
+        if not result:
+            return None
+        allowed, remaining, retry_after_ms = result
+        return bool(allowed), int(remaining), int(retry_after_ms) / 1000
+
+    # ========================================================================
+    # SESSION PRIMITIVES (one round trip each)
+    # ========================================================================
+
+    async def store_session(
+        self,
+        access_jti: str,
+        refresh_jti: str,
+        user_id: str,
+        access_ttl: int,
+        refresh_ttl: int,
+    ) -> bool:
+        """Store access and refresh keys of a new session in one transaction"""
+
+        def commands(pipe):
+            pipe.set(SESSION_ACCESS_KEY.format(access_jti), user_id, ex=access_ttl)
+            pipe.set(SESSION_REFRESH_KEY.format(refresh_jti), user_id, ex=refresh_ttl)
+
+        result = await self.execute_pipeline(commands, transaction=True, name="store_session")
+        return result is not None
+
+    async def revoke_session(self, access_jti: str, refresh_jti: str, blacklist_ttl: int) -> bool:
+        """Remove session keys and blacklist both tokens atomically"""
+        result = await self.eval_script(
+            REVOKE_SESSION_SCRIPT,
+            keys=self._session_keys(access_jti, refresh_jti),
+            args=[blacklist_ttl],
+        )
+        return result is not None
+
+    async def revoke_sessions(
+        self,
+        token_pairs: Sequence[Tuple[str, str]],
+        blacklist_ttl: int,
+        batch_size: int = 500,
+        strict: bool = False,
+    ) -> bool:
+        """
+        Remove and blacklist many sessions with pipelined batches.
+
+        Args:
+            token_pairs: (access_jti, refresh_jti) of each session
+            blacklist_ttl: Blacklist entry lifetime in seconds
+            batch_size: Sessions per round trip
+            strict: Raise RedisUnavailable instead of returning False
+        """
+
+        async def call():
+            # One pipeline, flushed once per batch
+            pipe = self._client.pipeline(transaction=False)
+            for start in range(0, len(token_pairs), batch_size):
+                for access_jti, refresh_jti in token_pairs[start : start + batch_size]:
+                    access, refresh, blacklist_access, blacklist_refresh = self._session_keys(
+                        access_jti, refresh_jti
+                    )
+                    pipe.delete(access, refresh)
+                    pipe.set(blacklist_access, "revoked", ex=blacklist_ttl)
+                    pipe.set(blacklist_refresh, "revoked", ex=blacklist_ttl)
+                await pipe.execute()
             return True
-        except Exception as e:
-            logger.error(f"Redis EXPIRE error: {e}")
+
+        return await self._safe("revoke_sessions", call, False, strict)
+
+    async def rotate_refresh_token(
+        self,
+        old_access_jti: str,
+        old_refresh_jti: str,
+        new_access_jti: str,
+        new_refresh_jti: str,
+        user_id: str,
+        access_ttl: int,
+        refresh_ttl: int,
+        blacklist_ttl: int,
+        session_epoch: int = 0,
+        strict: bool = False,
+    ) -> bool:
+        """
+        Consume a refresh token and store its replacement atomically.
+
+        Returns False if the refresh token was already used or revoked, in
+        which case nothing is written. If Redis is unavailable it also returns
+        False, or raises RedisUnavailable when `strict`.
+        """
+        old_access, old_refresh, old_blacklist_access, old_blacklist_refresh = self._session_keys(
+            old_access_jti, old_refresh_jti
+        )
+        result = await self.eval_script(
+            ROTATE_REFRESH_SCRIPT,
+            keys=[
+                old_refresh,
+                old_access,
+                old_blacklist_access,
+                old_blacklist_refresh,
+                SESSION_ACCESS_KEY.format(new_access_jti),
+                SESSION_REFRESH_KEY.format(new_refresh_jti),
+                SESSION_EPOCH_KEY.format(user_id),
+            ],
+            args=[user_id, access_ttl, refresh_ttl, blacklist_ttl, session_epoch],
+            strict=strict,
+        )
+        return result == 1
+
+    async def check_session(self, access_jti: str, user_id: str) -> Tuple[bool, int]:
+        """
+        Check an access token session and read the user's session epoch.
+
+        Returns:
+            (session exists, current session epoch)
+
+        Raises:
+            RedisUnavailable: If Redis cannot answer (a missing session is not
+                an error, so callers can tell "revoked" from "down")
+        """
+
+        def commands(pipe):
+            pipe.exists(SESSION_ACCESS_KEY.format(access_jti))
+            pipe.get(SESSION_EPOCH_KEY.format(user_id))
+
+        exists, epoch = await self.execute_pipeline(commands, name="check_session", strict=True)
+        return exists > 0, int(epoch or 0)
+
+    async def get_session_epoch(self, user_id: str, strict: bool = False) -> int:
+        """Get the user's session epoch (0 if never bumped)"""
+        value = await self.get(SESSION_EPOCH_KEY.format(user_id), strict=strict)
+        try:
+            return int(value or 0)
+        except ValueError:
+            return 0
+
+    async def bump_session_epochs(self, user_ids: Sequence[str]) -> Dict[str, int]:
+        """
+        Increment session epochs, invalidating every token issued before.
+
+        Epoch keys never expire: a reset counter would let tokens carrying a
+        higher epoch outlive the next bump.
+
+        Returns:
+            New epoch per user ID
+
+        Raises:
+            RedisUnavailable: If the epochs could not be bumped (a silent
+                failure would leave every token of the users valid)
+        """
+        if not user_ids:
+            return {}
+
+        def commands(pipe):
+            for user_id in user_ids:
+                pipe.incr(SESSION_EPOCH_KEY.format(user_id))
+
+        epochs = await self.execute_pipeline(commands, name="bump_session_epochs", strict=True)
+        return dict(zip(user_ids, epochs))
+
+    async def record_session_activity(self, touches: Dict[str, float]) -> bool:
+        """
+        Record last activity per access token JTI (only moves forward)
+
+        Args:
+            touches: Access JTI -> activity time (unix seconds)
+        """
+        if not touches:
             return False
 
+        def commands(pipe):
+            pipe.zadd(SESSION_ACTIVITY_KEY, touches, gt=True)
+            pipe.zadd(SESSION_ACTIVITY_DIRTY_KEY, touches, gt=True)
+
+        result = await self.execute_pipeline(commands, name="record_session_activity")
+        return result is not None
+
+    async def pop_dirty_session_activity(self, count: int) -> List[Tuple[str, float]]:
+        """Take up to `count` activity updates not yet written to PostgreSQL"""
+        return await self._safe(
+            "zpopmin", lambda: self._client.zpopmin(SESSION_ACTIVITY_DIRTY_KEY, count), []
+        )
+
+    async def pop_idle_sessions(self, idle_before: float, count: int) -> List[str]:
+        """Take up to `count` access JTIs with no activity since `idle_before`"""
+        members = await self.eval_script(
+            POP_BY_SCORE_SCRIPT, keys=[SESSION_ACTIVITY_KEY], args=[idle_before, count]
+        )
+        return list(members[::2]) if members else []
+
+    @staticmethod
+    def _session_keys(access_jti: str, refresh_jti: str) -> List[str]:
+        """Session and blacklist keys of a token pair"""
+        return [
+            SESSION_ACCESS_KEY.format(access_jti),
+            SESSION_REFRESH_KEY.format(refresh_jti),
+            BLACKLIST_ACCESS_KEY.format(access_jti),
+            BLACKLIST_REFRESH_KEY.format(refresh_jti),
+        ]
+
 
 # Global Redis client instance
 redis_client = RedisClient()
@@ -4,14 +4,17 @@ Security utilities for password hashing, token generation, and verification
 
 import secrets
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from app.core.config import settings
+from app.core.signing_keys import signing_keys
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context (hashes with a different cost are upgraded on login)
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
 
 def get_password_hash(password: str) -> str:
@@ -41,6 +44,22 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it if the hash uses outdated parameters
+
+    Args:
+        plain_password: Plain text password
+        hashed_password: Hashed password from database
+
+    Returns:
+        (True if password matches, new hash to store or None)
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def generate_verification_token() -> str:
     """
     Generate a random verification token
@@ -63,7 +82,10 @@ def verify_token(token: str, token_type: str = "access") -> Optional[Dict[str, A
         Decoded token payload if valid, None otherwise
     """
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        if settings.ALGORITHM.startswith("HS"):
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        else:
+            payload = signing_keys.decode(token)
 
         # Check token type
         if payload.get("type") != token_type:
@@ -94,9 +116,7 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
 
     to_encode.update({"exp": expire, "type": "access"})
 
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-
-    return encoded_jwt
+    return _encode_jwt(to_encode)
 
 
 def create_refresh_token(data: Dict[str, Any]) -> str:
@@ -114,6 +134,19 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
 
     to_encode.update({"exp": expire, "type": "refresh"})
 
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return _encode_jwt(to_encode)
+
 
-    return encoded_jwt
+def _encode_jwt(payload: Dict[str, Any]) -> str:
+    """
+    Sign a JWT with the configured algorithm
+
+    Args:
+        payload: Claims to encode
+
+    Returns:
+        Encoded JWT token
+    """
+    if settings.ALGORITHM.startswith("HS"):
+        return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return signing_keys.encode(payload)
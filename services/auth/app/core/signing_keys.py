@@ -0,0 +1,165 @@
+"""
+Asymmetric JWT signing keys
+===========================
+Private keys used to sign access/refresh tokens and the public JWKS that
+other services use to verify them locally
+"""
+
+import logging
+import uuid
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import JWTError, jwk, jwt
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_ALGORITHMS = ("RS256", "RS384", "RS512", "ES256", "ES384", "ES512")
+
+# Environments allowed to sign with a generated key when Vault has none
+EPHEMERAL_KEY_ENVIRONMENTS = ("development", "test")
+
+
+class SigningKeyStore:
+    """
+    Keyring of asymmetric signing keys with rotation support.
+
+    - Keys come from Vault `jwt_signing_keys` (JSON object: kid -> private PEM)
+    - `jwt_active_kid` selects the key used for signing new tokens
+    - Every key in the ring is published in the JWKS, so tokens signed before a
+      rotation keep verifying until they expire; drop a key from Vault once no
+      unexpired token can reference it
+    - In development and test an ephemeral key is generated when Vault has
+      none; every other environment fails fast
+    """
+
+    def __init__(self, algorithm: str):
+        self.algorithm = algorithm
+        self._private_keys: Dict[str, str] = {}
+        self._public_keys: Dict[str, Dict[str, Any]] = {}
+        self._active_kid: Optional[str] = None
+
+    def load(self, private_keys: Dict[str, str], active_kid: Optional[str] = None) -> None:
+        """
+        Replace the keyring.
+
+        Args:
+            private_keys: Mapping of key ID to PEM encoded private key
+            active_kid: Key ID used for signing (defaults to the last key)
+
+        Raises:
+            ValueError: If the keyring is empty or the active key is unknown
+        """
+        if self.algorithm not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f"Unsupported asymmetric JWT algorithm: {self.algorithm}")
+        if not private_keys:
+            raise ValueError("At least one JWT signing key is required")
+
+        active_kid = active_kid or list(private_keys)[-1]
+        if active_kid not in private_keys:
+            raise ValueError(f"Active JWT signing key not found: {active_kid}")
+
+        public_keys = {}
+        for kid, pem in private_keys.items():
+            public_jwk = jwk.construct(pem, self.algorithm).public_key().to_dict()
+            public_jwk.update({"kid": kid, "use": "sig"})
+            public_keys[kid] = public_jwk
+
+        self._private_keys = dict(private_keys)
+        self._public_keys = public_keys
+        self._active_kid = active_kid
+        logger.info(f"Loaded {len(private_keys)} JWT signing key(s), active kid: {active_kid}")
+
+    def _ensure_loaded(self) -> None:
+        """Lazily load keys from Vault, generating a dev key if none exist."""
+        if self._private_keys:
+            return
+
+        private_keys = settings.JWT_SIGNING_KEYS
+        if not private_keys:
+            if settings.ENVIRONMENT not in EPHEMERAL_KEY_ENVIRONMENTS:
+                raise ValueError("Required configuration missing: jwt_signing_keys")
+            logger.warning("No JWT signing keys configured, generating an ephemeral key")
+            private_keys = {str(uuid.uuid4()): generate_private_key(self.algorithm)}
+
+        self.load(private_keys, settings.JWT_ACTIVE_KID)
+
+    @property
+    def active_kid(self) -> str:
+        """Key ID used for signing new tokens."""
+        self._ensure_loaded()
+        return self._active_kid
+
+    def encode(self, payload: Dict[str, Any]) -> str:
+        """
+        Sign a payload with the active key.
+
+        Args:
+            payload: JWT claims
+
+        Returns:
+            Encoded JWT with `kid` header
+        """
+        self._ensure_loaded()
+        return jwt.encode(
+            payload,
+            self._private_keys[self._active_kid],
+            algorithm=self.algorithm,
+            headers={"kid": self._active_kid},
+        )
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token against the key named in its `kid` header.
+
+        Args:
+            token: Encoded JWT
+
+        Returns:
+            Token claims
+
+        Raises:
+            JWTError: If the key is unknown or verification fails
+        """
+        self._ensure_loaded()
+        kid = jwt.get_unverified_header(token).get("kid")
+        public_key = self._public_keys.get(kid)
+        if public_key is None:
+            raise JWTError(f"Unknown signing key: {kid}")
+        return jwt.decode(token, public_key, algorithms=[self.algorithm])
+
+    def jwks(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Public JSON Web Key Set for every key in the ring."""
+        self._ensure_loaded()
+        return {"keys": list(self._public_keys.values())}
+
+
+def generate_private_key(algorithm: str) -> str:
+    """
+    Generate a PEM encoded private key suitable for an algorithm.
+
+    Args:
+        algorithm: JWT algorithm (RS* or ES*)
+
+    Returns:
+        PKCS8 PEM private key
+    """
+    if algorithm.startswith("RS"):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm.startswith("ES"):
+        curve = {"ES256": ec.SECP256R1(), "ES384": ec.SECP384R1(), "ES512": ec.SECP521R1()}
+        key = ec.generate_private_key(curve[algorithm])
+    else:
+        raise ValueError(f"Unsupported asymmetric JWT algorithm: {algorithm}")
+
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+# Global keyring instance
+signing_keys = SigningKeyStore(settings.JWT_ALGORITHM)
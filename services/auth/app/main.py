@@ -14,17 +14,25 @@ from app.api import router
 from app.core.config import settings
 from app.core.database import Base, engine
 from app.core.logging import setup_logging
-from app.core.vault import vault_client
+from app.core.metrics import initialize_metrics
+from app.core.password_hasher import PasswordHasherOverloaded, password_hasher
+from app.core.redis import RedisUnavailable, redis_client
+from app.core.signing_keys import signing_keys
 from app.middleware.csrf import CSRFMiddleware
 from app.middleware.request_id import RequestIDMiddleware
 from app.middleware.security import SecurityHeadersMiddleware
-from app.utils.rate_limiter import limiter
-from fastapi import FastAPI
+from app.services.activity_tracker import activity_tracker
+from app.services.event_service import event_service
+from app.services.revocation_cache import revocation_cache
+from app.workers.health_monitor import get_health_monitor
+from app.workers.outbox_relay import get_outbox_relay
+from app.workers.reaper_worker import get_reaper_worker
+from app.workers.session_activity_worker import get_session_activity_worker
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import JSONResponse
 from prometheus_client import make_asgi_app
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
 
 # Setup logging
 setup_logging()
@@ -41,7 +49,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     logger.info("Starting Auth Service...")
 
     # Initialize Vault client
-    # Vault client auto-initialized
+    # Vault client auto-initialized; prefetch secrets so requests never wait on Vault
+    await settings.vault_client.start()
     logger.info("Vault client ready")
 
     # Create database tables
@@ -49,17 +58,60 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
         await conn.run_sync(Base.metadata.create_all)
     logger.info("Database tables created")
 
+    # Load JWT signing keys (fail fast on misconfiguration)
+    if not settings.JWT_ALGORITHM.startswith("HS"):
+        logger.info(f"JWT signing keys ready (active kid: {signing_keys.active_kid})")
+
+    # Connect to Redis (sessions, revocation broadcasts)
+    try:
+        await redis_client.connect()
+    except Exception:
+        logger.warning("Redis unavailable at startup, session checks will fail closed")
+
+    # Start access token revocation listener
+    await revocation_cache.start()
+
+    # Start session activity write-behind (buffer -> Redis -> PostgreSQL)
+    await activity_tracker.start()
+    await get_session_activity_worker().start()
+
+    # Start retention worker (expired tokens, session partitions)
+    if settings.REAPER_ENABLED:
+        await get_reaper_worker().start()
+
     # Add Prometheus metrics endpoint
+    initialize_metrics()
     metrics_app = make_asgi_app()
     app.mount("/metrics", metrics_app)
 
+    # Publish events to RabbitMQ in the background (buffered, confirm mode)
+    if settings.EVENT_PUBLISHER_ENABLED:
+        await event_service.start()
+
+        # Relay committed outbox events to RabbitMQ
+        if settings.OUTBOX_ENABLED:
+            await get_outbox_relay().start()
+
+    # Probe dependencies in the background for /health and /ready
+    await get_health_monitor().start()
+
     logger.info("Auth Service started successfully")
 
     yield
 
     # Shutdown
     logger.info("Shutting down Auth Service...")
+    await get_health_monitor().stop()
+    await get_outbox_relay().stop()
+    await event_service.stop()
+    await get_reaper_worker().stop()
+    await get_session_activity_worker().stop()
+    await activity_tracker.stop()
+    await revocation_cache.stop()
+    password_hasher.shutdown()
+    await redis_client.disconnect()
     await engine.dispose()
+    await settings.vault_client.stop()
     logger.info("Auth Service shut down successfully")
 
 
@@ -74,9 +126,26 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# Add rate limiter
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+@app.exception_handler(PasswordHasherOverloaded)
+async def password_hasher_overloaded_handler(request: Request, exc: PasswordHasherOverloaded):
+    """Shed password operations when the bcrypt queue is full."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(RedisUnavailable)
+async def redis_unavailable_handler(request: Request, exc: RedisUnavailable):
+    """Fail closed when session state cannot be read from Redis."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporarily unavailable, please retry"},
+        headers={"Retry-After": str(int(settings.REDIS_CIRCUIT_RESET_SECONDS))},
+    )
+
 
 # Add middleware (order matters!)
 app.add_middleware(RequestIDMiddleware)
@@ -122,35 +191,27 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint for monitoring."""
+    """Health check endpoint for monitoring (served from the health monitor)."""
     from datetime import datetime
 
-    try:
-        # Check database connection
-        async with engine.connect() as conn:
-            await conn.execute("SELECT 1")
-
-        # Check Vault connection
-        vault_status = vault_client.is_healthy()
-
-        return {
-            "status": "healthy",
-            "service": __service__,
-            "version": __version__,
-            "build": __build__,
-            "build_date": __build_date__,
-            "timestamp": datetime.utcnow().isoformat(),
-            "database": "connected",
-            "vault": "connected" if vault_status else "disconnected",
-        }
-    except Exception as e:
-        logger.error(f"Health check failed: {e}")
-        return {
-            "status": "unhealthy",
-            "service": __service__,
-            "version": __version__,
-            "error": str(e),
-        }
+    status = get_health_monitor().status()
+    database = status["database"]
+    vault = status["vault"]
+    vault_state = "connected" if vault.healthy else "disconnected"
+    if not vault.required:
+        vault_state = "not_required"
+
+    return {
+        "status": "healthy" if database.healthy else "unhealthy",
+        "service": __service__,
+        "version": __version__,
+        "build": __build__,
+        "build_date": __build_date__,
+        "timestamp": datetime.utcnow().isoformat(),
+        "database": "connected" if database.healthy else "disconnected",
+        "vault": vault_state,
+        "dependencies": {name: dependency.to_dict() for name, dependency in status.items()},
+    }
 
 
 @app.get("/version")
@@ -165,40 +226,37 @@ async def version_info():
     }
 
 
-@app.get("/ready")
-async def readiness_check():
-    """Readiness check for Kubernetes."""
-    # Similar to health but more thorough
-    checks = {
-        "database": False,
-        "vault": False,
-        "redis": False,
-    }
-
-    try:
-        # Check database
-        async with engine.connect() as conn:
-            await conn.execute("SELECT 1")
-        checks["database"] = True
-
-        # Check Vault
-        checks["vault"] = vault_client.is_healthy()
-
-        # Check Redis (for rate limiting/sessions)
-        from app.core.redis import redis_client
+@app.get("/.well-known/jwks.json", include_in_schema=False)
+async def jwks():
+    """
+    Public signing keys (JWKS) for local token verification in other services.
 
-        await redis_client.ping()
-        checks["redis"] = True
+    Includes every key in the rotation ring; clients should re-fetch when they
+    see an unknown `kid`.
+    """
+    if settings.JWT_ALGORITHM.startswith("HS"):
+        return JSONResponse({"keys": []})
+    return JSONResponse(
+        signing_keys.jwks(),
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE_SECONDS}"},
+    )
 
-    except Exception as e:
-        logger.error(f"Readiness check failed: {e}")
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check for Kubernetes (served from the health monitor)."""
+    status = get_health_monitor().status()
+    checks = {name: dependency.healthy for name, dependency in status.items()}
     all_ready = all(checks.values())
 
-    return {
-        "ready": all_ready,
-        "checks": checks,
-    }
+    return JSONResponse(
+        status_code=200 if all_ready else 503,
+        content={
+            "ready": all_ready,
+            "checks": checks,
+            "latency_ms": {name: dependency.latency_ms for name, dependency in status.items()},
+        },
+    )
 
 
 if __name__ == "__main__":
@@ -5,23 +5,25 @@ CSRF Protection middleware
 import hmac
 import logging
 import secrets
-from typing import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import HTTPConnection
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
 
-class CSRFMiddleware(BaseHTTPMiddleware):
+class CSRFMiddleware:
     """
     CSRF Protection middleware using double-submit cookie pattern
+
+    Pure ASGI: the token check reads only the scope headers, and the cookie
+    for new clients is appended to `http.response.start`.
     """
 
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         secret: str,
         cookie_name: str = "csrf_token",
         header_name: str = "X-CSRF-Token",
@@ -37,11 +39,12 @@ class CSRFMiddleware(BaseHTTPMiddleware):
             header_name: Name of the CSRF header
             safe_methods: HTTP methods that don't require CSRF check
         """
-        super().__init__(app)
+        self.app = app
         self.secret = secret
         self.cookie_name = cookie_name
         self.header_name = header_name
         self.safe_methods = safe_methods or {"GET", "HEAD", "OPTIONS", "TRACE"}
+        self._cookie_attributes = "; HttpOnly; Path=/; SameSite=strict; Secure"
 
     def generate_csrf_token(self) -> str:
         """
@@ -68,46 +71,58 @@ class CSRFMiddleware(BaseHTTPMiddleware):
 
         return hmac.compare_digest(cookie_token, header_token)
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request and verify CSRF token
 
         Args:
-            request: Incoming HTTP request
-            call_next: Next middleware/handler
-
-        Returns:
-            HTTP response
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
-        # Skip CSRF check for safe methods
-        if request.method in self.safe_methods:
-            response = await call_next(request)
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        connection = HTTPConnection(scope)
 
+        # Skip CSRF check for safe methods
+        if method in self.safe_methods:
             # Set CSRF token cookie on GET requests if not present
-            if request.method == "GET" and self.cookie_name not in request.cookies:
-                csrf_token = self.generate_csrf_token()
-                response.set_cookie(
-                    key=self.cookie_name,
-                    value=csrf_token,
-                    httponly=True,
-                    secure=True,
-                    samesite="strict",
-                )
-            return response
+            if method == "GET" and self.cookie_name not in connection.cookies:
+                set_cookie = (
+                    f"{self.cookie_name}={self.generate_csrf_token()}{self._cookie_attributes}"
+                ).encode("latin-1")
+
+                async def send_with_cookie(message: Message) -> None:
+                    if message["type"] == "http.response.start":
+                        message["headers"] = [
+                            *message.get("headers", []),
+                            (b"set-cookie", set_cookie),
+                        ]
+                    await send(message)
+
+                await self.app(scope, receive, send_with_cookie)
+                return
+
+            await self.app(scope, receive, send)
+            return
 
         # For unsafe methods, verify CSRF token
-        cookie_token = request.cookies.get(self.cookie_name)
-        header_token = request.headers.get(self.header_name)
+        cookie_token = connection.cookies.get(self.cookie_name)
+        header_token = connection.headers.get(self.header_name)
 
         if not self.verify_csrf_token(cookie_token, header_token):
             logger.warning(
-                f"CSRF token mismatch for {request.method} {request.url.path} "
-                f"from {request.client.host if request.client else 'unknown'}"
+                f"CSRF token mismatch for {method} {scope['path']} "
+                f"from {connection.client.host if connection.client else 'unknown'}"
             )
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=403,
                 content={"detail": "CSRF token validation failed"},
             )
+            await response(scope, receive, send)
+            return
 
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
@@ -3,39 +3,59 @@ Request ID middleware for distributed tracing
 """
 
 import uuid
-from typing import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+REQUEST_ID_HEADER = b"x-request-id"
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
+
+class RequestIDMiddleware:
     """
     Middleware to add X-Request-ID header to all requests/responses
     for distributed tracing and correlation
+
+    Pure ASGI: the ID is stored in the request state and appended to the
+    headers of `http.response.start`, so the response body (including
+    streaming responses) passes through untouched.
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request and add Request ID
 
         Args:
-            request: Incoming HTTP request
-            call_next: Next middleware/handler
-
-        Returns:
-            HTTP response with X-Request-ID header
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Get or generate request ID
-        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                request_id = value
+                break
+        if request_id is None:
+            request_id = str(uuid.uuid4()).encode("latin-1")
 
         # Store request ID in request state
-        request.state.request_id = request_id
-
-        # Process request
-        response = await call_next(request)
-
-        # Add request ID to response headers
-        response.headers["X-Request-ID"] = request_id
-
-        return response
+        scope.setdefault("state", {})["request_id"] = request_id.decode("latin-1")
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = [
+                    (name, value)
+                    for name, value in message.get("headers", [])
+                    if name.lower() != REQUEST_ID_HEADER
+                ]
+                headers.append((REQUEST_ID_HEADER, request_id))
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_request_id)
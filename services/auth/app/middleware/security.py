@@ -2,62 +2,77 @@
 Security headers middleware
 """
 
-from typing import Callable
+from typing import List, Tuple
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """
-    Middleware to add security headers to all responses
-    following OWASP best practices
-    """
-
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """
-        Process request and add security headers
-
-        Args:
-            request: Incoming HTTP request
-            call_next: Next middleware/handler
-
-        Returns:
-            HTTP response with security headers
-        """
-        response = await call_next(request)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+# Encoded once at import; appended as-is to every response
+SECURITY_HEADERS: List[Tuple[bytes, bytes]] = [
+    (name.lower().encode("latin-1"), value.encode("latin-1"))
+    for name, value in (
         # HSTS (HTTP Strict Transport Security)
-        response.headers["Strict-Transport-Security"] = (
-            "max-age=31536000; includeSubDomains; preload"
-        )
-
+        ("Strict-Transport-Security", "max-age=31536000; includeSubDomains; preload"),
         # Prevent MIME type sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
-
+        ("X-Content-Type-Options", "nosniff"),
         # XSS Protection (legacy, but doesn't hurt)
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-
+        ("X-XSS-Protection", "1; mode=block"),
         # Prevent clickjacking
-        response.headers["X-Frame-Options"] = "DENY"
-
+        ("X-Frame-Options", "DENY"),
         # Content Security Policy
-        response.headers["Content-Security-Policy"] = (
+        (
+            "Content-Security-Policy",
             "default-src 'self'; "
             "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
             "style-src 'self' 'unsafe-inline'; "
             "img-src 'self' data: https:; "
             "font-src 'self' data:; "
             "connect-src 'self'; "
-            "frame-ancestors 'none';"
-        )
-
+            "frame-ancestors 'none';",
+        ),
         # Referrer Policy
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-
+        ("Referrer-Policy", "strict-origin-when-cross-origin"),
         # Permissions Policy (formerly Feature Policy)
-        response.headers["Permissions-Policy"] = (
-            "geolocation=(), " "microphone=(self), " "camera=()"
-        )
+        ("Permissions-Policy", "geolocation=(), microphone=(self), camera=()"),
+    )
+]
+
+SECURITY_HEADER_NAMES = frozenset(name for name, _ in SECURITY_HEADERS)
+
+
+class SecurityHeadersMiddleware:
+    """
+    Middleware to add security headers to all responses
+    following OWASP best practices
+
+    Pure ASGI: headers are added to `http.response.start` (replacing any
+    value set by the endpoint), the body is not wrapped.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Process request and add security headers
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_security_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = [
+                    (name, value)
+                    for name, value in message.get("headers", [])
+                    if name.lower() not in SECURITY_HEADER_NAMES
+                ]
+                headers.extend(SECURITY_HEADERS)
+                message["headers"] = headers
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_with_security_headers)
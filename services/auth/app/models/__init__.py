@@ -2,6 +2,7 @@
 Models package for Auth Service
 """
 
+from app.models.outbox import OutboxEvent
 from app.models.token import EmailVerificationToken, PasswordResetToken
 from app.models.user import Session, User
 
@@ -10,4 +11,5 @@ __all__ = [
     "Session",
     "PasswordResetToken",
     "EmailVerificationToken",
+    "OutboxEvent",
 ]
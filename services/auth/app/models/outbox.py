@@ -0,0 +1,86 @@
+"""
+Outbox Model
+============
+Transactional outbox: events are written in the same transaction as the
+state change they describe and relayed to RabbitMQ by the outbox relay
+"""
+
+from app.core.database import Base
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    DateTime,
+    Identity,
+    Index,
+    Integer,
+    String,
+    Text,
+    event,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+OUTBOX_CHANNEL = "auth_outbox"
+
+
+class OutboxEvent(Base):
+    """
+    Event waiting to be published.
+
+    - `id` orders delivery; events of one aggregate are published in id order
+    - Rows are deleted once RabbitMQ confirms them
+    - Events carrying one-time tokens (verification, password reset) are
+      never written here, see `EventService.publish_after_commit`
+    """
+
+    __tablename__ = "outbox"
+
+    # Primary Key (monotonic, delivery order)
+    id = Column(BigInteger, Identity(), primary_key=True)
+
+    # Ordering scope (e.g. the user the event is about)
+    aggregate_id = Column(String(64), nullable=False)
+
+    # Message
+    event_type = Column(String(100), nullable=False)
+    routing_key = Column(String(100), nullable=False)
+    correlation_id = Column(String(64), nullable=False)
+    payload = Column(JSONB, nullable=False)  # full event envelope
+
+    # Delivery state
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text)
+
+    # Metadata
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    # Indexes
+    __table_args__ = (
+        Index("idx_outbox_available_at_id", "available_at", "id"),
+        Index("idx_outbox_aggregate_id_id", "aggregate_id", "id"),
+    )
+
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, event_type={self.event_type})>"
+
+
+# Wake the relay on commit (one NOTIFY per inserting statement; migration 007)
+event.listen(
+    OutboxEvent.__table__,
+    "after_create",
+    DDL(
+        "CREATE OR REPLACE FUNCTION outbox_notify() RETURNS trigger AS $$ "
+        f"BEGIN PERFORM pg_notify('{OUTBOX_CHANNEL}', ''); RETURN NULL; END; "
+        "$$ LANGUAGE plpgsql"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    OutboxEvent.__table__,
+    "after_create",
+    DDL(
+        "CREATE TRIGGER outbox_notify AFTER INSERT ON outbox "
+        "FOR EACH STATEMENT EXECUTE FUNCTION outbox_notify()"
+    ).execute_if(dialect="postgresql"),
+)
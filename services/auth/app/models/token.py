@@ -8,7 +8,7 @@ import uuid
 from datetime import datetime, timezone
 
 from app.core.database import Base
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, String, Text
+from sqlalchemy import DDL, Boolean, Column, DateTime, ForeignKey, Index, String, Text, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -134,3 +134,20 @@ class EmailVerificationToken(Base):
     def is_expired(self) -> bool:
         """Check if token is expired"""
         return datetime.now(timezone.utc) >= self.expires_at
+
+
+# Archive tables for rows removed by the reaper (migration 006 in Alembic setups)
+for _table in (PasswordResetToken.__table__, EmailVerificationToken.__table__):
+    event.listen(
+        _table,
+        "after_create",
+        DDL("CREATE SCHEMA IF NOT EXISTS archive").execute_if(dialect="postgresql"),
+    )
+    event.listen(
+        _table,
+        "after_create",
+        DDL(
+            f"CREATE TABLE IF NOT EXISTS archive.{_table.name} "
+            f"(LIKE {_table.name} INCLUDING DEFAULTS)"
+        ).execute_if(dialect="postgresql"),
+    )
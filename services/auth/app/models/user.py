@@ -9,6 +9,7 @@ from datetime import datetime, timezone
 
 from app.core.database import Base
 from sqlalchemy import (
+    DDL,
     Boolean,
     CheckConstraint,
     Column,
@@ -18,6 +19,9 @@ from sqlalchemy import (
     Integer,
     String,
     Text,
+    UniqueConstraint,
+    event,
+    text,
 )
 from sqlalchemy.dialects.postgresql import INET, JSONB, UUID
 from sqlalchemy.orm import relationship
@@ -42,7 +46,8 @@ class User(Base):
     # Two-Factor Authentication
     mfa_secret = Column(String(255))
     mfa_enabled = Column(Boolean, default=False)
-    mfa_backup_codes = Column(JSONB)
+    mfa_backup_codes = Column(JSONB)  # Legacy: list of bcrypt hashes
+    mfa_backup_code_index = Column(JSONB)  # HMAC lookup index -> bcrypt hash
 
     # Profile
     full_name = Column(String(255))
@@ -112,9 +117,31 @@ class User(Base):
         Index("idx_users_email_normalized", "email_normalized"),
         Index("idx_users_status", "status"),
         Index("idx_users_role", "role"),
-        Index("idx_users_created_at", "created_at"),
+        Index("idx_users_created_at_id", "created_at", "id"),
         Index("idx_users_organization", "organization_id"),
         Index("idx_users_oauth", "oauth_provider", "oauth_provider_id"),
+        # Admin search: exact-match fast paths and trigram (pg_trgm) ILIKE
+        Index("idx_users_email_lower", text("lower(email)")),
+        Index("idx_users_tax_code_upper", text("upper(tax_code)")),
+        Index("idx_users_professional_id", "professional_id"),
+        Index(
+            "idx_users_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_users_full_name_trgm",
+            "full_name",
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_users_company_name_trgm",
+            "company_name",
+            postgresql_using="gin",
+            postgresql_ops={"company_name": "gin_trgm_ops"},
+        ),
         CheckConstraint("role IN ('customer', 'partner', 'admin')", name="chk_role"),
         CheckConstraint("status IN ('active', 'suspended', 'deleted')", name="chk_status"),
     )
@@ -167,18 +194,32 @@ class User(Base):
         }
 
 
+# Trigram indexes need pg_trgm (also created by migration 004 in Alembic setups)
+event.listen(
+    User.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
 class Session(Base):
-    """JWT Session management with refresh tokens."""
+    """
+    JWT Session management with refresh tokens.
+
+    Range-partitioned by `created_at` month (migration 006), so retention is
+    a partition drop; the primary key and JTI unique constraints include the
+    partition key as PostgreSQL requires.
+    """
 
     __tablename__ = "sessions"
 
-    # Primary Key
+    # Primary Key (id, created_at)
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     # Token Management
-    access_token_jti = Column(UUID(as_uuid=True), unique=True, nullable=False, index=True)
-    refresh_token_jti = Column(UUID(as_uuid=True), unique=True, index=True)
+    access_token_jti = Column(UUID(as_uuid=True), nullable=False)
+    refresh_token_jti = Column(UUID(as_uuid=True))
     access_expires_at = Column(DateTime(timezone=True), nullable=False)
     refresh_expires_at = Column(DateTime(timezone=True))
 
@@ -193,8 +234,13 @@ class Session(Base):
     revoked_at = Column(DateTime(timezone=True))
     revoked_reason = Column(String(100))
 
-    # Metadata
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Metadata (partition key)
+    created_at = Column(
+        DateTime(timezone=True),
+        primary_key=True,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+    )
     last_activity_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
@@ -202,12 +248,24 @@ class Session(Base):
 
     # Indexes
     __table_args__ = (
+        UniqueConstraint("access_token_jti", "created_at", name="uq_sessions_access_jti"),
+        UniqueConstraint("refresh_token_jti", "created_at", name="uq_sessions_refresh_jti"),
         Index("idx_sessions_user_id", "user_id"),
-        Index("idx_sessions_access_jti", "access_token_jti"),
-        Index("idx_sessions_refresh_jti", "refresh_token_jti"),
         Index("idx_sessions_expires", "access_expires_at"),
+        Index("idx_sessions_created_at_id", "created_at", "id"),
         CheckConstraint("access_expires_at > created_at", name="chk_expiry"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
 
     def __repr__(self):
         return f"<Session(id={self.id}, user_id={self.user_id}, active={self.is_active})>"
+
+
+# Rows land in the default partition until the reaper creates monthly ones
+event.listen(
+    Session.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS sessions_default PARTITION OF sessions DEFAULT").execute_if(
+        dialect="postgresql"
+    ),
+)
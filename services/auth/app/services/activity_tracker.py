@@ -0,0 +1,102 @@
+"""
+Session Activity Tracker
+========================
+Coalesces per-request session touches in memory and flushes them to Redis in
+batches, so request handling never writes activity to PostgreSQL
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import session_activity_buffer_size, session_activity_dropped_total
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityTracker:
+    """
+    Per-worker buffer of session touches (access JTI -> last seen).
+
+    - `touch()` is a dict write; repeated touches of a session coalesce
+    - Every `flush_interval` seconds the buffer is written to the Redis
+      activity sorted sets in one pipelined round trip
+    - The buffer holds at most `max_entries` sessions; touches of new sessions
+      beyond that are dropped (and counted) until the next flush
+    - SessionActivityWorker moves the Redis data to `sessions.last_activity_at`
+      and enforces the idle timeout
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.SESSION_ACTIVITY_BUFFER_MAX_ENTRIES,
+        flush_interval: int = settings.SESSION_ACTIVITY_BUFFER_FLUSH_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+
+        self._buffer: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def touch(self, jti: str) -> None:
+        """
+        Record activity of a session.
+
+        Args:
+            jti: Access token JTI
+        """
+        if jti in self._buffer or len(self._buffer) < self.max_entries:
+            self._buffer[jti] = time.time()
+        else:
+            session_activity_dropped_total.inc()
+
+    async def flush(self) -> int:
+        """
+        Write buffered touches to Redis.
+
+        Returns:
+            Number of sessions flushed
+        """
+        if not self._buffer:
+            return 0
+
+        touches, self._buffer = self._buffer, {}
+        session_activity_buffer_size.set(0)
+        if not await redis_client.record_session_activity(touches):
+            logger.warning(f"Dropped {len(touches)} session activity touches (Redis unavailable)")
+            return 0
+        return len(touches)
+
+    async def start(self) -> None:
+        """Start the background flush loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Session activity tracker started (flush every {self.flush_interval}s)")
+
+    async def stop(self) -> None:
+        """Stop the flush loop and flush what is buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        """Flush periodically."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            session_activity_buffer_size.set(len(self._buffer))
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Session activity flush error: {e}")
+
+
+# Singleton instance
+activity_tracker = ActivityTracker()
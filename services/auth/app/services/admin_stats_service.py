@@ -0,0 +1,136 @@
+"""
+Admin Statistics Service
+========================
+System-wide counters for the admin dashboard, computed in a single query and
+served from a shared Redis snapshot with a bounded staleness
+"""
+
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.models.user import Session, User
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+class AdminStatsService:
+    """
+    Cached admin statistics.
+
+    - All counters come from one statement: a `COUNT(*) FILTER (...)` pass
+      over `users` and one over `sessions`
+    - The result is stored in Redis (`admin_stats:snapshot`) and served until
+      it is older than `max_staleness_seconds`; one replica refreshes it
+      (`admin_stats:refresh` lock) while the others keep serving the stale
+      snapshot, so auto-refreshing dashboards never fan out to PostgreSQL
+    """
+
+    SNAPSHOT_KEY = "admin_stats:snapshot"
+    REFRESH_LOCK_KEY = "admin_stats:refresh"
+
+    def __init__(self, max_staleness_seconds: int = settings.ADMIN_STATS_MAX_STALENESS_SECONDS):
+        self.max_staleness_seconds = max_staleness_seconds
+
+    async def get(self, db: AsyncSession) -> Dict[str, Any]:
+        """
+        Get the statistics snapshot, refreshing it if stale.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Counters plus `timestamp` (when they were computed)
+        """
+        snapshot = await self._load()
+        locked = False
+        if snapshot is not None:
+            age = time.time() - snapshot["timestamp"].timestamp()
+            if age < self.max_staleness_seconds:
+                return snapshot
+
+            # Another replica is refreshing: the stale snapshot is good enough
+            locked = await redis_client.set_if_absent(
+                self.REFRESH_LOCK_KEY, "1", max(self.max_staleness_seconds, 1)
+            )
+            if not locked:
+                return snapshot
+
+        try:
+            snapshot = await self.compute(db)
+            await self._save(snapshot)
+            return snapshot
+        finally:
+            if locked:
+                await redis_client.delete(self.REFRESH_LOCK_KEY)
+
+    async def compute(self, db: AsyncSession) -> Dict[str, Any]:
+        """
+        Compute every counter in one round trip.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Counters plus `timestamp`
+        """
+        now = datetime.now(timezone.utc)
+
+        user_counts = select(
+            func.count().label("total_users"),
+            func.count().filter(User.status == "active").label("active_users"),
+            func.count().filter(User.email_verified.is_(True)).label("verified_users"),
+            func.count().filter(User.mfa_enabled.is_(True)).label("mfa_enabled_users"),
+            func.count()
+            .filter(User.created_at >= now - timedelta(days=7))
+            .label("recent_registrations"),
+            func.coalesce(func.sum(User.failed_login_count), 0).label("failed_login_attempts"),
+            func.count().filter(User.locked_until > now).label("locked_accounts"),
+        ).subquery()
+
+        session_counts = select(
+            func.count().label("total_sessions"),
+            func.count().filter(Session.is_active.is_(True)).label("active_sessions"),
+            func.count()
+            .filter(Session.created_at >= now - timedelta(days=1))
+            .label("recent_logins"),
+        ).subquery()
+
+        result = await db.execute(select(user_counts, session_counts))
+        stats = {key: int(value or 0) for key, value in result.one()._asdict().items()}
+        stats["timestamp"] = now
+        return stats
+
+    async def invalidate(self) -> None:
+        """Drop the snapshot so the next request recomputes it."""
+        await redis_client.delete(self.SNAPSHOT_KEY)
+
+    async def _load(self) -> Optional[Dict[str, Any]]:
+        """Read the snapshot from Redis."""
+        raw = await redis_client.get(self.SNAPSHOT_KEY)
+        if not raw:
+            return None
+        try:
+            snapshot = json.loads(raw)
+            snapshot["timestamp"] = datetime.fromisoformat(snapshot["timestamp"])
+            return snapshot
+        except (TypeError, ValueError, KeyError) as e:
+            logger.warning(f"Discarding malformed admin stats snapshot: {e}")
+            return None
+
+    async def _save(self, snapshot: Dict[str, Any]) -> None:
+        """Store the snapshot (kept past its staleness bound as a fallback)."""
+        data = dict(snapshot, timestamp=snapshot["timestamp"].isoformat())
+        await redis_client.setex(
+            self.SNAPSHOT_KEY, max(self.max_staleness_seconds, 1) * 10, json.dumps(data)
+        )
+
+
+# Singleton instance
+admin_stats_service = AdminStatsService()
@@ -0,0 +1,137 @@
+"""
+MFA Backup Code Service
+=======================
+Backup codes stored under a keyed lookup index, so verifying a code costs a
+single bcrypt check no matter how many codes remain
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import secrets
+from typing import List
+
+from app.core.config import settings
+from app.core.password_hasher import password_hasher
+from app.core.redis import redis_client
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class BackupCodeService:
+    """
+    Generate, store and consume MFA backup codes.
+
+    Each code is stored as `{HMAC-SHA256(key, user_id:code): bcrypt(code)}`.
+    The HMAC (key from Vault) finds the candidate in O(1); the bcrypt hash
+    keeps codes safe if the database and the key leak separately. Codes
+    stored before the index existed (`mfa_backup_codes`, a plain list of
+    hashes) are still accepted, one bcrypt check per remaining code; after
+    `LEGACY_MAX_FAILURES` wrong codes in `LEGACY_WINDOW_SECONDS` the legacy
+    scan is skipped for that user until the window passes.
+    """
+
+    CODE_COUNT = 10
+    LEGACY_MAX_FAILURES = 5
+    LEGACY_WINDOW_SECONDS = 900
+
+    def generate(self, count: int = CODE_COUNT) -> List[str]:
+        """
+        Generate plaintext backup codes.
+
+        Args:
+            count: Number of codes
+
+        Returns:
+            Backup codes (shown to the user once)
+        """
+        return [secrets.token_hex(4) for _ in range(count)]
+
+    def index(self, user_id: str, code: str) -> str:
+        """
+        Compute the lookup index of a code.
+
+        Args:
+            user_id: Owner user ID
+            code: Plaintext backup code
+
+        Returns:
+            Hex HMAC index
+        """
+        message = f"{user_id}:{self._normalize(code)}".encode()
+        return hmac.new(settings.MFA_BACKUP_CODE_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+    async def store(self, user: User, codes: List[str]) -> None:
+        """
+        Replace a user's backup codes (caller commits).
+
+        Args:
+            user: User
+            codes: Plaintext backup codes
+        """
+        hashes = await asyncio.gather(
+            *(password_hasher.hash(self._normalize(code)) for code in codes)
+        )
+        user.mfa_backup_code_index = {
+            self.index(str(user.id), code): code_hash for code, code_hash in zip(codes, hashes)
+        }
+        user.mfa_backup_codes = None
+
+    async def verify_and_consume(self, user: User, code: str) -> bool:
+        """
+        Verify a backup code and remove it if valid (caller commits).
+
+        Args:
+            user: User
+            code: Plaintext backup code
+
+        Returns:
+            True if the code was valid and unused
+        """
+        index = self.index(str(user.id), code)
+        code_hash = (user.mfa_backup_code_index or {}).get(index)
+        if code_hash is not None:
+            if not await password_hasher.verify(self._normalize(code), code_hash):
+                return False
+            remaining = dict(user.mfa_backup_code_index)
+            del remaining[index]
+            user.mfa_backup_code_index = remaining
+            return True
+
+        # Legacy codes (pre-index): linear scan until the user regenerates them
+        if not user.mfa_backup_codes:
+            return False
+        failures_key = f"mfa_legacy_backup_failures:{user.id}"
+        failures = await redis_client.sliding_window_count(failures_key, self.LEGACY_WINDOW_SECONDS)
+        if failures >= self.LEGACY_MAX_FAILURES:
+            logger.warning(f"Legacy backup code checks capped for user {user.id}")
+            return False
+
+        for legacy_hash in user.mfa_backup_codes:
+            if await password_hasher.verify(code, legacy_hash):
+                user.mfa_backup_codes = [h for h in user.mfa_backup_codes if h != legacy_hash]
+                logger.info(f"Legacy backup code used by user {user.id}, regeneration advised")
+                return True
+
+        await redis_client.sliding_window_hit([failures_key], self.LEGACY_WINDOW_SECONDS)
+        return False
+
+    def remaining(self, user: User) -> int:
+        """Number of unused backup codes."""
+        return len(user.mfa_backup_code_index or {}) + len(user.mfa_backup_codes or [])
+
+    def clear(self, user: User) -> None:
+        """Remove all backup codes (caller commits)."""
+        user.mfa_backup_code_index = None
+        user.mfa_backup_codes = None
+
+    @staticmethod
+    def _normalize(code: str) -> str:
+        """Ignore case, spaces and dashes typed by the user."""
+        return code.strip().lower().replace("-", "").replace(" ", "")
+
+
+# Create service instance
+backup_code_service = BackupCodeService()
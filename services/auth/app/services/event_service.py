@@ -4,57 +4,178 @@ Event Service - RabbitMQ Event Publishing
 Publishes authentication events to RabbitMQ for consumption by other services
 """
 
+import asyncio
 import json
 import logging
+import time
 import uuid
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from app.core.config import settings
+from app.core.database import after_commit
+from app.core.metrics import (
+    event_batch_size,
+    event_buffer_size,
+    event_confirm_duration_seconds,
+    events_in_flight,
+    events_published_total,
+)
+from app.models.outbox import OutboxEvent
+from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class _PendingEvent:
+    """Serialized event waiting in the local buffer."""
+
+    event_type: str
+    routing_key: str
+    body: bytes
+    correlation_id: str
+    attempts: int = 0
+    confirmed: Optional[asyncio.Future] = None
+
+
 class EventService:
-    """Service for publishing events to RabbitMQ."""
+    """
+    Service for publishing events to RabbitMQ.
+
+    Features:
+    - Robust connection (aio_pika reconnects and restores channels)
+    - Pool of channels in publisher-confirm mode, one publisher task each
+    - At most `max_in_flight` unconfirmed messages across the pool
+    - Micro-batching: a publisher drains whatever is queued (up to
+      `batch_size`, optionally lingering) and pipelines the batch
+    - Fire-and-forget: publish_event only enqueues into a bounded buffer;
+      when the broker is slow or down the buffer absorbs the burst, and
+      once full new events are dropped and counted instead of blocking
+      request handlers
+    """
 
     # Exchange name
-    EXCHANGE_NAME = "refertosicuro.events"
+    EXCHANGE_NAME = settings.RABBITMQ_EXCHANGE
     EXCHANGE_TYPE = "topic"
 
-    def __init__(self):
+    def __init__(
+        self,
+        pool_size: int = settings.EVENT_CHANNEL_POOL_SIZE,
+        max_in_flight: int = settings.EVENT_MAX_IN_FLIGHT,
+        buffer_size: int = settings.EVENT_BUFFER_SIZE,
+        batch_size: int = settings.EVENT_BATCH_SIZE,
+        linger_ms: float = settings.EVENT_BATCH_LINGER_MS,
+        confirm_timeout: float = settings.EVENT_CONFIRM_TIMEOUT_SECONDS,
+        max_retries: int = settings.EVENT_MAX_RETRIES,
+    ):
+        """
+        Initialize event service.
+
+        Args:
+            pool_size: Confirm-mode channels (and publisher tasks)
+            max_in_flight: Maximum unconfirmed messages across all channels
+            buffer_size: Local buffer capacity before events are dropped
+            batch_size: Maximum events published per batch
+            linger_ms: Time to wait for a batch to fill (0: only batch backlog)
+            confirm_timeout: Seconds to wait for a broker confirm
+            max_retries: Publish attempts before an event is given up
+        """
+        self.pool_size = pool_size
+        self.max_in_flight = max_in_flight
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.linger = linger_ms / 1000
+        self.confirm_timeout = confirm_timeout
+        self.max_retries = max_retries
         self.connection = None
-        self.channel = None
+        self.exchanges: List[Any] = []
         self._connected = False
-
-    async def connect(self):
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._buffer: Optional[asyncio.Queue] = None
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self._running = False
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start the publisher tasks (they connect, and reconnect, on their own)."""
+        if self._running:
+            return
+        self._connect_lock = asyncio.Lock()
+        self._buffer = asyncio.Queue(maxsize=self.buffer_size)
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._running = True
+        self._workers = [asyncio.create_task(self._run(slot)) for slot in range(self.pool_size)]
+        logger.info(f"EventService started ({self.pool_size} channels)")
+
+    async def stop(self, drain_timeout: float = settings.EVENT_DRAIN_TIMEOUT_SECONDS) -> None:
         """
-        Connect to RabbitMQ.
+        Stop accepting events, drain the buffer, then disconnect.
 
-        Note: For now, this is a placeholder. Full RabbitMQ integration
-        will be implemented when other services are ready to consume.
+        Args:
+            drain_timeout: Seconds to wait for buffered events to be confirmed
         """
-        try:
-            # TODO: Implement actual RabbitMQ connection
-            # import aio_pika
-            # self.connection = await aio_pika.connect_robust(settings.RABBITMQ_URL)
-            # self.channel = await self.connection.channel()
-            # await self.channel.declare_exchange(
-            #     self.EXCHANGE_NAME, self.EXCHANGE_TYPE, durable=True
-            # )
-
-            self._connected = True
-            logger.info("EventService connected to RabbitMQ (placeholder)")
+        if not self._running:
+            return
+        self._running = False
+        if self._connected:
+            try:
+                await asyncio.wait_for(self._buffer.join(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"EventService stopped with {self._buffer.qsize()} events unsent")
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        await self.disconnect()
+
+    async def connect(self) -> bool:
+        """
+        Connect to RabbitMQ and open the confirm-mode channel pool.
 
-        except Exception as e:
-            logger.error(f"Failed to connect to RabbitMQ: {e}")
-            self._connected = False
+        Returns:
+            True if connected
+        """
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._connected:
+                return True
+            try:
+                import aio_pika
+
+                self.connection = await aio_pika.connect_robust(
+                    settings.RABBITMQ_URL,
+                    client_properties={"connection_name": "auth-service"},
+                )
+                self.exchanges = []
+                for _ in range(self.pool_size):
+                    channel = await self.connection.channel(publisher_confirms=True)
+                    self.exchanges.append(
+                        await channel.declare_exchange(
+                            self.EXCHANGE_NAME, self.EXCHANGE_TYPE, durable=True
+                        )
+                    )
+
+                self._connected = True
+                logger.info(f"EventService connected to RabbitMQ ({self.pool_size} channels)")
+
+            except Exception as e:
+                logger.error(f"Failed to connect to RabbitMQ: {e}")
+                await self.disconnect()
+            return self._connected
 
     async def disconnect(self):
         """Disconnect from RabbitMQ."""
+        self._connected = False
+        self.exchanges = []
         if self.connection:
-            await self.connection.close()
-            self._connected = False
+            try:
+                await self.connection.close()
+            except Exception as e:
+                logger.warning(f"Error closing RabbitMQ connection: {e}")
+            self.connection = None
             logger.info("EventService disconnected from RabbitMQ")
 
     def _create_event_payload(
@@ -86,49 +207,275 @@ class EventService:
             },
         }
 
+    @property
+    def is_connected(self) -> bool:
+        """Whether the publisher is running and connected to RabbitMQ."""
+        return self._running and self._connected
+
     async def publish_event(
         self,
         event_type: str,
         payload: Dict[str, Any],
         routing_key: Optional[str] = None,
+        correlation_id: Optional[str] = None,
+        wait: bool = False,
+        db: Optional[AsyncSession] = None,
     ) -> bool:
         """
         Publish event to RabbitMQ.
 
+        With `db` (and the outbox and publisher enabled), the event is added
+        to the transactional outbox in that session: it is committed (or rolled back) with the caller's state
+        change and published by the outbox relay. Otherwise it is only
+        buffered (no I/O) and the publisher tasks deliver it in the background.
+
         Args:
             event_type: Type of event
             payload: Event data
             routing_key: Optional routing key (defaults to event_type)
+            correlation_id: Optional correlation ID for tracing
+            wait: Wait for buffer space and the broker confirm (bounded by
+                the confirm timeout) instead of fire-and-forget
+            db: Database session to write the event to the outbox in
 
         Returns:
-            True if published successfully
+            True if added to the outbox or buffered (or, with wait,
+            confirmed by the broker)
         """
-        try:
-            event_payload = self._create_event_payload(event_type, payload)
+        routing_key = routing_key or event_type
+        # The outbox is only written while the publisher (and so its relay) is enabled
+        use_outbox = db is not None and settings.OUTBOX_ENABLED and settings.EVENT_PUBLISHER_ENABLED
+        if not use_outbox:
+            if not self._running or not settings.EVENT_PUBLISHER_ENABLED:
+                logger.debug(f"EventService not started, event {event_type} not published")
+                return False
 
-            # Log event for now (until RabbitMQ fully integrated)
-            logger.info(
-                f"[EVENT] {event_type} | correlation_id={event_payload['correlation_id']} | "
-                f"payload={json.dumps(payload)}"
+        try:
+            event_payload = self._create_event_payload(event_type, payload, correlation_id)
+            correlation_id = event_payload["correlation_id"]
+
+            if use_outbox:
+                db.add(
+                    OutboxEvent(
+                        aggregate_id=str(payload.get("user_id") or event_type),
+                        event_type=event_type,
+                        routing_key=routing_key,
+                        correlation_id=correlation_id,
+                        payload=event_payload,
+                    )
+                )
+                logger.debug(f"[EVENT] {event_type} | correlation_id={correlation_id} | outbox")
+                return True
+
+            event = _PendingEvent(
+                event_type=event_type,
+                routing_key=routing_key,
+                body=json.dumps(event_payload).encode(),
+                correlation_id=correlation_id,
             )
+        except Exception as e:
+            logger.error(f"Failed to publish event {event_type}: {e}")
+            return False
 
-            # TODO: Actual RabbitMQ publishing
-            # if self._connected:
-            #     routing_key = routing_key or event_type
-            #     message = aio_pika.Message(
-            #         body=json.dumps(event_payload).encode(),
-            #         content_type="application/json",
-            #         delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
-            #     )
-            #     await self.channel.default_exchange.publish(
-            #         message, routing_key=routing_key
-            #     )
+        logger.debug(f"[EVENT] {event_type} | correlation_id={correlation_id}")
+        return await self._submit(event, wait)
 
-            return True
+    async def deliver(
+        self, event_type: str, routing_key: str, body: bytes, correlation_id: str
+    ) -> bool:
+        """
+        Publish an already serialized event and wait for the broker confirm.
 
-        except Exception as e:
-            logger.error(f"Failed to publish event {event_type}: {e}")
+        Used by the outbox relay.
+
+        Returns:
+            True if confirmed by the broker
+        """
+        if not self._running:
             return False
+        event = _PendingEvent(
+            event_type=event_type,
+            routing_key=routing_key,
+            body=body,
+            correlation_id=correlation_id,
+        )
+        return await self._submit(event, wait=True)
+
+    async def publish_after_commit(
+        self, event_type: str, payload: Dict[str, Any], db: Optional[AsyncSession] = None
+    ) -> bool:
+        """
+        Publish an event carrying a one-time token once `db` commits.
+
+        Never written to the outbox: undelivered rows can outlive a broker
+        outage (and reach backups and WAL), while the database otherwise only
+        keeps token hashes. The event is published directly, so it is never
+        sent for a rolled back transaction but can be lost if the process dies
+        before delivery (the user requests a new token).
+
+        Returns:
+            True if queued for after the commit (or, without `db`, buffered)
+        """
+        if db is None:
+            return await self.publish_event(event_type=event_type, payload=payload)
+
+        async def publish() -> None:
+            await self.publish_event(event_type=event_type, payload=payload)
+
+        after_commit(db, publish)
+        return True
+
+    async def _submit(self, event: _PendingEvent, wait: bool) -> bool:
+        """Buffer an event, optionally waiting for space and its confirm."""
+        if not wait:
+            return self._enqueue(event)
+
+        event.confirmed = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(self._buffer.put(event), timeout=self.confirm_timeout)
+            event_buffer_size.set(self._buffer.qsize())
+            return await asyncio.wait_for(
+                asyncio.shield(event.confirmed), timeout=self.confirm_timeout * 2
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out publishing event {event.event_type}")
+            return False
+
+    def _enqueue(self, event: _PendingEvent) -> bool:
+        """Buffer an event without blocking; drop it if the buffer is full."""
+        try:
+            self._buffer.put_nowait(event)
+        except asyncio.QueueFull:
+            events_published_total.labels(result="dropped").inc()
+            logger.warning(
+                f"Event buffer full, dropped {event.event_type} "
+                f"(correlation_id={event.correlation_id})"
+            )
+            self._resolve(event, False)
+            return False
+        event_buffer_size.set(self._buffer.qsize())
+        return True
+
+    async def _run(self, slot: int) -> None:
+        """Publisher task: take batches off the buffer and publish them on one channel."""
+        failures = 0
+        while True:
+            try:
+                if not self._connected and not await self.connect():
+                    failures = min(failures + 1, 6)
+                    await asyncio.sleep(0.5 * 2**failures)
+                    continue
+
+                batch = await self._next_batch()
+                exchange = self.exchanges[slot % len(self.exchanges)]
+                confirmed = await self._publish_batch(exchange, batch)
+                if confirmed:
+                    failures = 0
+                else:
+                    # Broker unreachable or nacking: back off instead of spinning
+                    failures = min(failures + 1, 6)
+                    await asyncio.sleep(0.05 * 2**failures)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event publisher error: {e}", exc_info=True)
+                await asyncio.sleep(1.0)
+
+    async def _next_batch(self) -> List[_PendingEvent]:
+        """Wait for one event, then take whatever else is queued, up to batch_size."""
+        batch = [await self._buffer.get()]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._buffer.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._buffer.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        event_buffer_size.set(self._buffer.qsize())
+        event_batch_size.observe(len(batch))
+        return batch
+
+    async def _publish_batch(self, exchange, batch: List[_PendingEvent]) -> int:
+        """
+        Publish a batch, pipelining the confirms.
+
+        Returns:
+            Number of events confirmed
+        """
+        try:
+            results = await asyncio.gather(*(self._publish_one(exchange, event) for event in batch))
+        finally:
+            for _ in batch:
+                self._buffer.task_done()
+        return sum(results)
+
+    @staticmethod
+    def _build_message(event: _PendingEvent):
+        """Build a persistent AMQP message for an event."""
+        import aio_pika
+
+        return aio_pika.Message(
+            body=event.body,
+            content_type="application/json",
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            message_id=event.correlation_id,
+            correlation_id=event.correlation_id,
+            type=event.event_type,
+            app_id="auth-service",
+        )
+
+    async def _publish_one(self, exchange, event: _PendingEvent) -> bool:
+        """Publish one event and wait for its confirm, requeueing it on failure."""
+        async with self._in_flight:
+            events_in_flight.inc()
+            start = time.perf_counter()
+            try:
+                await exchange.publish(
+                    self._build_message(event),
+                    routing_key=event.routing_key,
+                    timeout=self.confirm_timeout,
+                )
+            except Exception as e:
+                self._retry(event, e)
+                return False
+            finally:
+                events_in_flight.dec()
+
+        event_confirm_duration_seconds.observe(time.perf_counter() - start)
+        events_published_total.labels(result="confirmed").inc()
+        self._resolve(event, True)
+        return True
+
+    def _retry(self, event: _PendingEvent, error: Exception) -> None:
+        """Requeue a failed event, or give up after max_retries attempts."""
+        event.attempts += 1
+        if event.attempts < self.max_retries and self._running:
+            events_published_total.labels(result="retried").inc()
+            logger.warning(
+                f"Publish of {event.event_type} failed (attempt {event.attempts}): {error}"
+            )
+            self._enqueue(event)
+            return
+
+        events_published_total.labels(result="failed").inc()
+        logger.error(
+            f"Giving up on event {event.event_type} "
+            f"(correlation_id={event.correlation_id}): {error}"
+        )
+        self._resolve(event, False)
+
+    @staticmethod
+    def _resolve(event: _PendingEvent, confirmed: bool) -> None:
+        """Complete the waiter of a publish_event(wait=True) call."""
+        if event.confirmed is not None and not event.confirmed.done():
+            event.confirmed.set_result(confirmed)
 
     # ============================================
     # AUTH EVENTS
@@ -140,6 +487,7 @@ class EventService:
         email: str,
         full_name: str,
         verification_token: str,
+        db: Optional[AsyncSession] = None,
     ) -> bool:
         """
         Publish user.registered event.
@@ -149,7 +497,7 @@ class EventService:
         - Billing Service (create trial subscription)
         - Analytics Service (user acquisition metrics)
         """
-        return await self.publish_event(
+        return await self.publish_after_commit(
             event_type="user.registered",
             payload={
                 "user_id": user_id,
@@ -157,6 +505,7 @@ class EventService:
                 "full_name": full_name,
                 "verification_token": verification_token,
             },
+            db=db,
         )
 
     async def publish_user_logged_in(
@@ -165,6 +514,7 @@ class EventService:
         email: str,
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None,
+        db: Optional[AsyncSession] = None,
     ) -> bool:
         """
         Publish user.logged_in event.
@@ -181,6 +531,7 @@ class EventService:
                 "ip_address": ip_address,
                 "user_agent": user_agent,
             },
+            db=db,
         )
 
     async def publish_user_logged_out(
@@ -188,6 +539,7 @@ class EventService:
         user_id: str,
         email: str,
         session_id: str,
+        db: Optional[AsyncSession] = None,
     ) -> bool:
         """Publish user.logged_out event."""
         return await self.publish_event(
@@ -197,12 +549,14 @@ class EventService:
                 "email": email,
                 "session_id": session_id,
             },
+            db=db,
         )
 
     async def publish_user_email_verified(
         self,
         user_id: str,
         email: str,
+        db: Optional[AsyncSession] = None,
     ) -> bool:
         """
         Publish user.email_verified event.
@@ -217,6 +571,7 @@ class EventService:
                 "user_id": user_id,
                 "email": email,
             },
+            db=db,
         )
 
     async def publish_user_password_changed(
@@ -225,6 +580,7 @@ class EventService:
         email: str,
         changed_by: str = "user",
         ip_address: Optional[str] = None,
+        db: Optional[AsyncSession] = None,
     ) -> bool:
         """
         Publish user.password_changed event.
@@ -241,6 +597,7 @@ class EventService:
                 "changed_by": changed_by,
                 "ip_address": ip_address,
             },
+            db=db,
         )
 
     async def publish_password_reset_requested(
@@ -250,6 +607,7 @@ class EventService:
         full_name: str,
         reset_token: str,
         ip_address: Optional[str] = None,
+        db: Optional[AsyncSession] = None,
     ) -> bool:
         """
         Publish password_reset.requested event.
@@ -258,7 +616,7 @@ class EventService:
         - Notification Service (send reset email with token)
         - Audit Service (security audit)
         """
-        return await self.publish_event(
+        return await self.publish_after_commit(
             event_type="password_reset.requested",
             payload={
                 "user_id": user_id,
@@ -267,12 +625,14 @@ class EventService:
                 "reset_token": reset_token,
                 "ip_address": ip_address,
             },
+            db=db,
         )
 
     async def publish_user_2fa_enabled(
         self,
         user_id: str,
         email: str,
+        db: Optional[AsyncSession] = None,
     ) -> bool:
         """
         Publish user.2fa_enabled event.
@@ -287,12 +647,14 @@ class EventService:
                 "user_id": user_id,
                 "email": email,
             },
+            db=db,
         )
 
     async def publish_user_2fa_disabled(
         self,
         user_id: str,
         email: str,
+        db: Optional[AsyncSession] = None,
     ) -> bool:
         """Publish user.2fa_disabled event."""
         return await self.publish_event(
@@ -301,6 +663,7 @@ class EventService:
                 "user_id": user_id,
                 "email": email,
             },
+            db=db,
         )
 
     async def publish_user_deleted(
@@ -308,6 +671,7 @@ class EventService:
         user_id: str,
         email: str,
         deletion_reason: str = "user_request",
+        db: Optional[AsyncSession] = None,
     ) -> bool:
         """
         Publish user.deleted event.
@@ -323,6 +687,7 @@ class EventService:
                 "email": email,
                 "deletion_reason": deletion_reason,
             },
+            db=db,
         )
 
     async def publish_session_revoked(
@@ -330,6 +695,7 @@ class EventService:
         user_id: str,
         session_id: str,
         revoked_reason: str,
+        db: Optional[AsyncSession] = None,
     ) -> bool:
         """Publish session.revoked event."""
         return await self.publish_event(
@@ -339,6 +705,7 @@ class EventService:
                 "session_id": session_id,
                 "revoked_reason": revoked_reason,
             },
+            db=db,
         )
 
 
@@ -7,16 +7,21 @@ Secure JWT implementation with refresh tokens and CSRF protection
 import logging
 import uuid
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Sequence, Tuple
 
 from app.core.config import settings
-from app.core.database import get_db
-from app.core.redis import redis_client
+from app.core.database import after_commit, get_db
+from app.core.rate_limit import rate_limiter
+from app.core.redis import RedisUnavailable, redis_client
+from app.core.signing_keys import signing_keys
 from app.models.user import Session, User
+from app.services.activity_tracker import activity_tracker
+from app.services.principal_cache import AuthPrincipal, principal_cache
+from app.services.revocation_cache import revocation_cache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
@@ -30,6 +35,7 @@ class JWTService:
 
     def __init__(self):
         self.algorithm = settings.JWT_ALGORITHM
+        self.csrf_algorithm = "HS256"
         self.access_token_expire = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         self.refresh_token_expire = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
 
@@ -40,6 +46,7 @@ class JWTService:
         ip_address: str,
         user_agent: Optional[str] = None,
         device_id: Optional[str] = None,
+        commit: bool = True,
     ) -> Dict[str, Any]:
         """
         Create access and refresh tokens for a user.
@@ -50,77 +57,38 @@ class JWTService:
             ip_address: Client IP address
             user_agent: Client user agent
             device_id: Device identifier
+            commit: Commit the session row (False: the caller commits it with
+                its own changes via commit_session, which then updates Redis)
 
         Returns:
             Dictionary with access_token, refresh_token, and expiry info
         """
-        # Generate unique JTIs (JWT IDs)
-        access_jti = str(uuid.uuid4())
-        refresh_jti = str(uuid.uuid4())
-
-        # Calculate expiry times
-        now = datetime.now(timezone.utc)
-        access_expires = now + self.access_token_expire
-        refresh_expires = now + self.refresh_token_expire
-
-        # Create access token payload
-        access_payload = {
-            "sub": str(user.id),
-            "email": user.email,
-            "role": user.role,
-            "jti": access_jti,
-            "exp": access_expires,
-            "iat": now,
-            "type": "access",
-        }
-
-        # Create refresh token payload
-        refresh_payload = {
-            "sub": str(user.id),
-            "jti": refresh_jti,
-            "exp": refresh_expires,
-            "iat": now,
-            "type": "refresh",
-        }
+        session_epoch = await redis_client.get_session_epoch(str(user.id), strict=True)
+        session, tokens = self._issue_tokens(
+            user, ip_address, user_agent, device_id, session_epoch=session_epoch
+        )
 
-        # Encode tokens
-        access_token = jwt.encode(access_payload, settings.JWT_SECRET, algorithm=self.algorithm)
-        refresh_token = jwt.encode(refresh_payload, settings.JWT_SECRET, algorithm=self.algorithm)
+        async def store_in_redis() -> None:
+            # Store in Redis for quick validation (with expiry), one round trip
+            await redis_client.store_session(
+                session.access_token_jti,
+                session.refresh_token_jti,
+                str(user.id),
+                tokens["expires_in"],
+                tokens["refresh_expires_in"],
+            )
+            activity_tracker.touch(session.access_token_jti)
 
         # Store session in database
-        session = Session(
-            user_id=user.id,
-            access_token_jti=access_jti,
-            refresh_token_jti=refresh_jti,
-            access_expires_at=access_expires,
-            refresh_expires_at=refresh_expires,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            device_id=device_id,
-            device_name=self._get_device_name(user_agent),
-        )
         db.add(session)
-        await db.commit()
+        if commit:
+            await db.commit()
+            await store_in_redis()
+        else:
+            await db.flush()
+            after_commit(db, store_in_redis)
 
-        # Store in Redis for quick validation (with expiry)
-        await redis_client.setex(
-            f"session:access:{access_jti}",
-            int(self.access_token_expire.total_seconds()),
-            str(user.id),
-        )
-        await redis_client.setex(
-            f"session:refresh:{refresh_jti}",
-            int(self.refresh_token_expire.total_seconds()),
-            str(user.id),
-        )
-
-        return {
-            "access_token": access_token,
-            "refresh_token": refresh_token,
-            "token_type": "bearer",
-            "expires_in": int(self.access_token_expire.total_seconds()),
-            "refresh_expires_in": int(self.refresh_token_expire.total_seconds()),
-        }
+        return tokens
 
     async def refresh_tokens(
         self,
@@ -132,6 +100,10 @@ class JWTService:
         """
         Refresh access token using refresh token.
 
+        The old refresh token is consumed and the new session stored by a
+        single atomic Redis script, so a refresh token can only be spent once
+        even under concurrent requests.
+
         Args:
             refresh_token: Refresh token
             db: Database session
@@ -143,7 +115,7 @@ class JWTService:
         """
         try:
             # Decode refresh token
-            payload = jwt.decode(refresh_token, settings.JWT_SECRET, algorithms=[self.algorithm])
+            payload = self._decode(refresh_token)
 
             # Validate token type
             if payload.get("type") != "refresh":
@@ -153,12 +125,6 @@ class JWTService:
             refresh_jti = payload.get("jti")
             user_id = payload.get("sub")
 
-            # Check if refresh token is in Redis (not revoked)
-            redis_key = f"session:refresh:{refresh_jti}"
-            if not await redis_client.exists(redis_key):
-                logger.warning(f"Refresh token not found or revoked: {refresh_jti}")
-                return None
-
             # Get session from database
             result = await db.execute(
                 select(Session).where(Session.refresh_token_jti == refresh_jti, Session.is_active)
@@ -177,15 +143,54 @@ class JWTService:
                 logger.warning(f"User not found or inactive: {user_id}")
                 return None
 
-            # Revoke old tokens
-            await self.revoke_session(session.id, db, reason="token_refresh")
+            # New pair inherits the epoch; the rotation rejects superseded tokens
+            session_epoch = int(payload.get("sep", 0))
+            new_session, tokens = self._issue_tokens(
+                user, ip_address, user_agent, session_epoch=session_epoch
+            )
+            blacklist_ttl = int(self.refresh_token_expire.total_seconds())
 
-            # Create new tokens
-            return await self.create_tokens(user, db, ip_address, user_agent)
+            # Consume the old refresh token and store the new pair atomically
+            rotated = await redis_client.rotate_refresh_token(
+                old_access_jti=session.access_token_jti,
+                old_refresh_jti=refresh_jti,
+                new_access_jti=new_session.access_token_jti,
+                new_refresh_jti=new_session.refresh_token_jti,
+                user_id=str(user.id),
+                access_ttl=tokens["expires_in"],
+                refresh_ttl=tokens["refresh_expires_in"],
+                blacklist_ttl=blacklist_ttl,
+                session_epoch=session_epoch,
+                strict=True,
+            )
+            if not rotated:
+                logger.warning(f"Refresh token not found, revoked or already used: {refresh_jti}")
+                return None
+
+            # Revoke old session and persist the new one
+            try:
+                session.is_active = False
+                session.revoked_at = datetime.now(timezone.utc)
+                session.revoked_reason = "token_refresh"
+                db.add(new_session)
+                await db.commit()
+            except Exception:
+                await redis_client.revoke_session(
+                    new_session.access_token_jti, new_session.refresh_token_jti, blacklist_ttl
+                )
+                raise
+
+            # Invalidate cached validations in every worker
+            await revocation_cache.publish_revocation([session.access_token_jti])
+            activity_tracker.touch(new_session.access_token_jti)
+
+            return tokens
 
         except JWTError as e:
             logger.error(f"JWT refresh error: {e}")
             return None
+        except RedisUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Unexpected error during token refresh: {e}")
             return None
@@ -202,19 +207,40 @@ class JWTService:
         """
         try:
             # Decode token
-            payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[self.algorithm])
+            payload = self._decode(token)
 
             # Validate token type
             if payload.get("type") != "access":
                 return None
 
-            # Check if token is in Redis (not revoked)
+            # Check if token is in Redis (not revoked) and its session epoch is
+            # current, local cache first
             jti = payload.get("jti")
-            redis_key = f"session:access:{jti}"
-            if not await redis_client.exists(redis_key):
+            user_id = payload.get("sub")
+            token_epoch = int(payload.get("sep", 0))
+            if revocation_cache.is_superseded(user_id, token_epoch):
+                is_valid = False
+            else:
+                is_valid = revocation_cache.lookup(jti)
+            if is_valid is None:
+                # A revocation broadcast during the check vetoes its result
+                read = revocation_cache.begin_read(jti)
+                try:
+                    exists, session_epoch = await redis_client.check_session(jti, user_id)
+                except BaseException:
+                    revocation_cache.finish_read(jti, read, None)
+                    raise
+                is_valid = revocation_cache.finish_read(
+                    jti, read, exists and token_epoch >= session_epoch, payload.get("exp")
+                )
+
+            if not is_valid:
                 logger.warning(f"Access token not found or revoked: {jti}")
                 return None
 
+            # Buffered, written to PostgreSQL by the session activity worker
+            activity_tracker.touch(jti)
+
             return payload
 
         except JWTError as e:
@@ -249,19 +275,16 @@ class JWTService:
             session.revoked_reason = reason
             await db.commit()
 
-            # Remove from Redis
-            await redis_client.delete(f"session:access:{session.access_token_jti}")
-            await redis_client.delete(f"session:refresh:{session.refresh_token_jti}")
-
-            # Add to blacklist (for extra security)
-            blacklist_ttl = int(self.refresh_token_expire.total_seconds())
-            await redis_client.setex(
-                f"blacklist:access:{session.access_token_jti}", blacklist_ttl, "revoked"
-            )
-            await redis_client.setex(
-                f"blacklist:refresh:{session.refresh_token_jti}", blacklist_ttl, "revoked"
+            # Remove from Redis and blacklist (for extra security), atomically
+            await redis_client.revoke_session(
+                session.access_token_jti,
+                session.refresh_token_jti,
+                int(self.refresh_token_expire.total_seconds()),
             )
 
+            # Invalidate cached validations in every worker
+            await revocation_cache.publish_revocation([session.access_token_jti])
+
             return True
 
         except Exception as e:
@@ -269,7 +292,11 @@ class JWTService:
             return False
 
     async def revoke_all_user_sessions(
-        self, user_id: uuid.UUID, db: AsyncSession, reason: str = "security"
+        self,
+        user_id: uuid.UUID,
+        db: AsyncSession,
+        reason: str = "security",
+        commit: bool = True,
     ) -> int:
         """
         Revoke all sessions for a user.
@@ -278,27 +305,156 @@ class JWTService:
             user_id: User ID
             db: Database session
             reason: Revocation reason
+            commit: Commit the revocation (False: the caller commits it with
+                its own changes via commit_session, which then updates Redis)
+
+        Returns:
+            Number of sessions revoked
+
+        Raises:
+            RedisUnavailable: If the revocation could not reach Redis
+        """
+        await self.bump_session_epochs([user_id])
+        return await self._revoke_sessions_where(
+            db, reason, Session.user_id == user_id, commit=commit
+        )
+
+    async def revoke_users_sessions(
+        self, user_ids: Sequence[uuid.UUID], db: AsyncSession, reason: str = "security"
+    ) -> int:
+        """
+        Revoke all sessions for many users at once.
+
+        Args:
+            user_ids: User IDs
+            db: Database session
+            reason: Revocation reason
+
+        Returns:
+            Number of sessions revoked
+
+        Raises:
+            RedisUnavailable: If the revocation could not reach Redis
+        """
+        if not user_ids:
+            return 0
+        await self.bump_session_epochs(user_ids)
+        return await self._revoke_sessions_where(db, reason, Session.user_id.in_(user_ids))
+
+    async def revoke_organization_sessions(
+        self, organization_id: uuid.UUID, db: AsyncSession, reason: str = "security"
+    ) -> int:
+        """
+        Revoke all sessions of every user in an organization (incident response).
+
+        Args:
+            organization_id: Organization ID
+            db: Database session
+            reason: Revocation reason
+
+        Returns:
+            Number of sessions revoked
+        """
+        result = await db.execute(select(User.id).where(User.organization_id == organization_id))
+        return await self.revoke_users_sessions(result.scalars().all(), db, reason)
+
+    async def revoke_sessions_by_access_jti(
+        self, access_jtis: Sequence[str], db: AsyncSession, reason: str = "security"
+    ) -> int:
+        """
+        Revoke the sessions of the given access tokens.
+
+        Args:
+            access_jtis: Access token JTIs
+            db: Database session
+            reason: Revocation reason
 
         Returns:
             Number of sessions revoked
         """
+        if not access_jtis:
+            return 0
+        return await self._revoke_sessions_where(
+            db, reason, Session.access_token_jti.in_(access_jtis)
+        )
+
+    async def bump_session_epochs(self, user_ids: Sequence[uuid.UUID]) -> None:
+        """
+        Invalidate every outstanding token of the given users in O(1) per user.
+
+        Tokens carry the user's session epoch (`sep` claim); incrementing it
+        makes all previously issued access and refresh tokens fail validation
+        without enumerating sessions.
+
+        Args:
+            user_ids: User IDs
+
+        Raises:
+            RedisUnavailable: If the epochs could not be bumped
+        """
+        epochs = await redis_client.bump_session_epochs([str(user_id) for user_id in user_ids])
+        await revocation_cache.publish_epochs(epochs)
+
+    async def _revoke_sessions_where(
+        self,
+        db: AsyncSession,
+        reason: str,
+        *criteria: ColumnElement[bool],
+        commit: bool = True,
+    ) -> int:
+        """
+        Revoke every active session matching the criteria.
+
+        One `UPDATE ... RETURNING` marks the sessions revoked, then all token
+        keys are removed and blacklisted in one pipelined Redis batch.
+
+        Args:
+            db: Database session
+            reason: Revocation reason
+            criteria: Session filters
+            commit: Commit now, or defer the Redis updates to commit_session
+
+        Returns:
+            Number of sessions revoked
+
+        Raises:
+            RedisUnavailable: If the tokens could not be revoked in Redis
+                (after the commit when deferred to commit_session)
+        """
         try:
-            # Get all active sessions
             result = await db.execute(
-                select(Session).where(Session.user_id == user_id, Session.is_active)
+                update(Session)
+                .where(Session.is_active, *criteria)
+                .values(
+                    is_active=False,
+                    revoked_at=datetime.now(timezone.utc),
+                    revoked_reason=reason,
+                )
+                .returning(Session.access_token_jti, Session.refresh_token_jti)
+                .execution_options(synchronize_session=False)
             )
-            sessions = result.scalars().all()
+            token_pairs = [tuple(row) for row in result.all()]
+
+            async def revoke_in_redis() -> None:
+                if not token_pairs:
+                    return
+                await redis_client.revoke_sessions(
+                    token_pairs, int(self.refresh_token_expire.total_seconds()), strict=True
+                )
+                # Invalidate cached validations in every worker
+                await revocation_cache.publish_revocation([access for access, _ in token_pairs])
 
-            count = 0
-            for session in sessions:
-                if await self.revoke_session(session.id, db, reason):
-                    count += 1
+            if commit:
+                await db.commit()
+                await revoke_in_redis()
+            else:
+                after_commit(db, revoke_in_redis)
 
-            return count
+            return len(token_pairs)
 
         except Exception as e:
             logger.error(f"Error revoking user sessions: {e}")
-            return 0
+            raise
 
     async def generate_csrf_token(self, user_id: str) -> str:
         """
@@ -316,7 +472,7 @@ class JWTService:
             "exp": datetime.now(timezone.utc) + timedelta(hours=1),
             "type": "csrf",
         }
-        return jwt.encode(csrf_payload, settings.CSRF_SECRET, algorithm=self.algorithm)
+        return jwt.encode(csrf_payload, settings.CSRF_SECRET, algorithm=self.csrf_algorithm)
 
     async def validate_csrf_token(self, token: str, user_id: str) -> bool:
         """
@@ -330,25 +486,29 @@ class JWTService:
             Validation status
         """
         try:
-            payload = jwt.decode(token, settings.CSRF_SECRET, algorithms=[self.algorithm])
+            payload = jwt.decode(token, settings.CSRF_SECRET, algorithms=[self.csrf_algorithm])
             return payload.get("type") == "csrf" and payload.get("sub") == user_id
         except JWTError:
             return False
 
-    async def get_current_user(
+    async def get_current_principal(
         self,
         credentials: HTTPAuthorizationCredentials = Depends(security),
         db: AsyncSession = Depends(get_db),
-    ) -> User:
+    ) -> AuthPrincipal:
         """
-        FastAPI dependency to get current user from JWT token.
+        FastAPI dependency to get the authenticated principal from JWT token.
+
+        Served from the principal cache; use it for endpoints that only need
+        identity, role or account status. Also enforces the per-user API rate
+        limit.
 
         Args:
             credentials: HTTP Bearer credentials
             db: Database session
 
         Returns:
-            Current user object
+            Current auth principal
 
         Raises:
             HTTPException: If token is invalid or user not found
@@ -364,19 +524,60 @@ class JWTService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        user_id = payload.get("sub")
+        principal = await principal_cache.get(payload.get("sub"), db)
+
+        if not principal:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+
+        if not principal.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="User account is inactive",
+            )
+
+        # Per-user API limit (honors User.api_rate_limit_override)
+        await rate_limiter.hit_user(principal.id, principal.api_rate_limit_override)
+
+        return principal
+
+    async def get_current_user(
+        self,
+        credentials: HTTPAuthorizationCredentials = Depends(security),
+        db: AsyncSession = Depends(get_db),
+    ) -> User:
+        """
+        FastAPI dependency to get current user from JWT token.
+
+        Loads the full User row; use it only for endpoints that read profile
+        data or modify the user.
+
+        Args:
+            credentials: HTTP Bearer credentials
+            db: Database session
+
+        Returns:
+            Current user object
+
+        Raises:
+            HTTPException: If token is invalid or user not found
+        """
+        principal = await self.get_current_principal(credentials, db)
 
         # Get user from database
-        result = await db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        user = await db.get(User, principal.id)
 
         if not user:
+            await principal_cache.invalidate(principal.id)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found",
             )
 
         if not user.is_active:
+            await principal_cache.store(user)
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="User account is inactive",
@@ -384,6 +585,112 @@ class JWTService:
 
         return user
 
+    def _issue_tokens(
+        self,
+        user: User,
+        ip_address: str,
+        user_agent: Optional[str] = None,
+        device_id: Optional[str] = None,
+        session_epoch: int = 0,
+    ) -> Tuple[Session, Dict[str, Any]]:
+        """
+        Sign a new token pair and build its (unsaved) session.
+
+        Args:
+            user: User object
+            ip_address: Client IP address
+            user_agent: Client user agent
+            device_id: Device identifier
+            session_epoch: User session epoch embedded as the `sep` claim
+
+        Returns:
+            Session row and token response
+        """
+        # Generate unique JTIs (JWT IDs)
+        access_jti = str(uuid.uuid4())
+        refresh_jti = str(uuid.uuid4())
+
+        # Calculate expiry times
+        now = datetime.now(timezone.utc)
+        access_expires = now + self.access_token_expire
+        refresh_expires = now + self.refresh_token_expire
+
+        # Create access token payload
+        access_payload = {
+            "sub": str(user.id),
+            "email": user.email,
+            "role": user.role,
+            "jti": access_jti,
+            "exp": access_expires,
+            "iat": now,
+            "sep": session_epoch,
+            "type": "access",
+        }
+
+        # Create refresh token payload
+        refresh_payload = {
+            "sub": str(user.id),
+            "jti": refresh_jti,
+            "exp": refresh_expires,
+            "iat": now,
+            "sep": session_epoch,
+            "type": "refresh",
+        }
+
+        session = Session(
+            user_id=user.id,
+            access_token_jti=access_jti,
+            refresh_token_jti=refresh_jti,
+            access_expires_at=access_expires,
+            refresh_expires_at=refresh_expires,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            device_id=device_id,
+            device_name=self._get_device_name(user_agent),
+        )
+        tokens = {
+            "access_token": self._encode(access_payload),
+            "refresh_token": self._encode(refresh_payload),
+            "token_type": "bearer",
+            "expires_in": int(self.access_token_expire.total_seconds()),
+            "refresh_expires_in": int(self.refresh_token_expire.total_seconds()),
+        }
+        return session, tokens
+
+    def _encode(self, payload: Dict[str, Any]) -> str:
+        """
+        Sign a token payload.
+
+        Asymmetric algorithms sign with the active key of the keyring, so
+        other services can verify tokens against the published JWKS.
+
+        Args:
+            payload: JWT claims
+
+        Returns:
+            Encoded JWT
+        """
+        if self.algorithm.startswith("HS"):
+            return jwt.encode(payload, settings.JWT_SECRET, algorithm=self.algorithm)
+        return signing_keys.encode(payload)
+
+    def _decode(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token signature and expiry.
+
+        Args:
+            token: Encoded JWT
+
+        Returns:
+            Token claims
+
+        Raises:
+            JWTError: If the token is invalid
+        """
+        if self.algorithm.startswith("HS"):
+            return jwt.decode(token, settings.JWT_SECRET, algorithms=[self.algorithm])
+        return signing_keys.decode(token)
+
     def _get_device_name(self, user_agent: Optional[str]) -> Optional[str]:
         """
         Extract device name from user agent.
@@ -0,0 +1,106 @@
+"""
+Login Attempt Service
+=====================
+Failed-login tracking with Redis sliding windows (per user and per IP), so bad
+passwords never write to the users table unless a lock actually triggers
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class LoginAttemptService:
+    """
+    Sliding-window failed-login counters.
+
+    - `login_failures:user:{user_id}` locks the account after
+      MAX_LOGIN_ATTEMPTS failures within LOGIN_FAILURE_WINDOW_SECONDS
+    - `login_failures:ip:{ip}` blocks an IP after MAX_LOGIN_ATTEMPTS_PER_IP
+      failures (credential stuffing across many accounts)
+    - Only a triggered lock is mirrored to `users.locked_until`; if Redis is
+      unavailable failures are not counted (bcrypt cost still applies)
+    """
+
+    USER_KEY = "login_failures:user:{}"
+    IP_KEY = "login_failures:ip:{}"
+
+    def __init__(
+        self,
+        max_attempts: int = settings.MAX_LOGIN_ATTEMPTS,
+        max_attempts_per_ip: int = settings.MAX_LOGIN_ATTEMPTS_PER_IP,
+        window_seconds: int = settings.LOGIN_FAILURE_WINDOW_SECONDS,
+        lockout_minutes: int = settings.LOCKOUT_DURATION_MINUTES,
+    ):
+        self.max_attempts = max_attempts
+        self.max_attempts_per_ip = max_attempts_per_ip
+        self.window_seconds = window_seconds
+        self.lockout_duration = timedelta(minutes=lockout_minutes)
+
+    async def is_ip_blocked(self, ip_address: Optional[str]) -> bool:
+        """
+        Check whether an IP exceeded its failed-login budget.
+
+        Args:
+            ip_address: Client IP address
+
+        Returns:
+            True if logins from this IP should be refused
+        """
+        if not ip_address:
+            return False
+        count = await redis_client.sliding_window_count(
+            self.IP_KEY.format(ip_address), self.window_seconds
+        )
+        return count >= self.max_attempts_per_ip
+
+    async def record_failure(self, user: Optional[User], ip_address: Optional[str]) -> bool:
+        """
+        Record a failed login for the user (if known) and IP in one round trip.
+
+        Locks the account by setting `locked_until` when the user threshold is
+        reached; the caller commits only in that case.
+
+        Args:
+            user: User the attempt targeted (None if unknown email)
+            ip_address: Client IP address
+
+        Returns:
+            True if this failure locked the account
+        """
+        keys = []
+        if user is not None:
+            keys.append(self.USER_KEY.format(user.id))
+        if ip_address:
+            keys.append(self.IP_KEY.format(ip_address))
+        if not keys:
+            return False
+
+        counts = await redis_client.sliding_window_hit(keys, self.window_seconds)
+        if user is None or counts[0] < self.max_attempts:
+            return False
+
+        user.locked_until = datetime.now(timezone.utc) + self.lockout_duration
+        user.failed_login_count = counts[0]
+        await redis_client.delete(self.USER_KEY.format(user.id))
+        logger.warning(f"Account locked due to failed attempts: {user.email}")
+        return True
+
+    async def reset(self, user_id: str) -> None:
+        """
+        Clear a user's failed-login counter (successful login, admin unlock).
+
+        Args:
+            user_id: User ID
+        """
+        await redis_client.delete(self.USER_KEY.format(user_id))
+
+
+# Create service instance
+login_attempt_service = LoginAttemptService()
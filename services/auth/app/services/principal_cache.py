@@ -0,0 +1,212 @@
+"""
+Auth Principal Cache
+====================
+Compact, cached projection of the User row needed to authorize requests,
+so protected endpoints don't load the full 50-column row on every call
+"""
+
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Optional, Tuple, Union
+
+from app.core.config import settings
+from app.core.metrics import principal_cache_hits_total, principal_cache_misses_total
+from app.core.redis import redis_client
+from app.models.user import User
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AuthPrincipal:
+    """Authorization-relevant subset of a User."""
+
+    id: uuid.UUID
+    email: str
+    role: str
+    status: str
+    deleted_at: Optional[datetime]
+    email_verified: bool
+    mfa_enabled: bool
+    organization_id: Optional[uuid.UUID]
+    api_rate_limit_override: Optional[int] = None
+
+    @property
+    def is_active(self) -> bool:
+        """Check if user is active (same rule as User.is_active)."""
+        return self.status == "active" and self.deleted_at is None
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthPrincipal":
+        """Build a principal from a loaded User row."""
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            status=user.status,
+            deleted_at=user.deleted_at,
+            email_verified=bool(user.email_verified),
+            mfa_enabled=bool(user.mfa_enabled),
+            organization_id=user.organization_id,
+            api_rate_limit_override=user.api_rate_limit_override,
+        )
+
+    def to_json(self) -> str:
+        """Serialize for Redis."""
+        data = asdict(self)
+        data["id"] = str(self.id)
+        data["deleted_at"] = self.deleted_at.isoformat() if self.deleted_at else None
+        data["organization_id"] = str(self.organization_id) if self.organization_id else None
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "AuthPrincipal":
+        """Deserialize from Redis."""
+        data = json.loads(raw)
+        data["id"] = uuid.UUID(data["id"])
+        if data.get("deleted_at"):
+            data["deleted_at"] = datetime.fromisoformat(data["deleted_at"])
+        if data.get("organization_id"):
+            data["organization_id"] = uuid.UUID(data["organization_id"])
+        return cls(**data)
+
+
+# Columns loaded on a cache miss (instead of the full row)
+PRINCIPAL_COLUMNS = (
+    User.id,
+    User.email,
+    User.role,
+    User.status,
+    User.deleted_at,
+    User.email_verified,
+    User.mfa_enabled,
+    User.organization_id,
+    User.api_rate_limit_override,
+)
+
+
+class PrincipalCache:
+    """
+    Two-level principal cache: per-process LRU in front of Redis.
+
+    - Redis entries (`principal:{user_id}`) are written through on every change
+      and live `ttl_seconds`
+    - Local entries live `local_ttl_seconds`, which bounds how long another
+      replica can serve a stale principal; changes that must apply instantly
+      (lock, deletion) also revoke sessions, which is broadcast to all workers
+    """
+
+    KEY_PREFIX = "principal:"
+
+    def __init__(
+        self,
+        max_entries: int = settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = settings.PRINCIPAL_CACHE_TTL_SECONDS,
+        local_ttl_seconds: int = settings.PRINCIPAL_CACHE_LOCAL_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.local_ttl_seconds = local_ttl_seconds
+
+        # user_id -> (principal, monotonic expiry)
+        self._entries: "OrderedDict[str, Tuple[AuthPrincipal, float]]" = OrderedDict()
+
+    async def get(
+        self, user_id: Union[str, uuid.UUID], db: AsyncSession
+    ) -> Optional[AuthPrincipal]:
+        """
+        Get a principal, loading the projection from PostgreSQL on a miss.
+
+        Args:
+            user_id: User ID
+            db: Database session
+
+        Returns:
+            Principal or None if the user does not exist
+        """
+        key = str(user_id)
+
+        # 1. Local LRU
+        entry = self._entries.get(key)
+        if entry is not None:
+            principal, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                principal_cache_hits_total.labels(layer="local").inc()
+                return principal
+            del self._entries[key]
+
+        # 2. Redis
+        raw = await redis_client.get(f"{self.KEY_PREFIX}{key}")
+        if raw:
+            try:
+                principal = AuthPrincipal.from_json(raw)
+                self._put(key, principal)
+                principal_cache_hits_total.labels(layer="redis").inc()
+                return principal
+            except (TypeError, ValueError, KeyError) as e:
+                logger.warning(f"Discarding malformed principal cache entry for {key}: {e}")
+
+        # 3. PostgreSQL (projection only)
+        principal_cache_misses_total.inc()
+        try:
+            user_uuid = uuid.UUID(key)
+        except ValueError:
+            return None
+
+        result = await db.execute(select(*PRINCIPAL_COLUMNS).where(User.id == user_uuid))
+        row = result.first()
+        if row is None:
+            return None
+
+        principal = AuthPrincipal(**row._asdict())
+        await self._write(principal)
+        return principal
+
+    async def store(self, user: User) -> None:
+        """
+        Write through the current state of a user (call after commit).
+
+        Args:
+            user: Updated User row
+        """
+        await self._write(AuthPrincipal.from_user(user))
+
+    async def invalidate(self, user_id: Union[str, uuid.UUID]) -> None:
+        """
+        Drop a cached principal from both levels.
+
+        Args:
+            user_id: User ID
+        """
+        key = str(user_id)
+        self._entries.pop(key, None)
+        await redis_client.delete(f"{self.KEY_PREFIX}{key}")
+
+    def clear(self) -> None:
+        """Drop every local entry."""
+        self._entries.clear()
+
+    async def _write(self, principal: AuthPrincipal) -> None:
+        """Store a principal in Redis and the local LRU."""
+        key = str(principal.id)
+        self._put(key, principal)
+        await redis_client.setex(f"{self.KEY_PREFIX}{key}", self.ttl_seconds, principal.to_json())
+
+    def _put(self, key: str, principal: AuthPrincipal) -> None:
+        """Insert a local entry, evicting the least recently used ones if full."""
+        self._entries[key] = (principal, time.monotonic() + self.local_ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Singleton instance
+principal_cache = PrincipalCache()
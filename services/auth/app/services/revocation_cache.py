@@ -0,0 +1,339 @@
+"""
+Access Token Revocation Cache
+=============================
+Per-worker allow/deny cache of access token JTIs, kept coherent across
+replicas through Redis pub/sub revocation broadcasts
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import (
+    revocation_cache_hits_total,
+    revocation_cache_invalidations_total,
+    revocation_cache_misses_total,
+    revocation_cache_size,
+)
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationCache:
+    """
+    Bounded, TTL-aware cache in front of the Redis `session:access:{jti}` check.
+
+    - Lookups cached from Redis live at most `ttl_seconds` (never past token expiry)
+    - "Allow" entries are only served while the revocation listener is subscribed,
+      so a worker that may have missed a broadcast always falls back to Redis
+    - Explicit revocations are cached as "deny" for the full access token lifetime;
+      an "allow" never replaces a live deny, and a revocation arriving while a
+      Redis check is in flight vetoes that check (see `begin_read`)
+    - Session epoch bumps ("log out everywhere") are kept as per-user floors for
+      the access token lifetime; tokens carrying an older epoch are denied
+    - Least recently used entries are evicted once `max_entries` is reached
+    """
+
+    RECONNECT_DELAY_SECONDS = 1.0
+
+    def __init__(
+        self,
+        max_entries: int = settings.REVOCATION_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = settings.REVOCATION_CACHE_TTL_SECONDS,
+        channel: str = settings.REVOCATION_CHANNEL,
+        enabled: bool = settings.REVOCATION_CACHE_ENABLED,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.channel = channel
+        self.enabled = enabled
+        self.revoked_ttl_seconds = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+        # jti -> (allowed, monotonic expiry)
+        self._entries: "OrderedDict[str, Tuple[bool, float]]" = OrderedDict()
+        # user_id -> (minimum valid session epoch, monotonic expiry)
+        self._epochs: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        # jti -> veto flags of Redis checks in flight
+        self._pending: Dict[str, List[List[bool]]] = {}
+        self._generation = 0
+        self._listening = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_listening(self) -> bool:
+        """Whether revocation broadcasts are currently being received."""
+        return self._listening
+
+    def lookup(self, jti: str) -> Optional[bool]:
+        """
+        Look up a JTI in the local cache.
+
+        Args:
+            jti: Access token JTI
+
+        Returns:
+            True if known valid, False if known revoked, None on cache miss
+        """
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(jti)
+        if entry is not None:
+            allowed, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._entries.pop(jti, None)
+            elif not allowed or self._listening:
+                self._entries.move_to_end(jti)
+                revocation_cache_hits_total.labels(result="allow" if allowed else "deny").inc()
+                return allowed
+
+        revocation_cache_misses_total.inc()
+        return None
+
+    def store(self, jti: str, allowed: bool, token_exp: Optional[float] = None) -> None:
+        """
+        Cache the result of a Redis revocation check.
+
+        Args:
+            jti: Access token JTI
+            allowed: Whether the token session exists in Redis
+            token_exp: Token `exp` claim (unix timestamp)
+        """
+        if not self.enabled:
+            return
+
+        ttl = float(self.ttl_seconds)
+        if token_exp is not None:
+            ttl = min(ttl, float(token_exp) - time.time())
+        if ttl <= 0:
+            return
+
+        current = self._entries.get(jti)
+        if allowed and current is not None and not current[0] and current[1] > time.monotonic():
+            return  # never resurrect a revoked token
+
+        self._put(jti, allowed, ttl)
+
+    def begin_read(self, jti: str) -> Tuple[int, List[bool]]:
+        """
+        Register a Redis check in flight, so a revocation arriving before its
+        reply vetoes it. Pass the result to `finish_read`.
+        """
+        flag = [False]
+        self._pending.setdefault(jti, []).append(flag)
+        return self._generation, flag
+
+    def finish_read(
+        self,
+        jti: str,
+        read: Tuple[int, List[bool]],
+        allowed: Optional[bool],
+        token_exp: Optional[float] = None,
+    ) -> Optional[bool]:
+        """
+        Complete a check started with `begin_read`, caching its result.
+
+        Args:
+            jti: Access token JTI
+            read: Value returned by `begin_read`
+            allowed: Redis result (None if the check failed)
+            token_exp: Token `exp` claim (unix timestamp)
+
+        Returns:
+            False if the token was revoked while the check was in flight,
+            otherwise `allowed`
+        """
+        generation, flag = read
+        pending = self._pending.get(jti)
+        if pending is not None:
+            pending.remove(flag)
+            if not pending:
+                del self._pending[jti]
+
+        if flag[0]:
+            return False
+        # A listener drop meanwhile means a revocation may have been missed
+        if allowed is not None and generation == self._generation:
+            self.store(jti, allowed, token_exp)
+        return allowed
+
+    def invalidate(self, jtis: Iterable[str], source: str = "local") -> None:
+        """
+        Mark JTIs as revoked in the local cache.
+
+        Args:
+            jtis: Access token JTIs
+            source: Invalidation origin for metrics (local, pubsub)
+        """
+        if not self.enabled:
+            return
+
+        for jti in jtis:
+            for flag in self._pending.get(str(jti), ()):
+                flag[0] = True
+            self._put(str(jti), False, float(self.revoked_ttl_seconds))
+            revocation_cache_invalidations_total.labels(source=source).inc()
+
+    def is_superseded(self, user_id: str, token_epoch: int) -> bool:
+        """
+        Check a token's session epoch against locally known bumps.
+
+        Args:
+            user_id: Token subject
+            token_epoch: Token `sep` claim
+
+        Returns:
+            True if the user's sessions were invalidated after the token was issued
+        """
+        if not self.enabled:
+            return False
+
+        entry = self._epochs.get(user_id)
+        if entry is None:
+            return False
+        epoch, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._epochs[user_id]
+            return False
+        return token_epoch < epoch
+
+    def advance_epochs(self, epochs: Dict[str, int], source: str = "local") -> None:
+        """
+        Record session epoch bumps.
+
+        Args:
+            epochs: New session epoch per user ID
+            source: Invalidation origin for metrics (local, pubsub)
+        """
+        if not self.enabled:
+            return
+
+        expires_at = time.monotonic() + self.revoked_ttl_seconds
+        for user_id, epoch in epochs.items():
+            current = self._epochs.get(str(user_id))
+            if current is not None and current[0] > int(epoch):
+                continue
+            self._epochs[str(user_id)] = (int(epoch), expires_at)
+            self._epochs.move_to_end(str(user_id))
+            revocation_cache_invalidations_total.labels(source=source).inc()
+        while len(self._epochs) > self.max_entries:
+            self._epochs.popitem(last=False)
+
+    async def publish_epochs(self, epochs: Dict[str, int]) -> None:
+        """
+        Apply session epoch bumps locally and broadcast them to every replica.
+
+        Args:
+            epochs: New session epoch per user ID
+        """
+        epochs = {str(user_id): int(epoch) for user_id, epoch in epochs.items()}
+        if not epochs:
+            return
+
+        self.advance_epochs(epochs, source="local")
+        await redis_client.publish(self.channel, json.dumps({"epochs": epochs}))
+
+    async def publish_revocation(self, jtis: Iterable[str]) -> None:
+        """
+        Invalidate JTIs locally and broadcast the revocation to every replica.
+
+        Args:
+            jtis: Revoked access token JTIs
+        """
+        jtis = [str(jti) for jti in jtis if jti]
+        if not jtis:
+            return
+
+        self.invalidate(jtis, source="local")
+        await redis_client.publish(self.channel, json.dumps({"jtis": jtis}))
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self._entries.clear()
+        self._epochs.clear()
+        revocation_cache_size.set(0)
+
+    async def start(self) -> None:
+        """Start the background revocation listener."""
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._listen())
+        logger.info(f"Revocation cache listener started (channel={self.channel})")
+
+    async def stop(self) -> None:
+        """Stop the background revocation listener."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Revocation cache listener stopped")
+
+    async def _listen(self) -> None:
+        """Subscribe to the revocation channel, reconnecting on failure."""
+        while True:
+            pubsub = redis_client.pubsub()
+            if pubsub is None:
+                await asyncio.sleep(self.RECONNECT_DELAY_SECONDS)
+                continue
+
+            try:
+                await pubsub.subscribe(self.channel)
+                self._listening = True
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._handle_message(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Revocation listener error: {e}")
+            finally:
+                self._on_listener_lost()
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+            await asyncio.sleep(self.RECONNECT_DELAY_SECONDS)
+
+    def _handle_message(self, data: Optional[str]) -> None:
+        """Apply a revocation broadcast."""
+        try:
+            message = json.loads(data)
+            jtis = message.get("jtis", [])
+            epochs = message.get("epochs", {})
+            self.invalidate(jtis, source="pubsub")
+            self.advance_epochs(epochs, source="pubsub")
+        except (TypeError, ValueError, AttributeError):
+            logger.warning(f"Malformed revocation message: {data!r}")
+
+    def _on_listener_lost(self) -> None:
+        """Forget "allow" entries, since revocations may have been missed."""
+        self._listening = False
+        self._generation += 1
+        allowed = [jti for jti, (is_allowed, _) in self._entries.items() if is_allowed]
+        for jti in allowed:
+            del self._entries[jti]
+        if allowed:
+            revocation_cache_invalidations_total.labels(source="reset").inc(len(allowed))
+        revocation_cache_size.set(len(self._entries))
+
+    def _put(self, jti: str, allowed: bool, ttl: float) -> None:
+        """Insert an entry, evicting the least recently used ones if full."""
+        self._entries[jti] = (allowed, time.monotonic() + ttl)
+        self._entries.move_to_end(jti)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        revocation_cache_size.set(len(self._entries))
+
+
+# Singleton instance
+revocation_cache = RevocationCache()
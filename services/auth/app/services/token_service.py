@@ -59,6 +59,7 @@ class TokenService:
         db: AsyncSession,
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None,
+        commit: bool = True,
     ) -> str:
         """
         Create password reset token with hybrid storage.
@@ -73,6 +74,8 @@ class TokenService:
             db: Database session
             ip_address: Client IP for audit
             user_agent: Client user agent for audit
+            commit: Commit the audit record (False: flush only, the caller
+                commits it with its own changes)
 
         Returns:
             Plaintext token to send via email
@@ -106,7 +109,10 @@ class TokenService:
         )
 
         db.add(db_token)
-        await db.commit()
+        if commit:
+            await db.commit()
+        else:
+            await db.flush()
 
         logger.info(
             f"Password reset token audit record created for user {user.email} (DB ID: {db_token.id})"
@@ -161,13 +167,16 @@ class TokenService:
         logger.warning("Invalid password reset token attempted")
         return None
 
-    async def mark_password_reset_token_used(self, token: str, db: AsyncSession) -> bool:
+    async def mark_password_reset_token_used(
+        self, token: str, db: AsyncSession, commit: bool = True
+    ) -> bool:
         """
         Mark password reset token as used and remove from Redis.
 
         Args:
             token: Plaintext token
             db: Database session
+            commit: Commit the change (False: the caller commits it)
 
         Returns:
             True if marked successfully
@@ -189,7 +198,8 @@ class TokenService:
         if db_token:
             db_token.used = True
             db_token.used_at = datetime.now(timezone.utc)
-            await db.commit()
+            if commit:
+                await db.commit()
             logger.info(f"Password reset token marked as used (DB ID: {db_token.id})")
             return True
 
@@ -201,6 +211,7 @@ class TokenService:
         db: AsyncSession,
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None,
+        commit: bool = True,
     ) -> str:
         """
         Create email verification token with hybrid storage.
@@ -215,6 +226,8 @@ class TokenService:
             db: Database session
             ip_address: Client IP for audit
             user_agent: Client user agent for audit
+            commit: Commit the audit record (False: flush only, the caller
+                commits it with its own changes)
 
         Returns:
             Plaintext token to send via email
@@ -250,7 +263,10 @@ class TokenService:
         )
 
         db.add(db_token)
-        await db.commit()
+        if commit:
+            await db.commit()
+        else:
+            await db.flush()
 
         logger.info(
             f"Email verification token audit record created for user {user.email} (DB ID: {db_token.id})"
@@ -306,13 +322,16 @@ class TokenService:
         logger.warning("Invalid email verification token attempted")
         return None
 
-    async def mark_email_verification_token_used(self, token: str, db: AsyncSession) -> bool:
+    async def mark_email_verification_token_used(
+        self, token: str, db: AsyncSession, commit: bool = True
+    ) -> bool:
         """
         Mark email verification token as used and remove from Redis.
 
         Args:
             token: Plaintext token
             db: Database session
+            commit: Commit the change (False: the caller commits it)
 
         Returns:
             True if marked successfully
@@ -334,7 +353,8 @@ class TokenService:
         if db_token:
             db_token.used = True
             db_token.used_at = datetime.now(timezone.utc)
-            await db.commit()
+            if commit:
+                await db.commit()
             logger.info(f"Email verification token marked as used (DB ID: {db_token.id})")
             return True
 
@@ -0,0 +1,77 @@
+"""
+User Search
+===========
+Admin user search backed by indexes: exact-match fast paths for identifiers
+and ranked pg_trgm substring matching for free text
+"""
+
+import re
+from dataclasses import dataclass
+
+from app.models.user import User
+from sqlalchemy import ColumnElement, case, func, literal, or_
+
+# Shapes that are answered by an exact (btree) lookup
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+TAX_CODE_PATTERN = re.compile(
+    r"^[A-Z]{6}[0-9LMNPQRSTUV]{2}[A-Z][0-9LMNPQRSTUV]{2}[A-Z][0-9LMNPQRSTUV]{3}[A-Z]$"
+)
+
+# Columns with trigram GIN indexes (migration 004)
+TRIGRAM_COLUMNS = (User.email, User.full_name, User.company_name)
+
+
+@dataclass(frozen=True)
+class UserSearch:
+    """Filter and ranking for one search term."""
+
+    condition: ColumnElement[bool]
+    rank: ColumnElement[float]
+    exact: bool
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so the term matches literally."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_user_search(term: str) -> UserSearch:
+    """
+    Build the search filter and rank for a term.
+
+    - An email address matches `lower(email)` exactly
+    - An Italian tax code (codice fiscale) matches `upper(tax_code)` exactly
+    - Anything else matches `professional_id` exactly or email, full name and
+      company name by substring (trigram index), ranked by similarity with
+      exact professional_id hits first
+
+    Args:
+        term: Search term
+
+    Returns:
+        UserSearch
+    """
+    term = term.strip()
+
+    if EMAIL_PATTERN.match(term):
+        return UserSearch(
+            condition=func.lower(User.email) == term.lower(), rank=literal(1.0), exact=True
+        )
+
+    if TAX_CODE_PATTERN.match(term.upper()):
+        return UserSearch(
+            condition=func.upper(User.tax_code) == term.upper(), rank=literal(1.0), exact=True
+        )
+
+    pattern = f"%{escape_like(term)}%"
+    professional_match = User.professional_id == term
+    condition = or_(
+        professional_match,
+        *(column.ilike(pattern, escape="\\") for column in TRIGRAM_COLUMNS),
+    )
+    similarity = func.greatest(
+        *(func.coalesce(func.similarity(column, term), 0.0) for column in TRIGRAM_COLUMNS)
+    )
+    rank = case((professional_match, 1.0), else_=0.0) + similarity
+
+    return UserSearch(condition=condition, rank=rank, exact=False)
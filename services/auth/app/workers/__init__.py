@@ -0,0 +1,12 @@
+"""
+Workers Package
+===============
+Background workers for asynchronous task processing.
+"""
+
+from .health_monitor import HealthMonitor
+from .outbox_relay import OutboxRelay
+from .reaper_worker import ReaperWorker
+from .session_activity_worker import SessionActivityWorker
+
+__all__ = ["HealthMonitor", "OutboxRelay", "ReaperWorker", "SessionActivityWorker"]
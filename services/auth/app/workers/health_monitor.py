@@ -0,0 +1,207 @@
+"""
+Health Monitor
+==============
+Background worker that probes dependencies (PostgreSQL, Redis, Vault) on an
+interval, so /health and /ready answer from the last result instead of
+hitting every dependency on each Kubernetes probe.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.metrics import dependency_probe_duration_seconds, dependency_up
+from app.core.redis import redis_client
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DependencyStatus:
+    """Outcome of the last probe of a dependency."""
+
+    healthy: bool
+    latency_ms: float
+    checked_at: datetime
+    error: Optional[str] = None
+    required: bool = True  # False when the dependency is not configured
+
+    def to_dict(self) -> Dict:
+        """JSON-friendly representation."""
+        data = asdict(self)
+        data["checked_at"] = self.checked_at.isoformat()
+        return data
+
+
+class HealthMonitor:
+    """
+    Background dependency prober.
+
+    Features:
+    - Probes every dependency concurrently every `interval` seconds, each
+      bounded by `timeout`
+    - Records latency and up/down state in Prometheus
+    - A probe returning None marks its dependency as not required (healthy)
+    - Results older than `max_age` (monitor stalled) are reported unhealthy
+    """
+
+    def __init__(
+        self,
+        interval: float = settings.HEALTH_CHECK_INTERVAL_SECONDS,
+        timeout: float = settings.HEALTH_PROBE_TIMEOUT_SECONDS,
+    ):
+        """
+        Initialize health monitor.
+
+        Args:
+            interval: Seconds between probe rounds
+            timeout: Seconds before a probe counts as failed
+        """
+        self.interval = interval
+        self.timeout = timeout
+        self.max_age = max(interval * 3, timeout * 2)
+        self.probes: Dict[str, Callable[[], Awaitable[Optional[bool]]]] = {
+            "database": self._probe_database,
+            "redis": self._probe_redis,
+            "vault": self._probe_vault,
+        }
+        self._status: Dict[str, DependencyStatus] = {}
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Probe once, then keep probing in the background."""
+        if self._task is None:
+            await self.probe_all()
+            self._running = True
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Health monitor started (interval={self.interval}s)")
+
+    async def stop(self) -> None:
+        """Stop the monitor."""
+        self._running = False
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        logger.info("Health monitor stopped")
+
+    async def _run(self) -> None:
+        """Run until stopped."""
+        while self._running:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.error(f"Health monitor error: {e}", exc_info=True)
+
+    async def probe_all(self) -> Dict[str, DependencyStatus]:
+        """
+        Probe every dependency concurrently and store the results.
+
+        Returns:
+            Status per dependency
+        """
+        names = list(self.probes)
+        results = await asyncio.gather(*(self._probe(name) for name in names))
+        self._status.update(zip(names, results))
+        return dict(self._status)
+
+    async def _probe(self, name: str) -> DependencyStatus:
+        """Run one probe with a timeout, recording its latency."""
+        error = None
+        required = True
+        start = time.perf_counter()
+        try:
+            healthy = await asyncio.wait_for(self.probes[name](), timeout=self.timeout)
+            if healthy is None:
+                healthy, required = True, False
+        except asyncio.TimeoutError:
+            healthy, error = False, f"timeout after {self.timeout}s"
+        except Exception as e:
+            healthy, error = False, str(e)
+        elapsed = time.perf_counter() - start
+
+        dependency_probe_duration_seconds.labels(dependency=name).observe(elapsed)
+        dependency_up.labels(dependency=name).set(1 if healthy else 0)
+        if not healthy:
+            logger.warning(f"Health probe failed for {name}: {error or 'unhealthy'}")
+
+        return DependencyStatus(
+            healthy=healthy,
+            latency_ms=round(elapsed * 1000, 2),
+            checked_at=datetime.now(timezone.utc),
+            error=error,
+            required=required,
+        )
+
+    def status(self) -> Dict[str, DependencyStatus]:
+        """
+        Last known status per dependency (no I/O).
+
+        Dependencies never probed, or whose last probe is older than
+        `max_age`, are reported unhealthy.
+        """
+        now = datetime.now(timezone.utc)
+        status = {}
+        for name in self.probes:
+            current = self._status.get(name)
+            if current is None:
+                current = DependencyStatus(False, 0.0, now, "not probed yet")
+            elif (now - current.checked_at).total_seconds() > self.max_age:
+                current = DependencyStatus(
+                    False, current.latency_ms, current.checked_at, "probe result stale"
+                )
+            status[name] = current
+        return status
+
+    def is_healthy(self, name: str) -> bool:
+        """Whether a dependency was healthy at the last (fresh) probe."""
+        return self.status()[name].healthy
+
+    @staticmethod
+    async def _probe_database() -> bool:
+        """Round trip to PostgreSQL."""
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return True
+
+    @staticmethod
+    async def _probe_redis() -> bool:
+        """PING Redis (reconnects if the startup connection failed)."""
+        return await redis_client.ping()
+
+    @staticmethod
+    async def _probe_vault() -> Optional[bool]:
+        """Check the Vault token (hvac is blocking, so off the event loop)."""
+        vault = settings.vault_client.vault
+        if vault.client is None:
+            # Not configured: secrets come from environment variables
+            return None
+        return await asyncio.to_thread(vault.client.is_authenticated)
+
+
+# Singleton instance for easy import
+_health_monitor: Optional[HealthMonitor] = None
+
+
+def get_health_monitor() -> HealthMonitor:
+    """
+    Get or create health monitor singleton.
+
+    Returns:
+        HealthMonitor instance
+    """
+    global _health_monitor
+    if _health_monitor is None:
+        _health_monitor = HealthMonitor()
+    return _health_monitor
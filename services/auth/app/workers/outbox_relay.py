@@ -0,0 +1,257 @@
+"""
+Outbox Relay
+============
+Background worker that publishes committed outbox rows to RabbitMQ, so
+request latency does not depend on the broker and no event is lost
+between the database commit and the publish.
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.metrics import outbox_events_relayed_total, outbox_relay_lag_seconds
+from app.models.outbox import OUTBOX_CHANNEL, OutboxEvent
+from app.services.event_service import event_service
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """
+    Background outbox relay.
+
+    Features:
+    - Wakes on LISTEN auth_outbox (NOTIFY sent by an insert trigger at
+      commit), with a `poll_interval` fallback
+    - Claims up to `batch_size` rows with FOR UPDATE SKIP LOCKED, so several
+      replicas can relay concurrently without blocking each other
+    - Per aggregate, only the oldest pending rows are published, in id order
+      and one confirm at a time; different aggregates are published
+      concurrently through the event service channel pool
+    - Confirmed rows are deleted; failed rows are retried with exponential
+      backoff (delivery is at least once, consumers dedupe on message_id)
+    """
+
+    def __init__(
+        self,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        poll_interval: float = settings.OUTBOX_POLL_INTERVAL_SECONDS,
+        max_backoff: int = settings.OUTBOX_MAX_BACKOFF_SECONDS,
+    ):
+        """
+        Initialize outbox relay.
+
+        Args:
+            batch_size: Max rows claimed per transaction
+            poll_interval: Seconds between polls when no NOTIFY arrives
+            max_backoff: Max seconds before a failed row is retried
+        """
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._listen_conn = None
+        self._listener = None
+
+    async def start(self) -> None:
+        """Start the relay."""
+        if self._task is None:
+            self._running = True
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Outbox relay started (batch_size={self.batch_size})")
+
+    async def stop(self) -> None:
+        """Stop the relay."""
+        self._running = False
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await self._close_listener()
+        logger.info("Outbox relay stopped")
+
+    async def _run(self) -> None:
+        """Relay until stopped."""
+        while self._running:
+            self._wakeup.clear()
+            delivered = 0
+            try:
+                await self._ensure_listener()
+                delivered = await self.relay_batch()
+            except Exception as e:
+                logger.error(f"Outbox relay error: {e}", exc_info=True)
+
+            # A full batch means there is probably more backlog
+            if delivered >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _ensure_listener(self) -> None:
+        """LISTEN on a dedicated connection (reopened if it was lost)."""
+        if self._listener is not None and not self._listener.is_closed():
+            return
+        await self._close_listener()
+        try:
+            self._listen_conn = await engine.connect()
+            raw = await self._listen_conn.get_raw_connection()
+            self._listener = raw.driver_connection
+            await self._listener.add_listener(OUTBOX_CHANNEL, self._on_notify)
+        except Exception as e:
+            logger.warning(f"Outbox LISTEN unavailable, polling every {self.poll_interval}s: {e}")
+            await self._close_listener()
+
+    async def _close_listener(self) -> None:
+        """Close the LISTEN connection."""
+        if self._listen_conn is not None:
+            try:
+                await self._listen_conn.close()
+            except Exception:
+                pass
+        self._listen_conn = None
+        self._listener = None
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        """asyncpg notification callback."""
+        self._wakeup.set()
+
+    async def relay_batch(self) -> int:
+        """
+        Claim, publish and settle one batch of outbox rows.
+
+        Returns:
+            Number of rows delivered
+        """
+        if not event_service.is_connected:
+            return 0
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(OutboxEvent)
+                .where(OutboxEvent.available_at <= func.now())
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            claimed = result.scalars().all()
+            if not claimed:
+                return 0
+
+            ordered = await self._in_order(db, claimed)
+            results = await asyncio.gather(
+                *(self._relay_aggregate(events) for events in ordered.values())
+            )
+            delivered = [event for done, _ in results for event in done]
+            failed = [event for _, event in results if event is not None]
+
+            if delivered:
+                await db.execute(
+                    delete(OutboxEvent).where(OutboxEvent.id.in_([e.id for e in delivered]))
+                )
+            now = datetime.now(timezone.utc)
+            for event in failed:
+                event.attempts += 1
+                event.available_at = now + timedelta(
+                    seconds=min(2**event.attempts, self.max_backoff)
+                )
+                event.last_error = "not confirmed by RabbitMQ"
+                logger.warning(
+                    f"Outbox event {event.id} ({event.event_type}) not delivered "
+                    f"(attempt {event.attempts})"
+                )
+            await db.commit()
+
+        for event in delivered:
+            outbox_relay_lag_seconds.observe(max((now - event.created_at).total_seconds(), 0))
+        outbox_events_relayed_total.labels(result="delivered").inc(len(delivered))
+        outbox_events_relayed_total.labels(result="failed").inc(len(failed))
+        outbox_events_relayed_total.labels(result="deferred").inc(
+            len(claimed) - sum(len(events) for events in ordered.values())
+        )
+        return len(delivered)
+
+    @staticmethod
+    async def _in_order(
+        db: AsyncSession, claimed: Sequence[OutboxEvent]
+    ) -> Dict[str, List[OutboxEvent]]:
+        """
+        Group claimed rows by aggregate, keeping only each aggregate's oldest
+        pending rows.
+
+        A claimed row is published only if every older row of its aggregate
+        is claimed too: older rows locked by another relay or waiting for a
+        retry hold back the rest of that aggregate (left for a later batch).
+        """
+        claimed_by_id = {event.id: event for event in claimed}
+        result = await db.execute(
+            select(OutboxEvent.aggregate_id, OutboxEvent.id)
+            .where(OutboxEvent.aggregate_id.in_({event.aggregate_id for event in claimed}))
+            .order_by(OutboxEvent.id)
+        )
+
+        ordered: Dict[str, List[OutboxEvent]] = defaultdict(list)
+        blocked = set()
+        for aggregate_id, event_id in result.all():
+            if aggregate_id in blocked:
+                continue
+            if event_id in claimed_by_id:
+                ordered[aggregate_id].append(claimed_by_id[event_id])
+            else:
+                blocked.add(aggregate_id)
+        return ordered
+
+    @staticmethod
+    async def _relay_aggregate(
+        events: List[OutboxEvent],
+    ) -> Tuple[List[OutboxEvent], Optional[OutboxEvent]]:
+        """
+        Publish one aggregate's events in order, stopping at the first failure.
+
+        Returns:
+            Delivered events and the failed event (if any)
+        """
+        delivered = []
+        for event in events:
+            confirmed = await event_service.deliver(
+                event_type=event.event_type,
+                routing_key=event.routing_key,
+                body=json.dumps(event.payload).encode(),
+                correlation_id=event.correlation_id,
+            )
+            if not confirmed:
+                return delivered, event
+            delivered.append(event)
+        return delivered, None
+
+
+# Singleton instance for easy import
+_outbox_relay: Optional[OutboxRelay] = None
+
+
+def get_outbox_relay() -> OutboxRelay:
+    """
+    Get or create outbox relay singleton.
+
+    Returns:
+        OutboxRelay instance
+    """
+    global _outbox_relay
+    if _outbox_relay is None:
+        _outbox_relay = OutboxRelay()
+    return _outbox_relay
@@ -0,0 +1,342 @@
+"""
+Reaper Worker
+=============
+Background worker that enforces retention: archives and deletes expired
+tokens in small batches and rotates the monthly `sessions` partitions.
+
+Run once from a shell or cron job:
+    python -m app.workers.reaper_worker
+"""
+
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.metrics import reaper_partitions_total, reaper_rows_total
+from app.core.redis import redis_client
+from sqlalchemy import TextClause, text
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PATTERN = re.compile(r"^sessions_y(\d{4})m(\d{2})$")
+
+# Token tables reaped row by row (archived to archive.<table>)
+TOKEN_TABLES = ("password_reset_tokens", "email_verification_tokens")
+
+
+def month_start(day: date) -> date:
+    """First day of the month of `day`."""
+    return day.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    """First day of the month after `month`."""
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Name of the sessions partition holding `month`."""
+    return f"sessions_y{month.year}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Month held by a partition, or None for non-monthly partitions."""
+    match = PARTITION_PATTERN.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+class ReaperWorker:
+    """
+    Retention worker.
+
+    Features:
+    - Creates session partitions `months_ahead` months in advance
+    - Retires a session partition once every session in it expired more than
+      SESSION_RETENTION_DAYS ago: detached and moved to the `archive` schema
+      (or dropped when archiving is disabled) in one transaction
+    - Moves tokens expired more than TOKEN_RETENTION_DAYS ago to
+      `archive.<table>` in batches of `batch_size`, one short transaction
+      each, skipping rows locked by other transactions
+    - Deletes expired rows from the DEFAULT sessions partition the same way
+    - A Redis lock makes only one replica run per interval
+    """
+
+    LOCK_KEY = "reaper:lock"
+
+    def __init__(
+        self,
+        interval: int = settings.REAPER_INTERVAL_SECONDS,
+        batch_size: int = settings.REAPER_BATCH_SIZE,
+        session_retention_days: int = settings.SESSION_RETENTION_DAYS,
+        token_retention_days: int = settings.TOKEN_RETENTION_DAYS,
+        months_ahead: int = settings.SESSION_PARTITION_MONTHS_AHEAD,
+        archive: bool = settings.REAPER_ARCHIVE_ENABLED,
+    ):
+        """
+        Initialize reaper worker.
+
+        Args:
+            interval: Seconds between runs
+            batch_size: Rows per delete transaction
+            session_retention_days: Days sessions are kept after they expire
+            token_retention_days: Days tokens are kept after they expire
+            months_ahead: Future monthly partitions to keep created
+            archive: Archive rows/partitions instead of dropping them
+        """
+        self.interval = interval
+        self.batch_size = batch_size
+        # A session expires at most REFRESH_TOKEN_EXPIRE_DAYS after creation
+        self.session_retention = timedelta(
+            days=session_retention_days + settings.REFRESH_TOKEN_EXPIRE_DAYS
+        )
+        self.session_expiry_retention = timedelta(days=session_retention_days)
+        self.token_retention = timedelta(days=token_retention_days)
+        self.months_ahead = months_ahead
+        self.archive = archive
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the worker loop in the background."""
+        if self._task is None:
+            self._running = True
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Reaper worker started (interval={self.interval}s)")
+
+    async def stop(self) -> None:
+        """Stop the worker."""
+        self._running = False
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        logger.info("Reaper worker stopped")
+
+    async def _run(self) -> None:
+        """Run until stopped."""
+        while self._running:
+            try:
+                if await redis_client.set_if_absent(self.LOCK_KEY, "1", self.interval):
+                    await self.run_once()
+            except Exception as e:
+                logger.error(f"Reaper worker error: {e}", exc_info=True)
+
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> Dict[str, int]:
+        """
+        Run every retention task once.
+
+        Returns:
+            Rows or partitions affected per task
+        """
+        now = datetime.now(timezone.utc)
+        steps = [
+            ("partitions_created", lambda: self.ensure_partitions(now.date())),
+            ("partitions_retired", lambda: self.retire_partitions(now - self.session_retention)),
+        ]
+        for table in TOKEN_TABLES:
+            steps.append(
+                (table, lambda table=table: self.reap_tokens(table, now - self.token_retention))
+            )
+        steps.append(
+            (
+                "sessions_default",
+                lambda: self.reap_default_sessions(now - self.session_expiry_retention),
+            )
+        )
+
+        # Steps are independent: one failing must not stop the others
+        summary: Dict[str, int] = {}
+        for name, step in steps:
+            try:
+                summary[name] = await step()
+            except Exception as e:
+                logger.error(f"Reaper step {name} failed: {e}", exc_info=True)
+        logger.info(f"Reaper run complete: {summary}")
+        return summary
+
+    async def ensure_partitions(self, today: date) -> int:
+        """
+        Create missing session partitions for this month and the next ones.
+
+        Args:
+            today: Current date
+
+        Returns:
+            Number of partitions created
+        """
+        existing = set(await self._list_partitions())
+        created = 0
+        month = month_start(today)
+        for _ in range(self.months_ahead + 1):
+            name = partition_name(month)
+            if name not in existing:
+                try:
+                    async with engine.begin() as conn:
+                        await conn.execute(
+                            text(
+                                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF sessions "
+                                f"FOR VALUES FROM ('{month.isoformat()}') "
+                                f"TO ('{next_month(month).isoformat()}')"
+                            )
+                        )
+                    created += 1
+                    reaper_partitions_total.labels(action="created").inc()
+                    logger.info(f"Created session partition {name}")
+                except Exception as e:
+                    # e.g. rows for that month already sit in the DEFAULT partition
+                    logger.warning(f"Could not create session partition {name}: {e}")
+            month = next_month(month)
+        return created
+
+    async def retire_partitions(self, created_before: datetime) -> int:
+        """
+        Detach and archive (or drop) partitions older than the retention.
+
+        Args:
+            created_before: Retire partitions whose whole range is before this
+
+        Returns:
+            Number of partitions retired
+        """
+        retired = 0
+        for name in await self._list_partitions():
+            month = partition_month(name)
+            if month is None or next_month(month) > created_before.date():
+                continue
+
+            # Plain DETACH: CONCURRENTLY is rejected while sessions has a DEFAULT
+            # partition. The partition is old and idle, so the lock is brief.
+            async with engine.begin() as conn:
+                await conn.execute(text(f"ALTER TABLE sessions DETACH PARTITION {name}"))
+                if self.archive:
+                    await conn.execute(text(f"ALTER TABLE {name} SET SCHEMA archive"))
+                else:
+                    await conn.execute(text(f"DROP TABLE {name}"))
+
+            action = "archived" if self.archive else "dropped"
+            reaper_partitions_total.labels(action=action).inc()
+            logger.info(f"Session partition {name} {action}")
+            retired += 1
+        return retired
+
+    async def reap_tokens(self, table: str, expired_before: datetime) -> int:
+        """
+        Archive and delete expired tokens in batches.
+
+        Args:
+            table: Token table name
+            expired_before: Reap tokens that expired before this
+
+        Returns:
+            Number of rows removed
+
+        Raises:
+            ValueError: If `table` is not one of TOKEN_TABLES
+        """
+        if table not in TOKEN_TABLES:
+            raise ValueError(f"Not a token table: {table}")
+
+        statement = (
+            f"WITH doomed AS ("  # nosec B608 - allow-listed table, bound values
+            f"SELECT id FROM {table} WHERE expires_at < :cutoff "
+            f"LIMIT :batch FOR UPDATE SKIP LOCKED), "
+            f"moved AS (DELETE FROM {table} USING doomed WHERE {table}.id = doomed.id "
+            f"RETURNING {table}.*) "
+        )
+        if self.archive:
+            statement += (
+                f", archived AS (INSERT INTO archive.{table} "  # nosec B608 - allow-listed
+                "SELECT * FROM moved RETURNING 1) "
+                "SELECT count(*) FROM archived"
+            )
+        else:
+            statement += "SELECT count(*) FROM moved"
+
+        action = "archived" if self.archive else "deleted"
+        return await self._reap_batches(table, action, text(statement), expired_before)
+
+    async def reap_default_sessions(self, expired_before: datetime) -> int:
+        """
+        Delete expired sessions that landed in the DEFAULT partition.
+
+        Args:
+            expired_before: Delete sessions that expired before this
+
+        Returns:
+            Number of rows deleted
+        """
+        statement = text(
+            "WITH moved AS (DELETE FROM sessions_default WHERE (id, created_at) IN ("
+            "SELECT id, created_at FROM sessions_default "
+            "WHERE COALESCE(refresh_expires_at, access_expires_at) < :cutoff "
+            "LIMIT :batch FOR UPDATE SKIP LOCKED) RETURNING 1) "
+            "SELECT count(*) FROM moved"
+        )
+        return await self._reap_batches("sessions_default", "deleted", statement, expired_before)
+
+    async def _reap_batches(
+        self, table: str, action: str, statement: TextClause, cutoff: datetime
+    ) -> int:
+        """Run a batched delete, one transaction per batch, until a batch comes back short."""
+        total = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(statement, {"cutoff": cutoff, "batch": self.batch_size})
+                count = result.scalar() or 0
+                await db.commit()
+
+            total += count
+            if count < self.batch_size:
+                break
+            # Let other work run between batches
+            await asyncio.sleep(0)
+
+        if total:
+            reaper_rows_total.labels(table=table, action=action).inc(total)
+            logger.info(f"Reaper {action} {total} rows from {table}")
+        return total
+
+    async def _list_partitions(self) -> List[str]:
+        """Names of the partitions currently attached to sessions."""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = 'sessions'::regclass"
+                )
+            )
+            return list(result.scalars().all())
+
+
+# Singleton instance for easy import
+_reaper_worker: Optional[ReaperWorker] = None
+
+
+def get_reaper_worker() -> ReaperWorker:
+    """
+    Get or create reaper worker singleton.
+
+    Returns:
+        ReaperWorker instance
+    """
+    global _reaper_worker
+    if _reaper_worker is None:
+        _reaper_worker = ReaperWorker()
+    return _reaper_worker
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(get_reaper_worker().run_once())
@@ -0,0 +1,180 @@
+"""
+Session Activity Worker
+=======================
+Background worker that writes session activity from Redis to PostgreSQL in
+batches and revokes sessions that exceeded the idle timeout.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import session_activity_flushed_total, session_idle_revocations_total
+from app.core.redis import redis_client
+from app.models.user import Session
+from app.services.jwt_service import jwt_service
+from sqlalchemy import bindparam, update
+
+logger = logging.getLogger(__name__)
+
+sessions_table = Session.__table__
+
+
+class SessionActivityWorker:
+    """
+    Background worker for session activity.
+
+    Features:
+    - Every `interval` seconds drains the Redis dirty set into one batched
+      `UPDATE sessions SET last_activity_at` per `batch_size` sessions
+    - Revokes sessions idle for longer than SESSION_IDLE_TIMEOUT_MINUTES
+      (set-based revocation, broadcast to every worker)
+    - Redis pops are atomic, so several replicas can run the worker safely
+    """
+
+    def __init__(
+        self,
+        interval: int = settings.SESSION_ACTIVITY_FLUSH_INTERVAL_SECONDS,
+        batch_size: int = settings.SESSION_ACTIVITY_BATCH_SIZE,
+        idle_timeout_minutes: int = settings.SESSION_IDLE_TIMEOUT_MINUTES,
+    ):
+        """
+        Initialize session activity worker.
+
+        Args:
+            interval: Seconds between runs
+            batch_size: Max sessions per database statement
+            idle_timeout_minutes: Idle timeout (0 disables revocation)
+        """
+        self.interval = interval
+        self.batch_size = batch_size
+        self.idle_timeout_seconds = idle_timeout_minutes * 60
+        # Entries older than this can no longer be touched (access token expired)
+        self.retention_seconds = max(
+            self.idle_timeout_seconds, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        )
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the worker loop in the background."""
+        if self._task is None:
+            self._running = True
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                f"Session activity worker started (interval={self.interval}s, "
+                f"idle_timeout={self.idle_timeout_seconds}s)"
+            )
+
+    async def stop(self) -> None:
+        """Stop the worker."""
+        self._running = False
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        logger.info("Session activity worker stopped")
+
+    async def _run(self) -> None:
+        """Run until stopped."""
+        while self._running:
+            try:
+                await self.flush_activity()
+                await self.sweep_idle_sessions()
+            except Exception as e:
+                logger.error(f"Session activity worker error: {e}", exc_info=True)
+
+            await asyncio.sleep(self.interval)
+
+    async def flush_activity(self) -> int:
+        """
+        Write pending activity to `sessions.last_activity_at`.
+
+        Returns:
+            Number of sessions updated
+        """
+        total = 0
+        while True:
+            touches = await redis_client.pop_dirty_session_activity(self.batch_size)
+            if not touches:
+                break
+
+            params = [
+                {
+                    "b_jti": jti,
+                    "b_seen": datetime.fromtimestamp(float(seen), tz=timezone.utc),
+                }
+                for jti, seen in touches
+            ]
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(sessions_table)
+                    .where(sessions_table.c.access_token_jti == bindparam("b_jti"))
+                    .where(sessions_table.c.last_activity_at < bindparam("b_seen"))
+                    .values(last_activity_at=bindparam("b_seen")),
+                    params,
+                )
+                await db.commit()
+
+            total += len(touches)
+            if len(touches) < self.batch_size:
+                break
+
+        if total:
+            session_activity_flushed_total.inc(total)
+            logger.debug(f"Session activity flushed for {total} sessions")
+        return total
+
+    async def sweep_idle_sessions(self) -> int:
+        """
+        Revoke idle sessions and forget activity of expired access tokens.
+
+        Returns:
+            Number of sessions revoked
+        """
+        cutoff_seconds = self.idle_timeout_seconds or self.retention_seconds
+        idle_before = time.time() - cutoff_seconds
+
+        total = 0
+        while True:
+            jtis = await redis_client.pop_idle_sessions(idle_before, self.batch_size)
+            if not jtis:
+                break
+
+            if self.idle_timeout_seconds:
+                async with AsyncSessionLocal() as db:
+                    total += await jwt_service.revoke_sessions_by_access_jti(
+                        jtis, db, reason="idle_timeout"
+                    )
+
+            if len(jtis) < self.batch_size:
+                break
+
+        if total:
+            session_idle_revocations_total.inc(total)
+            logger.info(f"Revoked {total} idle sessions")
+        return total
+
+
+# Singleton instance for easy import
+_session_activity_worker: Optional[SessionActivityWorker] = None
+
+
+def get_session_activity_worker() -> SessionActivityWorker:
+    """
+    Get or create session activity worker singleton.
+
+    Returns:
+        SessionActivityWorker instance
+    """
+    global _session_activity_worker
+    if _session_activity_worker is None:
+        _session_activity_worker = SessionActivityWorker()
+    return _session_activity_worker
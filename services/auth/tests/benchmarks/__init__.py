@@ -0,0 +1 @@
+"""Micro-benchmarks (run manually, not collected by pytest)"""
@@ -0,0 +1,102 @@
+"""
+Event Publisher Throughput Benchmark
+====================================
+Compare publishing events one confirm at a time on a single channel (the
+naive approach) against EventService with its confirm-mode channel pool,
+bounded in-flight confirms and micro-batching.
+
+Needs a local RabbitMQ (settings.RABBITMQ_URL), e.g.:
+    docker compose -f docker-compose.dev.yml up -d rabbitmq
+
+Messages are routed to a temporary queue bound to "bench.#", which is
+deleted at the end.
+
+Usage (from services/auth):
+    python -m tests.benchmarks.bench_event_publisher [events]
+"""
+
+import asyncio
+import json
+import sys
+import time
+
+import aio_pika
+from app.core.config import settings
+from app.services.event_service import EventService
+
+CONFIGS = [
+    # (channels, max_in_flight, batch_size)
+    (1, 1, 1),
+    (1, 256, 100),
+    (4, 256, 100),
+    (4, 1024, 250),
+]
+
+
+async def publish_one_by_one(connection, events: int) -> float:
+    """Publish and await each confirm before the next (previous approach)."""
+    channel = await connection.channel(publisher_confirms=True)
+    exchange = await channel.declare_exchange(
+        settings.RABBITMQ_EXCHANGE, aio_pika.ExchangeType.TOPIC, durable=True
+    )
+    body = json.dumps({"event_type": "bench.event", "payload": {}}).encode()
+    start = time.perf_counter()
+    for _ in range(events):
+        await exchange.publish(
+            aio_pika.Message(body=body, delivery_mode=aio_pika.DeliveryMode.PERSISTENT),
+            routing_key="bench.event",
+        )
+    elapsed = time.perf_counter() - start
+    await channel.close()
+    return elapsed
+
+
+async def publish_with_service(events: int, channels: int, in_flight: int, batch: int):
+    """Fire-and-forget through EventService, timed until every event is confirmed."""
+    service = EventService(
+        pool_size=channels, max_in_flight=in_flight, buffer_size=events, batch_size=batch
+    )
+    await service.start()
+    if not await service.connect():
+        raise SystemExit(f"RabbitMQ not reachable at {settings.RABBITMQ_HOST}")
+
+    enqueue = 0.0
+    start = time.perf_counter()
+    for i in range(events):
+        call = time.perf_counter()
+        await service.publish_event("bench.event", {"n": i})
+        enqueue += time.perf_counter() - call
+    await service._buffer.join()
+    elapsed = time.perf_counter() - start
+    await service.stop()
+    return elapsed, enqueue / events
+
+
+async def main(events: int) -> None:
+    connection = await aio_pika.connect_robust(settings.RABBITMQ_URL)
+    channel = await connection.channel()
+    exchange = await channel.declare_exchange(
+        settings.RABBITMQ_EXCHANGE, aio_pika.ExchangeType.TOPIC, durable=True
+    )
+    queue = await channel.declare_queue("auth.bench", auto_delete=True)
+    await queue.bind(exchange, routing_key="bench.#")
+
+    try:
+        print(f"{events} persistent events -> {settings.RABBITMQ_HOST}:{settings.RABBITMQ_PORT}")
+        single = await publish_one_by_one(connection, events)
+        print(f"{'one by one':>28}: {single * 1000:10.1f} ms ({events / single:10.0f} events/s)")
+
+        for channels, in_flight, batch in CONFIGS:
+            elapsed, enqueue = await publish_with_service(events, channels, in_flight, batch)
+            label = f"pool={channels} inflight={in_flight} batch={batch}"
+            print(
+                f"{label:>28}: {elapsed * 1000:10.1f} ms ({events / elapsed:10.0f} events/s, "
+                f"caller {enqueue * 1e6:.1f} us/event, {single / elapsed:.1f}x)"
+            )
+    finally:
+        await queue.delete(if_unused=False, if_empty=False)
+        await connection.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
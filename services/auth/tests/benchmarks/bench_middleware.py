@@ -0,0 +1,143 @@
+"""
+Middleware Micro-benchmark
+==========================
+Compare requests/sec of the pure-ASGI middleware stack against the previous
+BaseHTTPMiddleware implementations on a trivial endpoint.
+
+Requests are driven straight through the ASGI interface (no server, no HTTP
+client), so the numbers isolate middleware overhead.
+
+Usage (from services/auth):
+    python -m tests.benchmarks.bench_middleware [requests]
+"""
+
+import asyncio
+import sys
+import time
+import uuid
+
+from app.middleware.csrf import CSRFMiddleware
+from app.middleware.request_id import RequestIDMiddleware
+from app.middleware.security import SECURITY_HEADERS, SecurityHeadersMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+
+class LegacyRequestIDMiddleware(BaseHTTPMiddleware):
+    """Previous implementation (BaseHTTPMiddleware)."""
+
+    async def dispatch(self, request, call_next):
+        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """Previous implementation (BaseHTTPMiddleware)."""
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        for name, value in SECURITY_HEADERS:
+            response.headers[name.decode()] = value.decode()
+        return response
+
+
+class LegacyCSRFMiddleware(BaseHTTPMiddleware):
+    """Previous implementation (BaseHTTPMiddleware), safe-method path only."""
+
+    def __init__(self, app, secret: str):
+        super().__init__(app)
+        self.secret = secret
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        if request.method == "GET" and "csrf_token" not in request.cookies:
+            response.set_cookie("csrf_token", "x", httponly=True, secure=True, samesite="strict")
+        return response
+
+
+async def ping(request):
+    return PlainTextResponse("ok")
+
+
+def build_app(request_id, security, csrf) -> Starlette:
+    return Starlette(
+        routes=[Route("/ping", ping)],
+        middleware=[
+            Middleware(request_id),
+            Middleware(security),
+            Middleware(csrf, secret="benchmark"),
+        ],
+    )
+
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/ping",
+    "raw_path": b"/ping",
+    "query_string": b"",
+    "root_path": "",
+    "headers": [(b"host", b"bench"), (b"cookie", b"csrf_token=abc")],
+    "client": ("127.0.0.1", 1234),
+    "server": ("bench", 80),
+}
+
+
+async def run(app, requests: int) -> float:
+    """Send `requests` GETs through the app and return requests/sec."""
+
+    async def send(message):
+        pass
+
+    async def request_once():
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Client stays connected (disconnect listeners block until cancelled)
+            await asyncio.Event().wait()
+
+        await app(dict(SCOPE), receive, send)
+
+    # Warm up (router, lazily built middleware stack)
+    for _ in range(200):
+        await request_once()
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await request_once()
+    return requests / (time.perf_counter() - start)
+
+
+async def main(requests: int) -> None:
+    legacy = build_app(
+        LegacyRequestIDMiddleware, LegacySecurityHeadersMiddleware, LegacyCSRFMiddleware
+    )
+    asgi = build_app(RequestIDMiddleware, SecurityHeadersMiddleware, CSRFMiddleware)
+    bare = Starlette(routes=[Route("/ping", ping)])
+
+    results = {
+        "no middleware": await run(bare, requests),
+        "BaseHTTPMiddleware": await run(legacy, requests),
+        "pure ASGI": await run(asgi, requests),
+    }
+    for name, rps in results.items():
+        print(f"{name:>20}: {rps:10.0f} req/s")
+    speedup = results["pure ASGI"] / results["BaseHTTPMiddleware"]
+    print(f"{'speedup':>20}: {speedup:10.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
@@ -0,0 +1,90 @@
+"""
+Vault Transit Batch Benchmark
+=============================
+Compare decrypting fields one transit call at a time (VaultClient.decrypt_data
+style) against AsyncTransitClient.decrypt_many.
+
+Vault is replaced by a fake transit server (ASGI app over an in-process
+transport) that adds a fixed delay per HTTP request to stand in for the
+network round trip and request handling of a real Vault.
+
+Usage (from services/auth):
+    python -m tests.benchmarks.bench_vault_transit [fields] [round_trip_ms]
+"""
+
+import asyncio
+import base64
+import os
+import sys
+import time
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+# Add shared utilities to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../shared"))
+
+from utils.vault_client import AsyncTransitClient  # noqa: E402
+
+
+def build_fake_transit(round_trip: float) -> Starlette:
+    """Fake transit decrypt endpoint ("vault:v1:<base64>" ciphertexts)."""
+
+    async def decrypt(request: Request):
+        await asyncio.sleep(round_trip)
+        body = await request.json()
+        items = body.get("batch_input") or [{"ciphertext": body["ciphertext"]}]
+        results = [{"plaintext": item["ciphertext"].removeprefix("vault:v1:")} for item in items]
+        if "batch_input" in body:
+            return JSONResponse({"data": {"batch_results": results}})
+        return JSONResponse({"data": results[0]})
+
+    return Starlette(routes=[Route("/v1/transit/decrypt/{key}", decrypt, methods=["POST"])])
+
+
+async def decrypt_one_by_one(http: httpx.AsyncClient, ciphertexts) -> list:
+    """One transit request per field (previous behaviour)."""
+    plaintexts = []
+    for ciphertext in ciphertexts:
+        response = await http.post(
+            "/v1/transit/decrypt/personal-data", json={"ciphertext": ciphertext}
+        )
+        plaintexts.append(base64.b64decode(response.json()["data"]["plaintext"]).decode())
+    return plaintexts
+
+
+async def main(fields: int, round_trip_ms: float) -> None:
+    transport = httpx.ASGITransport(app=build_fake_transit(round_trip_ms / 1000))
+    values = [f"campo clinico {i}" for i in range(fields)]
+    ciphertexts = ["vault:v1:" + base64.b64encode(value.encode()).decode() for value in values]
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://vault", timeout=30.0
+    ) as http:
+        start = time.perf_counter()
+        assert await decrypt_one_by_one(http, ciphertexts) == values
+        single = time.perf_counter() - start
+
+    client = AsyncTransitClient(vault_addr="http://vault", vault_token="t", transport=transport)
+    start = time.perf_counter()
+    results = await client.decrypt_many(ciphertexts)
+    batched = time.perf_counter() - start
+    await client.close()
+    assert [result.value for result in results] == values
+
+    print(f"{fields} fields, {round_trip_ms} ms per transit request")
+    print(f"{'one by one':>14}: {single * 1000:10.1f} ms ({fields / single:10.0f} fields/s)")
+    print(f"{'decrypt_many':>14}: {batched * 1000:10.1f} ms ({fields / batched:10.0f} fields/s)")
+    print(f"{'speedup':>14}: {single / batched:10.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+            float(sys.argv[2]) if len(sys.argv) > 2 else 2.0,
+        )
+    )
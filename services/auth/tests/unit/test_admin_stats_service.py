@@ -0,0 +1,107 @@
+"""
+Unit Tests for Admin Statistics Service
+=======================================
+Test the single-pass query and the Redis snapshot
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.services.admin_stats_service import AdminStatsService
+from sqlalchemy.dialects import postgresql
+
+COUNTERS = {
+    "total_users": 10,
+    "active_users": 8,
+    "verified_users": 7,
+    "mfa_enabled_users": 2,
+    "recent_registrations": 1,
+    "failed_login_attempts": 4,
+    "locked_accounts": 1,
+    "total_sessions": 30,
+    "active_sessions": 12,
+    "recent_logins": 5,
+}
+
+
+def _snapshot(age_seconds: float) -> str:
+    timestamp = datetime.now(timezone.utc) - timedelta(seconds=age_seconds)
+    return json.dumps(dict(COUNTERS, timestamp=timestamp.isoformat()))
+
+
+@pytest.fixture
+def mock_db():
+    """Create database session returning one row of counters."""
+    db = AsyncMock()
+    result = MagicMock()
+    result.one.return_value._asdict.return_value = dict(COUNTERS)
+    db.execute.return_value = result
+    return db
+
+
+@pytest.fixture
+def mock_redis():
+    """Patch Redis."""
+    with patch("app.services.admin_stats_service.redis_client") as mock_redis:
+        mock_redis.get = AsyncMock(return_value=None)
+        mock_redis.setex = AsyncMock(return_value=True)
+        mock_redis.delete = AsyncMock(return_value=True)
+        mock_redis.set_if_absent = AsyncMock(return_value=True)
+        yield mock_redis
+
+
+@pytest.mark.unit
+class TestAdminStatsService:
+    """Test admin statistics snapshot."""
+
+    @pytest.mark.asyncio
+    async def test_compute_single_query(self, mock_db):
+        """Test every counter comes from one FILTER-based statement."""
+        stats = await AdminStatsService().compute(mock_db)
+
+        mock_db.execute.assert_awaited_once()
+        sql = str(mock_db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert sql.count("FILTER (WHERE") == 7
+        assert stats["active_sessions"] == 12
+        assert isinstance(stats["timestamp"], datetime)
+
+    @pytest.mark.asyncio
+    async def test_fresh_snapshot_served_from_redis(self, mock_db, mock_redis):
+        """Test a fresh snapshot does not touch the database."""
+        mock_redis.get.return_value = _snapshot(5)
+
+        stats = await AdminStatsService(max_staleness_seconds=60).get(mock_db)
+
+        assert stats["total_users"] == 10
+        mock_db.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_missing_snapshot_computed_and_stored(self, mock_db, mock_redis):
+        """Test a missing snapshot is computed and cached."""
+        stats = await AdminStatsService(max_staleness_seconds=60).get(mock_db)
+
+        assert stats["locked_accounts"] == 1
+        mock_db.execute.assert_awaited_once()
+        key, ttl, raw = mock_redis.setex.call_args.args
+        assert key == "admin_stats:snapshot"
+        assert ttl == 600
+        assert json.loads(raw)["recent_logins"] == 5
+
+    @pytest.mark.asyncio
+    async def test_stale_snapshot_refreshed_once(self, mock_db, mock_redis):
+        """Test only the lock holder refreshes a stale snapshot."""
+        mock_redis.get.return_value = _snapshot(120)
+        service = AdminStatsService(max_staleness_seconds=60)
+
+        mock_redis.set_if_absent.return_value = False
+        stale = await service.get(mock_db)
+        mock_db.execute.assert_not_awaited()
+
+        mock_redis.set_if_absent.return_value = True
+        fresh = await service.get(mock_db)
+        mock_db.execute.assert_awaited_once()
+        mock_redis.delete.assert_awaited_once_with("admin_stats:refresh")
+
+        assert fresh["timestamp"] > stale["timestamp"]
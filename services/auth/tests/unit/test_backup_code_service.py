@@ -0,0 +1,129 @@
+"""
+Unit Tests for MFA Backup Code Service
+======================================
+Test indexed storage and constant-cost verification of backup codes
+"""
+
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.models.user import User
+from app.services.backup_code_service import BackupCodeService
+from passlib.context import CryptContext
+
+# Cheap bcrypt for tests
+fast_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+
+
+@pytest.fixture
+def service():
+    """Create backup code service with a test HMAC key."""
+    with patch("app.services.backup_code_service.settings") as mock_settings:
+        mock_settings.MFA_BACKUP_CODE_KEY = "test-backup-code-key"
+        yield BackupCodeService()
+
+
+@pytest.fixture
+def mock_hasher():
+    """Patch the async hasher with a cheap, call-counting bcrypt."""
+    with patch("app.services.backup_code_service.password_hasher") as hasher:
+        hasher.hash = AsyncMock(side_effect=lambda code: fast_context.hash(code))
+        hasher.verify = AsyncMock(side_effect=lambda code, h: fast_context.verify(code, h))
+        yield hasher
+
+
+@pytest.fixture
+def mock_redis():
+    """Patch Redis with an in-memory failure counter."""
+    failures = []
+    with patch("app.services.backup_code_service.redis_client") as redis:
+        redis.sliding_window_count = AsyncMock(side_effect=lambda key, window: len(failures))
+        redis.sliding_window_hit = AsyncMock(
+            side_effect=lambda keys, window: failures.append(keys[0]) or [len(failures)]
+        )
+        yield redis
+
+
+@pytest.fixture
+def user():
+    """Create user without backup codes."""
+    user = MagicMock(spec=User)
+    user.id = uuid.uuid4()
+    user.mfa_backup_code_index = None
+    user.mfa_backup_codes = None
+    return user
+
+
+@pytest.mark.unit
+class TestBackupCodeService:
+    """Test backup code storage and verification."""
+
+    @pytest.mark.asyncio
+    async def test_store_and_consume(self, service, mock_hasher, user):
+        """Test a valid code verifies once with a single bcrypt check."""
+        codes = service.generate()
+        await service.store(user, codes)
+
+        assert len(user.mfa_backup_code_index) == 10
+        mock_hasher.verify.reset_mock()
+
+        assert await service.verify_and_consume(user, codes[3]) is True
+        assert mock_hasher.verify.call_count == 1
+        assert service.remaining(user) == 9
+
+        assert await service.verify_and_consume(user, codes[3]) is False
+
+    @pytest.mark.asyncio
+    async def test_wrong_code_costs_no_bcrypt(self, service, mock_hasher, user):
+        """Test unknown codes are rejected without any slow hash."""
+        await service.store(user, service.generate())
+        mock_hasher.verify.reset_mock()
+
+        assert await service.verify_and_consume(user, "deadbeef") is False
+        mock_hasher.verify.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_code_normalization(self, service, mock_hasher, user):
+        """Test codes typed with dashes or upper case are accepted."""
+        await service.store(user, ["ab12cd34"])
+
+        assert await service.verify_and_consume(user, " AB12-CD34 ") is True
+
+    def test_index_is_per_user(self, service):
+        """Test the same code indexes differently for different users."""
+        assert service.index(str(uuid.uuid4()), "ab12cd34") != service.index(
+            str(uuid.uuid4()), "ab12cd34"
+        )
+
+    @pytest.mark.asyncio
+    async def test_legacy_codes(self, service, mock_hasher, mock_redis, user):
+        """Test codes stored before the index still verify."""
+        user.mfa_backup_codes = [fast_context.hash(code) for code in ("11111111", "22222222")]
+
+        assert await service.verify_and_consume(user, "22222222") is True
+        assert len(user.mfa_backup_codes) == 1
+        assert await service.verify_and_consume(user, "22222222") is False
+
+    @pytest.mark.asyncio
+    async def test_legacy_scan_capped_after_failures(self, service, mock_hasher, mock_redis, user):
+        """Test repeated wrong codes stop forcing a bcrypt scan of legacy codes."""
+        user.mfa_backup_codes = [fast_context.hash(code) for code in ("11111111", "22222222")]
+
+        for _ in range(service.LEGACY_MAX_FAILURES):
+            assert await service.verify_and_consume(user, "99999999") is False
+        mock_hasher.verify.reset_mock()
+
+        assert await service.verify_and_consume(user, "11111111") is False
+        mock_hasher.verify.assert_not_called()
+        assert len(user.mfa_backup_codes) == 2
+
+    @pytest.mark.asyncio
+    async def test_store_replaces_legacy_codes(self, service, mock_hasher, user):
+        """Test regenerating codes drops the legacy list."""
+        user.mfa_backup_codes = [fast_context.hash("11111111")]
+
+        await service.store(user, ["33333333"])
+
+        assert user.mfa_backup_codes is None
+        assert service.remaining(user) == 1
@@ -0,0 +1,133 @@
+"""
+Unit Tests for Redis Client-Side Cache
+======================================
+Test cached reads, invalidation and memory cap
+"""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.core.client_cache import TRACKING_CHANNEL, ClientSideCache
+from app.core.redis import RedisClient
+from redis.exceptions import ResponseError
+
+
+@pytest.fixture
+def client():
+    """Create Redis client wrapper with a mocked connection and a listening cache."""
+    client = RedisClient()
+    client._client = MagicMock()
+    client._client.publish = AsyncMock(return_value=1)
+    client.client_cache = ClientSideCache(
+        prefixes=("principal:",), max_bytes=10_000, ttl_seconds=60, mode="pubsub"
+    )
+    client.client_cache._listening = True
+    return client
+
+
+@pytest.mark.unit
+class TestClientSideCache:
+    """Test client-side cache behaviour."""
+
+    @pytest.mark.asyncio
+    async def test_hot_reads_served_from_memory(self, client):
+        """Test a cached key costs one Redis round trip, including missing keys."""
+        client._client.mget = AsyncMock(side_effect=[["v"], [None]])
+
+        assert await client.get("principal:1") == "v"
+        assert await client.get("principal:1") == "v"
+        assert await client.get("principal:2") is None
+        assert await client.get("principal:2") is None
+
+        assert client._client.mget.await_count == 2
+        assert client.client_cache.hit_ratio == 0.5
+
+    @pytest.mark.asyncio
+    async def test_uncovered_keys_bypass_cache(self, client):
+        """Test keys outside the cached prefixes always go to Redis."""
+        client._client.get = AsyncMock(return_value="x")
+
+        assert await client.get("mfa_setup:1") == "x"
+        assert await client.get("mfa_setup:1") == "x"
+        assert client._client.get.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_not_served_without_listener(self, client):
+        """Test nothing is served while invalidations may be missed."""
+        client.client_cache._listening = False
+        client._client.mget = AsyncMock(return_value=["v"])
+
+        await client.get("principal:1")
+        await client.get("principal:1")
+
+        assert client._client.mget.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_write_invalidates_and_broadcasts(self, client):
+        """Test writes drop the local copy and notify other replicas in pub/sub mode."""
+        client._client.mget = AsyncMock(return_value=["old"])
+        client._client.setex = AsyncMock(return_value=True)
+        await client.get("principal:1")
+
+        await client.setex("principal:1", 60, "new")
+
+        assert "principal:1" not in client.client_cache._entries
+        client._client.publish.assert_awaited_once_with(
+            "auth:cache_invalidations", json.dumps(["principal:1"])
+        )
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_read_is_not_cached(self, client):
+        """Test a value invalidated while its read is in flight is not cached."""
+        cache = client.client_cache
+
+        async def racing_read(keys):
+            cache.invalidate(keys, source="tracking")
+            return ["stale"]
+
+        client._client.mget = AsyncMock(side_effect=racing_read)
+
+        assert await client.get("principal:1") == "stale"
+        assert "principal:1" not in cache._entries
+        assert cache._pending == {}
+
+    def test_memory_cap_evicts_lru(self):
+        """Test least recently used entries are evicted to stay under the cap."""
+        cache = ClientSideCache(prefixes=("k:",), max_bytes=600, ttl_seconds=60, mode="pubsub")
+        cache._listening = True
+        for index in range(10):
+            cache.store(f"k:{index}", "x" * 50)
+
+        assert cache._bytes <= 600
+        assert "k:9" in cache._entries
+        assert "k:0" not in cache._entries
+
+    def test_tracking_messages(self):
+        """Test tracking invalidations drop keys, and a null payload flushes all."""
+        cache = ClientSideCache(prefixes=("k:",), max_bytes=10_000, ttl_seconds=60)
+        cache._listening = True
+        cache.store("k:1", "a")
+        cache.store("k:2", "b")
+
+        cache._handle_message(["message", TRACKING_CHANNEL, ["k:1"]])
+        assert list(cache._entries) == ["k:2"]
+
+        cache._handle_message(["message", TRACKING_CHANNEL, None])
+        assert not cache._entries
+
+    @pytest.mark.asyncio
+    async def test_enable_tracking(self):
+        """Test broadcast tracking is redirected to the subscriber for every prefix."""
+        cache = ClientSideCache(prefixes=("a:", "b:"), max_bytes=10_000, ttl_seconds=60)
+        tracker = MagicMock()
+        tracker.send_command = AsyncMock()
+        tracker.read_response = AsyncMock(return_value="OK")
+
+        assert await cache._enable_tracking(tracker, 42) is True
+        tracker.send_command.assert_awaited_once_with(
+            "CLIENT", "TRACKING", "ON", "REDIRECT", 42, "BCAST", "PREFIX", "a:", "PREFIX", "b:"
+        )
+
+        tracker.read_response = AsyncMock(side_effect=ResponseError("unknown command"))
+        assert await cache._enable_tracking(tracker, 42) is False
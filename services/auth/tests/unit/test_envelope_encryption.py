@@ -0,0 +1,146 @@
+"""
+Unit Tests for Envelope Encryption
+==================================
+Test local AES-GCM with cached, version-aware Vault data keys
+"""
+
+import asyncio
+import base64
+import os
+
+import pytest
+from utils.envelope_encryption import EnvelopeEncryptor, EnvelopeError
+
+
+class FakeTransit:
+    """In-memory stand-in for the Vault transit endpoints used."""
+
+    def __init__(self):
+        self.version = 1
+        self.wrapped = {}
+        self.calls = []
+
+    async def __call__(self, method, url, payload=None):
+        endpoint = url.split("/v1/transit/")[1]
+        self.calls.append(endpoint.split("/")[0])
+        if endpoint.startswith("datakey/"):
+            key = os.urandom(32)
+            wrapped = self._wrap(key)
+            return {"plaintext": base64.b64encode(key).decode(), "ciphertext": wrapped}
+        if endpoint.startswith("decrypt/"):
+            key = self.wrapped[payload["ciphertext"]]
+            return {"plaintext": base64.b64encode(key).decode()}
+        if endpoint.startswith("rewrap/"):
+            return {"ciphertext": self._wrap(self.wrapped[payload["ciphertext"]])}
+        if endpoint.endswith("/rotate"):
+            self.version += 1
+            return {}
+        return {"latest_version": self.version}
+
+    def _wrap(self, key):
+        wrapped = f"vault:v{self.version}:{base64.b64encode(os.urandom(8)).decode()}"
+        self.wrapped[wrapped] = key
+        return wrapped
+
+
+@pytest.fixture
+def transit():
+    """Create fake transit backend."""
+    return FakeTransit()
+
+
+@pytest.fixture
+def encryptor(transit):
+    """Create encryptor backed by the fake transit."""
+    encryptor = EnvelopeEncryptor(key_name="reports", max_key_uses=3)
+    encryptor._request = transit
+    return encryptor
+
+
+@pytest.mark.unit
+class TestEnvelopeEncryptor:
+    """Test envelope encryption."""
+
+    @pytest.mark.asyncio
+    async def test_round_trip_without_vault_per_value(self, encryptor, transit):
+        """Test many values share one data key and decrypt from memory."""
+        envelopes = [await encryptor.encrypt(f"referto {i}") for i in range(3)]
+
+        assert [await encryptor.decrypt(e) for e in envelopes] == [f"referto {i}" for i in range(3)]
+        assert transit.calls == ["datakey"]
+
+    @pytest.mark.asyncio
+    async def test_data_key_replaced_after_max_uses(self, encryptor, transit):
+        """Test a new data key is generated once the usage budget is spent."""
+        for i in range(4):
+            await encryptor.encrypt(str(i))
+
+        assert transit.calls.count("datakey") == 2
+
+    @pytest.mark.asyncio
+    async def test_cold_decrypt_unwraps_once(self, encryptor, transit):
+        """Test a restarted process unwraps each data key once, even concurrently."""
+        envelopes = [await encryptor.encrypt(str(i)) for i in range(3)]
+        encryptor._unwrapped.clear()
+
+        assert await asyncio.gather(*(encryptor.decrypt(e) for e in envelopes)) == ["0", "1", "2"]
+        assert transit.calls.count("decrypt") == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_unwrap_does_not_strand_waiters(self, encryptor, transit):
+        """Test waiters on a shared unwrap recover when its owner is cancelled."""
+        envelope = await encryptor.encrypt("secret")
+        encryptor._unwrapped.clear()
+        release = asyncio.Event()
+
+        async def slow_transit(method, url, payload=None):
+            await release.wait()
+            return await transit(method, url, payload)
+
+        encryptor._request = slow_transit
+        owner = asyncio.create_task(encryptor.decrypt(envelope))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(encryptor.decrypt(envelope))
+        await asyncio.sleep(0)
+
+        owner.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.wait_for(waiter, timeout=1) == "secret"
+        assert owner.cancelled()
+        assert not encryptor._unwrapping
+
+    @pytest.mark.asyncio
+    async def test_context_binds_ciphertext(self, encryptor):
+        """Test a ciphertext moved to another field does not decrypt."""
+        envelope = await encryptor.encrypt("secret", context="report:1:input_text")
+
+        assert await encryptor.decrypt(envelope, context="report:1:input_text") == "secret"
+        with pytest.raises(EnvelopeError):
+            await encryptor.decrypt(envelope, context="report:1:output_text")
+
+    @pytest.mark.asyncio
+    async def test_rotation_triggers_lazy_rewrap(self, encryptor, transit):
+        """Test rotation keeps old envelopes readable and re-wraps only the data key."""
+        envelope = await encryptor.encrypt("secret")
+        assert await encryptor.needs_rewrap(envelope) is False
+
+        await encryptor.rotate_key()
+        assert await encryptor.needs_rewrap(envelope) is True
+        assert await encryptor.decrypt(envelope) == "secret"
+
+        rewrapped = await encryptor.rewrap(envelope)
+        assert await encryptor.needs_rewrap(rewrapped) is False
+        assert rewrapped.rsplit(":", 1)[1] == envelope.rsplit(":", 1)[1]
+        assert await encryptor.decrypt(rewrapped) == "secret"
+
+        new_envelope = await encryptor.encrypt("other")
+        assert await encryptor.needs_rewrap(new_envelope) is False
+
+    @pytest.mark.asyncio
+    async def test_malformed_envelope(self, encryptor):
+        """Test garbage is rejected with EnvelopeError."""
+        for value in ("plain text", "env:v1:nope", "env:v1:YQ==:YQ=="):
+            with pytest.raises(EnvelopeError):
+                await encryptor.decrypt(value)
@@ -0,0 +1,124 @@
+"""
+Unit Tests for Event Publishing
+===============================
+Test buffering, micro-batching, bounded in-flight confirms and retries
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.services.event_service import EventService
+
+
+@pytest.fixture
+async def service():
+    """Create event service with a mocked confirm-mode channel pool."""
+    service = EventService(pool_size=2, max_in_flight=4, buffer_size=3, batch_size=10)
+    service.exchanges = [MagicMock(), MagicMock()]
+    for exchange in service.exchanges:
+        exchange.publish = AsyncMock()
+    service._connected = True
+    with patch.object(EventService, "_build_message", staticmethod(lambda event: event)):
+        yield service
+        await service.stop(drain_timeout=1)
+
+
+@pytest.mark.unit
+class TestEventService:
+    """Test RabbitMQ event publisher."""
+
+    @pytest.mark.asyncio
+    async def test_not_started_is_noop(self):
+        """Test events are rejected without I/O before start."""
+        assert await EventService().publish_event("user.registered", {}) is False
+
+    @pytest.mark.asyncio
+    async def test_fire_and_forget_drops_when_full(self, service):
+        """Test publish only buffers, and a full buffer drops instead of blocking."""
+        with patch.object(service, "_run", AsyncMock()):
+            await service.start()
+
+        results = [await service.publish_event("user.logged_in", {"n": i}) for i in range(5)]
+
+        assert results == [True, True, True, False, False]
+        assert service._buffer.qsize() == 3
+        for exchange in service.exchanges:
+            exchange.publish.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_next_batch_takes_backlog(self, service):
+        """Test a publisher drains the queued backlog in one batch, up to batch_size."""
+        with patch.object(service, "_run", AsyncMock()):
+            await service.start()
+        service.batch_size = 2
+        for i in range(3):
+            await service.publish_event("user.logged_in", {"n": i})
+
+        first = await service._next_batch()
+        second = await service._next_batch()
+
+        assert [len(first), len(second)] == [2, 1]
+        assert json.loads(first[0].body)["payload"] == {"n": 0}
+        assert first[0].routing_key == "user.logged_in"
+
+    @pytest.mark.asyncio
+    async def test_in_flight_confirms_bounded(self, service):
+        """Test unconfirmed publishes never exceed max_in_flight."""
+        await service.start()
+        service._buffer = asyncio.Queue()
+        in_flight = peak = 0
+
+        async def slow_confirm(message, routing_key, timeout):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        for exchange in service.exchanges:
+            exchange.publish = AsyncMock(side_effect=slow_confirm)
+
+        results = await asyncio.gather(
+            *(service.publish_event("user.logged_in", {"n": i}, wait=True) for i in range(12))
+        )
+
+        assert all(results)
+        assert peak == 4
+
+    @pytest.mark.asyncio
+    async def test_failed_publish_retried_then_given_up(self, service):
+        """Test nacked events are requeued, and reported failed after max_retries."""
+        service.max_retries = 2
+        await service.start()
+        attempts = []
+
+        async def flaky(message, routing_key, timeout):
+            attempts.append(message.correlation_id)
+            if len(attempts) == 1:
+                raise RuntimeError("nack")
+
+        for exchange in service.exchanges:
+            exchange.publish = AsyncMock(side_effect=flaky)
+
+        assert await service.publish_event("user.logged_in", {}, wait=True) is True
+        assert len(attempts) == 2
+
+        for exchange in service.exchanges:
+            exchange.publish = AsyncMock(side_effect=RuntimeError("nack"))
+        assert await service.publish_event("user.logged_in", {}, wait=True) is False
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_buffer(self, service):
+        """Test shutdown waits for buffered events to be confirmed."""
+        exchanges = list(service.exchanges)
+        await service.start()
+        for i in range(3):
+            await service.publish_event("user.logged_out", {"n": i})
+
+        await service.stop(drain_timeout=1)
+
+        published = sum(exchange.publish.await_count for exchange in exchanges)
+        assert published == 3
+        assert service._workers == []
@@ -0,0 +1,101 @@
+"""
+Unit Tests for Health Monitor
+=============================
+Test cached dependency probing
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.workers.health_monitor import DependencyStatus, HealthMonitor
+
+
+@pytest.fixture
+def monitor():
+    """Create health monitor with stubbed probes."""
+    monitor = HealthMonitor(interval=5, timeout=0.05)
+    monitor.probes = {
+        "database": AsyncMock(return_value=True),
+        "redis": AsyncMock(return_value=True),
+        "vault": AsyncMock(side_effect=RuntimeError("sealed")),
+    }
+    return monitor
+
+
+@pytest.mark.unit
+class TestHealthMonitor:
+    """Test health monitor behaviour."""
+
+    @pytest.mark.asyncio
+    async def test_probe_all_records_status(self, monitor):
+        """Test every dependency is probed and failures keep their error."""
+        await monitor.probe_all()
+        status = monitor.status()
+
+        assert status["database"].healthy is True
+        assert status["redis"].healthy is True
+        assert status["vault"].healthy is False
+        assert status["vault"].error == "sealed"
+        assert status["database"].latency_ms >= 0
+
+    @pytest.mark.asyncio
+    async def test_status_does_no_io(self, monitor):
+        """Test reading the status never runs a probe."""
+        await monitor.probe_all()
+        for _ in range(10):
+            monitor.status()
+
+        assert monitor.probes["database"].await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_probe_times_out(self, monitor):
+        """Test a hanging dependency is reported unhealthy after the timeout."""
+
+        async def hang():
+            await asyncio.sleep(1)
+            return True
+
+        monitor.probes["redis"] = hang
+        await monitor.probe_all()
+
+        assert monitor.status()["redis"].healthy is False
+        assert "timeout" in monitor.status()["redis"].error
+
+    def test_unprobed_and_stale_are_unhealthy(self, monitor):
+        """Test missing or outdated results never report healthy."""
+        assert monitor.status()["database"].error == "not probed yet"
+
+        monitor._status["database"] = DependencyStatus(
+            True, 1.0, datetime.now(timezone.utc) - timedelta(seconds=monitor.max_age + 1)
+        )
+        assert monitor.is_healthy("database") is False
+
+    @pytest.mark.asyncio
+    async def test_unconfigured_vault_not_required(self, monitor):
+        """Test a service running without Vault stays ready."""
+        monitor.probes["vault"] = monitor._probe_vault
+
+        with patch("app.workers.health_monitor.settings") as mock_settings:
+            mock_settings.vault_client.vault.client = None
+            await monitor.probe_all()
+
+        vault = monitor.status()["vault"]
+        assert vault.healthy is True
+        assert vault.required is False
+
+    @pytest.mark.asyncio
+    async def test_vault_probe_uses_service_config(self, monitor):
+        """Test the probe checks the token of the client the service reads from."""
+        monitor.probes["vault"] = monitor._probe_vault
+
+        with patch("app.workers.health_monitor.settings") as mock_settings:
+            client = MagicMock()
+            client.is_authenticated.return_value = False
+            mock_settings.vault_client.vault.client = client
+            await monitor.probe_all()
+
+        assert monitor.status()["vault"].healthy is False
+        assert monitor.status()["vault"].required is True
+        client.is_authenticated.assert_called_once()
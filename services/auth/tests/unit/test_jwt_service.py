@@ -4,21 +4,27 @@ Unit Tests for JWT Service
 Test JWT creation, validation, refresh, and revocation
 """
 
+import json
 import uuid
 from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from app.core.database import commit_session
+from app.core.redis import RedisUnavailable
 from app.models.user import Session, User
 from app.services.jwt_service import JWTService
+from app.services.revocation_cache import RevocationCache
 from freezegun import freeze_time
 from jose import jwt
 
 
 @pytest.fixture
 def jwt_service():
-    """Create JWT service instance."""
-    return JWTService()
+    """Create JWT service instance (HS256, matching mock_settings)."""
+    service = JWTService()
+    service.algorithm = "HS256"
+    return service
 
 
 @pytest.fixture
@@ -49,6 +55,12 @@ def mock_redis():
         mock.setex = AsyncMock()
         mock.exists = AsyncMock(return_value=True)
         mock.delete = AsyncMock()
+        mock.store_session = AsyncMock(return_value=True)
+        mock.revoke_session = AsyncMock(return_value=True)
+        mock.rotate_refresh_token = AsyncMock(return_value=True)
+        mock.check_session = AsyncMock(return_value=(True, 0))
+        mock.get_session_epoch = AsyncMock(return_value=0)
+        mock.bump_session_epochs = AsyncMock(return_value={})
         yield mock
 
 
@@ -95,8 +107,33 @@ class TestJWTService:
         mock_db.add.assert_called_once()
         mock_db.commit.assert_called_once()
 
-        # Verify Redis storage
-        assert mock_redis.setex.call_count == 2
+        # Verify Redis storage (single pipelined write)
+        mock_redis.store_session.assert_called_once()
+        mock_redis.setex.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_create_tokens_deferred_commit(
+        self, jwt_service, mock_user, mock_db, mock_redis, mock_settings
+    ):
+        """Test commit=False leaves the commit and Redis write to commit_session."""
+        # Arrange
+        mock_db.info = {}
+
+        # Act
+        await jwt_service.create_tokens(mock_user, mock_db, "127.0.0.1", commit=False)
+
+        # Assert
+        mock_db.flush.assert_called_once()
+        mock_db.commit.assert_not_called()
+        mock_redis.store_session.assert_not_called()
+
+        # Act
+        await commit_session(mock_db)
+
+        # Assert
+        mock_db.commit.assert_called_once()
+        mock_redis.store_session.assert_called_once()
+        assert "after_commit" not in mock_db.info
 
     @pytest.mark.asyncio
     async def test_validate_access_token_valid(
@@ -123,7 +160,7 @@ class TestJWTService:
         assert result["sub"] == str(mock_user.id)
         assert result["email"] == mock_user.email
         assert result["type"] == "access"
-        mock_redis.exists.assert_called_once_with(f"session:access:{jti}")
+        mock_redis.check_session.assert_called_once_with(jti, str(mock_user.id))
 
     @pytest.mark.asyncio
     async def test_validate_access_token_expired(
@@ -152,11 +189,68 @@ class TestJWTService:
     ):
         """Test validation of revoked access token."""
         # Arrange
-        mock_redis.exists.return_value = False
+        mock_redis.check_session.return_value = (False, 0)
+        payload = {
+            "sub": str(mock_user.id),
+            "jti": str(uuid.uuid4()),
+            "exp": datetime.now(timezone.utc) + timedelta(minutes=15),
+            "type": "access",
+        }
+        token = jwt.encode(payload, "test-secret-key", algorithm="HS256")
+
+        # Act
+        result = await jwt_service.validate_access_token(token)
+
+        # Assert
+        assert result is None
+
+    @pytest.mark.asyncio
+    async def test_validate_access_token_revoked_during_check(
+        self, jwt_service, mock_user, mock_redis, mock_settings
+    ):
+        """Test a revocation broadcast landing during the Redis check wins."""
+        # Arrange
+        cache = RevocationCache(max_entries=10, ttl_seconds=60, channel="test:revocations")
+        cache._listening = True
+        jti = str(uuid.uuid4())
+        payload = {
+            "sub": str(mock_user.id),
+            "jti": jti,
+            "exp": datetime.now(timezone.utc) + timedelta(minutes=15),
+            "type": "access",
+        }
+        token = jwt.encode(payload, "test-secret-key", algorithm="HS256")
+
+        async def check_session(jti_arg, user_id):
+            # Session still in Redis when read; the revocation arrives before the reply
+            cache._handle_message(json.dumps({"jtis": [jti_arg]}))
+            return True, 0
+
+        mock_redis.check_session = AsyncMock(side_effect=check_session)
+
+        # Act
+        with patch("app.services.jwt_service.revocation_cache", cache):
+            result = await jwt_service.validate_access_token(token)
+            second = await jwt_service.validate_access_token(token)
+
+        # Assert
+        assert result is None
+        assert second is None
+        assert cache.lookup(jti) is False
+        mock_redis.check_session.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_validate_access_token_superseded_epoch(
+        self, jwt_service, mock_user, mock_redis, mock_settings
+    ):
+        """Test tokens issued before a session epoch bump are rejected."""
+        # Arrange
+        mock_redis.check_session.return_value = (True, 3)
         payload = {
             "sub": str(mock_user.id),
             "jti": str(uuid.uuid4()),
             "exp": datetime.now(timezone.utc) + timedelta(minutes=15),
+            "sep": 2,
             "type": "access",
         }
         token = jwt.encode(payload, "test-secret-key", algorithm="HS256")
@@ -167,6 +261,21 @@ class TestJWTService:
         # Assert
         assert result is None
 
+    @pytest.mark.asyncio
+    async def test_create_tokens_embeds_session_epoch(
+        self, jwt_service, mock_user, mock_db, mock_redis, mock_settings
+    ):
+        """Test new tokens carry the user's current session epoch."""
+        # Arrange
+        mock_redis.get_session_epoch.return_value = 5
+
+        # Act
+        result = await jwt_service.create_tokens(mock_user, mock_db, "127.0.0.1")
+
+        # Assert
+        for token in (result["access_token"], result["refresh_token"]):
+            assert jwt.decode(token, "test-secret-key", algorithms=["HS256"])["sep"] == 5
+
     @pytest.mark.asyncio
     async def test_refresh_tokens_valid(
         self, jwt_service, mock_user, mock_db, mock_redis, mock_settings
@@ -204,7 +313,49 @@ class TestJWTService:
         assert result is not None
         assert "access_token" in result
         assert "refresh_token" in result
-        mock_redis.exists.assert_called_with(f"session:refresh:{refresh_jti}")
+        assert mock_session.is_active is False
+        assert mock_session.revoked_reason == "token_refresh"
+        mock_db.commit.assert_called_once()
+
+        rotate_kwargs = mock_redis.rotate_refresh_token.call_args.kwargs
+        assert rotate_kwargs["old_refresh_jti"] == refresh_jti
+        assert rotate_kwargs["user_id"] == str(mock_user.id)
+
+    @pytest.mark.asyncio
+    async def test_refresh_tokens_reused(
+        self, jwt_service, mock_user, mock_db, mock_redis, mock_settings
+    ):
+        """Test a refresh token already consumed by a concurrent request is rejected."""
+        # Arrange
+        refresh_jti = str(uuid.uuid4())
+        payload = {
+            "sub": str(mock_user.id),
+            "jti": refresh_jti,
+            "exp": datetime.now(timezone.utc) + timedelta(days=7),
+            "type": "refresh",
+        }
+        refresh_token = jwt.encode(payload, "test-secret-key", algorithm="HS256")
+
+        mock_session = MagicMock(spec=Session)
+        mock_session.id = uuid.uuid4()
+        mock_session.refresh_token_jti = refresh_jti
+        mock_session.is_active = True
+
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.side_effect = [mock_session, mock_user]
+        mock_db.execute.return_value = mock_result
+        mock_redis.rotate_refresh_token.return_value = False
+
+        # Act
+        result = await jwt_service.refresh_tokens(
+            refresh_token=refresh_token, db=mock_db, ip_address="127.0.0.1"
+        )
+
+        # Assert
+        assert result is None
+        assert mock_session.is_active is True
+        mock_db.add.assert_not_called()
+        mock_db.commit.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_revoke_session(self, jwt_service, mock_db, mock_redis, mock_settings):
@@ -233,9 +384,9 @@ class TestJWTService:
         assert mock_session.revoked_reason == "user_logout"
         mock_db.commit.assert_called_once()
 
-        # Verify Redis operations
-        assert mock_redis.delete.call_count == 2
-        assert mock_redis.setex.call_count == 2  # Blacklist entries
+        # Verify Redis operations (single atomic script)
+        mock_redis.revoke_session.assert_called_once_with(access_jti, refresh_jti, 604800)
+        mock_redis.delete.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_generate_and_validate_csrf_token(self, jwt_service, mock_user, mock_settings):
@@ -257,36 +408,85 @@ class TestJWTService:
 
     @pytest.mark.asyncio
     async def test_revoke_all_user_sessions(self, jwt_service, mock_db, mock_redis, mock_settings):
-        """Test revoking all user sessions."""
+        """Test revoking all user sessions with one UPDATE and one Redis batch."""
         # Arrange
         user_id = uuid.uuid4()
-        sessions = [
-            MagicMock(
-                spec=Session,
-                id=uuid.uuid4(),
-                access_token_jti=str(uuid.uuid4()),
-                refresh_token_jti=str(uuid.uuid4()),
-            ),
-            MagicMock(
-                spec=Session,
-                id=uuid.uuid4(),
-                access_token_jti=str(uuid.uuid4()),
-                refresh_token_jti=str(uuid.uuid4()),
-            ),
-        ]
+        token_pairs = [(str(uuid.uuid4()), str(uuid.uuid4())) for _ in range(2)]
 
         mock_result = MagicMock()
-        mock_result.scalars.return_value.all.return_value = sessions
+        mock_result.all.return_value = token_pairs
         mock_db.execute.return_value = mock_result
+        mock_redis.revoke_sessions = AsyncMock(return_value=True)
+
+        with patch("app.services.jwt_service.revocation_cache") as mock_cache:
+            mock_cache.publish_revocation = AsyncMock()
+            mock_cache.publish_epochs = AsyncMock()
 
-        # Mock individual revocations
-        with patch.object(jwt_service, "revoke_session", return_value=True) as mock_revoke:
             # Act
             count = await jwt_service.revoke_all_user_sessions(user_id, mock_db, "security")
 
-            # Assert
-            assert count == 2
-            assert mock_revoke.call_count == 2
+        # Assert
+        assert count == 2
+        mock_db.execute.assert_called_once()
+        mock_db.commit.assert_called_once()
+        statement = str(mock_db.execute.call_args.args[0])
+        assert statement.startswith("UPDATE sessions")
+        assert "RETURNING" in statement
+        mock_redis.revoke_sessions.assert_called_once_with(token_pairs, 604800, strict=True)
+        mock_cache.publish_revocation.assert_called_once_with([a for a, _ in token_pairs])
+        mock_redis.bump_session_epochs.assert_called_once_with([str(user_id)])
+
+    @pytest.mark.asyncio
+    async def test_revoke_all_user_sessions_redis_down(
+        self, jwt_service, mock_db, mock_redis, mock_settings
+    ):
+        """Test logout everywhere fails loudly when the epoch bump cannot reach Redis."""
+        # Arrange
+        mock_redis.bump_session_epochs.side_effect = RedisUnavailable("Redis circuit open")
+
+        # Act / Assert
+        with pytest.raises(RedisUnavailable):
+            await jwt_service.revoke_all_user_sessions(uuid.uuid4(), mock_db, "security")
+        mock_db.execute.assert_not_called()
+        mock_db.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_revoke_sessions_redis_failure_raises(
+        self, jwt_service, mock_db, mock_redis, mock_settings
+    ):
+        """Test a failed Redis revocation is raised instead of reported as 0 sessions."""
+        # Arrange
+        mock_result = MagicMock()
+        mock_result.all.return_value = [("access", "refresh")]
+        mock_db.execute.return_value = mock_result
+        mock_redis.revoke_sessions = AsyncMock(side_effect=RedisUnavailable("Redis down"))
+
+        # Act / Assert
+        with pytest.raises(RedisUnavailable):
+            await jwt_service.revoke_sessions_by_access_jti(["access"], mock_db)
+
+    @pytest.mark.asyncio
+    async def test_revoke_organization_sessions(
+        self, jwt_service, mock_db, mock_redis, mock_settings
+    ):
+        """Test organization-wide revocation bumps every member's epoch."""
+        # Arrange
+        members = [uuid.uuid4(), uuid.uuid4()]
+        members_result = MagicMock()
+        members_result.scalars.return_value.all.return_value = members
+        update_result = MagicMock()
+        update_result.all.return_value = []
+        mock_db.execute.side_effect = [members_result, update_result]
+        mock_redis.revoke_sessions = AsyncMock()
+
+        # Act
+        count = await jwt_service.revoke_organization_sessions(uuid.uuid4(), mock_db)
+
+        # Assert
+        assert count == 0
+        assert "users.organization_id" in str(mock_db.execute.call_args_list[0].args[0])
+        mock_redis.bump_session_epochs.assert_called_once_with([str(m) for m in members])
+        mock_redis.revoke_sessions.assert_not_called()
 
     def test_get_device_name(self, jwt_service):
         """Test device name extraction from user agent."""
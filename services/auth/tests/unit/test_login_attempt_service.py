@@ -0,0 +1,100 @@
+"""
+Unit Tests for Login Attempt Service
+====================================
+Test Redis sliding-window failed-login tracking and lockout
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.models.user import User
+from app.services.login_attempt_service import LoginAttemptService
+from freezegun import freeze_time
+
+
+@pytest.fixture
+def service():
+    """Create service with small thresholds."""
+    return LoginAttemptService(
+        max_attempts=3, max_attempts_per_ip=10, window_seconds=900, lockout_minutes=15
+    )
+
+
+@pytest.fixture
+def mock_redis():
+    """Patch the Redis client used by the service."""
+    with patch("app.services.login_attempt_service.redis_client") as redis:
+        redis.sliding_window_hit = AsyncMock(return_value=[1, 1])
+        redis.sliding_window_count = AsyncMock(return_value=0)
+        redis.delete = AsyncMock(return_value=True)
+        yield redis
+
+
+@pytest.fixture
+def user():
+    """Create unlocked user."""
+    user = MagicMock(spec=User)
+    user.id = uuid.uuid4()
+    user.email = "test@example.com"
+    user.locked_until = None
+    user.failed_login_count = 0
+    return user
+
+
+@pytest.mark.unit
+class TestLoginAttemptService:
+    """Test failed-login tracking."""
+
+    @pytest.mark.asyncio
+    async def test_failure_below_threshold_does_not_touch_user(self, service, mock_redis, user):
+        """Test failures are counted in Redis only."""
+        assert await service.record_failure(user, "10.0.0.1") is False
+
+        mock_redis.sliding_window_hit.assert_called_once_with(
+            [f"login_failures:user:{user.id}", "login_failures:ip:10.0.0.1"], 900
+        )
+        assert user.locked_until is None
+
+    @pytest.mark.asyncio
+    async def test_threshold_locks_account(self, service, mock_redis, user):
+        """Test reaching the threshold mirrors the lock to the user row."""
+        mock_redis.sliding_window_hit.return_value = [3, 7]
+
+        with freeze_time("2024-01-01 23:30:00"):
+            assert await service.record_failure(user, "10.0.0.1") is True
+
+        # Lock end crosses midnight correctly (was hour + 1)
+        assert user.locked_until == datetime(2024, 1, 1, 23, 45, tzinfo=timezone.utc)
+        assert user.failed_login_count == 3
+        mock_redis.delete.assert_called_once_with(f"login_failures:user:{user.id}")
+
+    @pytest.mark.asyncio
+    async def test_unknown_user_counts_ip_only(self, service, mock_redis):
+        """Test attempts on unknown emails still count against the IP."""
+        mock_redis.sliding_window_hit.return_value = [1]
+
+        assert await service.record_failure(None, "10.0.0.1") is False
+        mock_redis.sliding_window_hit.assert_called_once_with(["login_failures:ip:10.0.0.1"], 900)
+
+    @pytest.mark.asyncio
+    async def test_ip_blocked(self, service, mock_redis):
+        """Test IPs over budget are blocked."""
+        mock_redis.sliding_window_count.return_value = 10
+
+        assert await service.is_ip_blocked("10.0.0.1") is True
+        assert await service.is_ip_blocked(None) is False
+
+    @pytest.mark.asyncio
+    async def test_reset(self, service, mock_redis):
+        """Test successful login clears the user counter."""
+        user_id = str(uuid.uuid4())
+
+        await service.reset(user_id)
+
+        mock_redis.delete.assert_called_once_with(f"login_failures:user:{user_id}")
+
+    def test_lock_duration(self, service):
+        """Test lockout duration comes from settings."""
+        assert service.lockout_duration == timedelta(minutes=15)
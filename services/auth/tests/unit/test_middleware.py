@@ -0,0 +1,132 @@
+"""
+Unit Tests for ASGI Middlewares
+===============================
+Test request ID, security headers and CSRF middlewares
+"""
+
+import pytest
+from app.middleware.csrf import CSRFMiddleware
+from app.middleware.request_id import RequestIDMiddleware
+from app.middleware.security import SecurityHeadersMiddleware
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+
+async def echo_request_id(request: Request):
+    return JSONResponse({"request_id": request.state.request_id})
+
+
+async def framed(request: Request):
+    return PlainTextResponse("ok", headers={"X-Frame-Options": "SAMEORIGIN"})
+
+
+async def stream(request: Request):
+    async def chunks():
+        for chunk in (b"a", b"b", b"c"):
+            yield chunk
+
+    return StreamingResponse(chunks())
+
+
+async def submit(request: Request):
+    return PlainTextResponse("submitted")
+
+
+@pytest.fixture
+def client():
+    """Create client for an app with the full middleware stack."""
+    app = Starlette(
+        routes=[
+            Route("/id", echo_request_id),
+            Route("/framed", framed),
+            Route("/stream", stream),
+            Route("/submit", submit, methods=["GET", "POST"]),
+        ],
+        middleware=[
+            Middleware(RequestIDMiddleware),
+            Middleware(SecurityHeadersMiddleware),
+            Middleware(CSRFMiddleware, secret="test"),
+        ],
+    )
+    return AsyncClient(transport=ASGITransport(app=app), base_url="https://test", timeout=5.0)
+
+
+@pytest.mark.unit
+class TestRequestIDMiddleware:
+    """Test request ID propagation."""
+
+    @pytest.mark.asyncio
+    async def test_generated_request_id(self, client):
+        """Test a request ID is generated and exposed to the endpoint."""
+        response = await client.get("/id")
+
+        request_id = response.headers["X-Request-ID"]
+        assert len(request_id) == 36
+        assert response.json()["request_id"] == request_id
+
+    @pytest.mark.asyncio
+    async def test_incoming_request_id_kept(self, client):
+        """Test an incoming request ID is reused."""
+        response = await client.get("/id", headers={"X-Request-ID": "abc-123"})
+
+        assert response.headers["X-Request-ID"] == "abc-123"
+        assert response.json()["request_id"] == "abc-123"
+
+
+@pytest.mark.unit
+class TestSecurityHeadersMiddleware:
+    """Test security headers."""
+
+    @pytest.mark.asyncio
+    async def test_headers_added_once(self, client):
+        """Test security headers replace endpoint values instead of duplicating."""
+        response = await client.get("/framed")
+
+        assert response.headers.get_list("X-Frame-Options") == ["DENY"]
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        assert "frame-ancestors 'none'" in response.headers["Content-Security-Policy"]
+
+    @pytest.mark.asyncio
+    async def test_streaming_response(self, client):
+        """Test streaming bodies pass through with headers set."""
+        response = await client.get("/stream")
+
+        assert response.content == b"abc"
+        assert response.headers["Strict-Transport-Security"].startswith("max-age=")
+        assert "X-Request-ID" in response.headers
+
+
+@pytest.mark.unit
+class TestCSRFMiddleware:
+    """Test double-submit cookie CSRF protection."""
+
+    @pytest.mark.asyncio
+    async def test_get_sets_cookie(self, client):
+        """Test GET without a token cookie receives one."""
+        response = await client.get("/submit")
+
+        cookie = response.headers["set-cookie"]
+        assert cookie.startswith("csrf_token=")
+        assert "HttpOnly" in cookie and "SameSite=strict" in cookie
+
+    @pytest.mark.asyncio
+    async def test_post_without_token_rejected(self, client):
+        """Test unsafe methods need matching cookie and header."""
+        response = await client.post("/submit")
+
+        assert response.status_code == 403
+        assert response.json() == {"detail": "CSRF token validation failed"}
+        assert response.headers["X-Frame-Options"] == "DENY"
+
+    @pytest.mark.asyncio
+    async def test_post_with_token_allowed(self, client):
+        """Test matching cookie and header pass."""
+        client.cookies.set("csrf_token", "token-value")
+        response = await client.post("/submit", headers={"X-CSRF-Token": "token-value"})
+
+        assert response.status_code == 200
+        assert response.text == "submitted"
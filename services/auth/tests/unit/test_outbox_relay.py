@@ -0,0 +1,184 @@
+"""
+Unit Tests for the Transactional Outbox
+=======================================
+Test outbox writes and the relay's claiming, ordering and retry handling
+"""
+
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.core.database import commit_session
+from app.models.outbox import OutboxEvent
+from app.services.event_service import EventService
+from app.workers.outbox_relay import OutboxRelay
+from sqlalchemy.dialects import postgresql
+
+
+def _event(event_id, aggregate_id):
+    """Build an outbox row."""
+    return OutboxEvent(
+        id=event_id,
+        aggregate_id=aggregate_id,
+        event_type="user.logged_in",
+        routing_key="user.logged_in",
+        correlation_id=f"c{event_id}",
+        payload={"event_type": "user.logged_in", "payload": {"n": event_id}},
+        attempts=0,
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+def _result(rows=None, pairs=None):
+    """Fake SQLAlchemy result for claimed rows or (aggregate_id, id) pairs."""
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = rows or []
+    result.all.return_value = pairs or []
+    return result
+
+
+@pytest.fixture
+def mock_db():
+    """Patch the relay session factory."""
+    db = AsyncMock()
+    db.add = MagicMock()
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=db)
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    with patch("app.workers.outbox_relay.AsyncSessionLocal", factory):
+        yield db
+
+
+@pytest.fixture
+def mock_events():
+    """Patch the event service used by the relay."""
+    with patch("app.workers.outbox_relay.event_service") as service:
+        service.is_connected = True
+        service.deliver = AsyncMock(return_value=True)
+        yield service
+
+
+@pytest.mark.unit
+class TestOutboxWrite:
+    """Test events written to the outbox."""
+
+    @pytest.mark.asyncio
+    async def test_publish_with_db_adds_outbox_row(self):
+        """Test an event published with a session is only added to it (no broker I/O)."""
+        db = MagicMock()
+        service = EventService()
+
+        assert await service.publish_user_logged_in(user_id="u1", email="a@b.it", db=db) is True
+
+        row = db.add.call_args.args[0]
+        assert isinstance(row, OutboxEvent)
+        assert row.aggregate_id == "u1"
+        assert row.routing_key == "user.logged_in"
+        assert row.payload["correlation_id"] == row.correlation_id
+        assert row.payload["payload"]["email"] == "a@b.it"
+
+    @pytest.mark.asyncio
+    async def test_one_time_tokens_never_stored_in_outbox(self):
+        """Test reset/verification tokens are published after commit, not stored."""
+        db = MagicMock()
+        db.commit = AsyncMock()
+        db.info = {}
+        service = EventService()
+        service.publish_event = AsyncMock(return_value=True)
+
+        await service.publish_user_registered("u1", "a@b.it", "A", "verify-secret", db=db)
+        await service.publish_password_reset_requested("u1", "a@b.it", "A", "reset-secret", db=db)
+
+        db.add.assert_not_called()
+        service.publish_event.assert_not_called()
+
+        await commit_session(db)
+
+        payloads = [call.kwargs for call in service.publish_event.await_args_list]
+        assert [p["payload"].get("verification_token") for p in payloads] == ["verify-secret", None]
+        assert payloads[1]["payload"]["reset_token"] == "reset-secret"
+        assert all("db" not in p for p in payloads)
+
+    @pytest.mark.asyncio
+    async def test_no_outbox_row_while_publisher_disabled(self):
+        """Test nothing is queued in the outbox when no relay would drain it."""
+        db = MagicMock()
+        service = EventService()
+
+        with patch("app.services.event_service.settings") as mock_settings:
+            mock_settings.OUTBOX_ENABLED = True
+            mock_settings.EVENT_PUBLISHER_ENABLED = False
+            published = await service.publish_user_logged_in(user_id="u1", email="a@b.it", db=db)
+
+        assert published is False
+        db.add.assert_not_called()
+
+
+@pytest.mark.unit
+class TestOutboxRelay:
+    """Test outbox relay."""
+
+    @pytest.mark.asyncio
+    async def test_older_rows_hold_back_aggregate(self):
+        """Test only each aggregate's oldest pending rows are published."""
+        claimed = [_event(1, "a"), _event(2, "b"), _event(4, "a"), _event(5, "c")]
+        db = AsyncMock()
+        db.execute = AsyncMock(
+            return_value=_result(pairs=[("a", 1), ("b", 2), ("a", 3), ("a", 4), ("c", 0), ("c", 5)])
+        )
+
+        ordered = await OutboxRelay._in_order(db, claimed)
+
+        assert {key: [e.id for e in events] for key, events in ordered.items()} == {
+            "a": [1],
+            "b": [2],
+        }
+
+    @pytest.mark.asyncio
+    async def test_aggregate_stops_at_first_failure(self, mock_events):
+        """Test later events of an aggregate wait for the failed one."""
+        mock_events.deliver = AsyncMock(side_effect=[True, False, True])
+        events = [_event(1, "a"), _event(2, "a"), _event(3, "a")]
+
+        delivered, failed = await OutboxRelay._relay_aggregate(events)
+
+        assert [e.id for e in delivered] == [1]
+        assert failed.id == 2
+        assert mock_events.deliver.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_relay_batch_deletes_delivered_and_backs_off_failed(self, mock_db, mock_events):
+        """Test confirmed rows are deleted and failed rows rescheduled, in one commit."""
+        rows = [_event(1, "a"), _event(2, "b")]
+        mock_db.execute = AsyncMock(
+            side_effect=[_result(rows=rows), _result(pairs=[("a", 1), ("b", 2)]), _result()]
+        )
+        mock_events.deliver = AsyncMock(
+            side_effect=lambda correlation_id, **_: correlation_id == "c1"
+        )
+
+        assert await OutboxRelay().relay_batch() == 1
+
+        claim = str(
+            mock_db.execute.await_args_list[0].args[0].compile(dialect=postgresql.dialect())
+        )
+        assert "FOR UPDATE SKIP LOCKED" in claim
+        assert "DELETE FROM outbox" in str(mock_db.execute.await_args_list[2].args[0])
+        assert rows[1].attempts == 1
+        assert rows[1].available_at > datetime.now(timezone.utc)
+        mock_db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_no_claim_while_broker_down(self, mock_db, mock_events):
+        """Test rows are not locked (or retried) while the publisher is disconnected."""
+        mock_events.is_connected = False
+
+        assert await OutboxRelay().relay_batch() == 0
+        mock_db.execute.assert_not_awaited()
+
+    def test_notify_wakes_relay(self):
+        """Test a NOTIFY on the outbox channel wakes the relay."""
+        relay = OutboxRelay()
+        relay._on_notify(None, 1, "auth_outbox", "")
+
+        assert relay._wakeup.is_set()
@@ -0,0 +1,90 @@
+"""
+Unit Tests for Async Password Hasher
+====================================
+Test executor offload, load shedding and rehash-on-login
+"""
+
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+from app.core.password_hasher import PasswordHasher, PasswordHasherOverloaded
+from passlib.context import CryptContext
+
+
+@pytest.fixture
+def hasher():
+    """Create a small hasher."""
+    hasher = PasswordHasher(workers=2, max_queue=1)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.mark.unit
+class TestPasswordHasher:
+    """Test async password hashing."""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify(self, hasher):
+        """Test hashing round trip off the event loop."""
+        password_hash = await hasher.hash("SecurePass123!")
+
+        assert password_hash.startswith("$2b$")
+        assert await hasher.verify("SecurePass123!", password_hash) is True
+        assert await hasher.verify("WrongPass456!", password_hash) is False
+        assert hasher.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_event_loop_not_blocked(self, hasher):
+        """Test other coroutines run while a hash is computed."""
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await hasher.hash("SecurePass123!")
+        task.cancel()
+
+        assert ticks > 1
+
+    @pytest.mark.asyncio
+    async def test_load_shedding(self, hasher):
+        """Test calls beyond workers + queue fail fast."""
+        release = threading.Event()
+
+        def blocking_hash(password):
+            release.wait(5)
+            return "hash"
+
+        with patch("app.core.password_hasher.get_password_hash", blocking_hash):
+            running = [asyncio.create_task(hasher.hash("x")) for _ in range(3)]
+            await asyncio.sleep(0.05)
+
+            with pytest.raises(PasswordHasherOverloaded):
+                await hasher.hash("x")
+
+            release.set()
+            assert await asyncio.gather(*running) == ["hash"] * 3
+
+        assert hasher.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_rehash_when_cost_changes(self, hasher):
+        """Test outdated bcrypt cost is upgraded on verification."""
+        old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("SecurePass123!")
+
+        is_valid, new_hash = await hasher.verify_and_update("SecurePass123!", old_hash)
+
+        assert is_valid is True
+        assert new_hash is not None and new_hash != old_hash
+        assert await hasher.verify_and_update("SecurePass123!", new_hash) == (True, None)
+
+    def test_invalid_executor(self):
+        """Test unknown executor types are rejected."""
+        with pytest.raises(ValueError):
+            PasswordHasher(executor="fiber")
@@ -0,0 +1,124 @@
+"""
+Unit Tests for Auth Principal Cache
+===================================
+Test the two-level principal cache and projection loading
+"""
+
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.services.principal_cache import AuthPrincipal, PrincipalCache
+
+
+def _principal(**overrides) -> AuthPrincipal:
+    data = {
+        "id": uuid.uuid4(),
+        "email": "user@example.com",
+        "role": "customer",
+        "status": "active",
+        "deleted_at": None,
+        "email_verified": True,
+        "mfa_enabled": False,
+        "organization_id": None,
+    }
+    data.update(overrides)
+    return AuthPrincipal(**data)
+
+
+@pytest.fixture
+def mock_redis():
+    """Patch the Redis client used by the cache."""
+    with patch("app.services.principal_cache.redis_client") as redis:
+        redis.get = AsyncMock(return_value=None)
+        redis.setex = AsyncMock(return_value=True)
+        redis.delete = AsyncMock(return_value=True)
+        yield redis
+
+
+@pytest.fixture
+def cache():
+    """Create a small principal cache."""
+    return PrincipalCache(max_entries=2, ttl_seconds=300, local_ttl_seconds=10)
+
+
+@pytest.mark.unit
+class TestAuthPrincipal:
+    """Test principal projection."""
+
+    def test_json_round_trip(self):
+        """Test principals survive Redis serialization."""
+        principal = _principal(
+            deleted_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+            organization_id=uuid.uuid4(),
+        )
+
+        assert AuthPrincipal.from_json(principal.to_json()) == principal
+
+    def test_is_active(self):
+        """Test active rule matches User.is_active."""
+        assert _principal().is_active
+        assert not _principal(status="locked").is_active
+        assert not _principal(deleted_at=datetime.now(timezone.utc)).is_active
+
+
+@pytest.mark.unit
+class TestPrincipalCache:
+    """Test principal cache behaviour."""
+
+    @pytest.mark.asyncio
+    async def test_miss_loads_projection(self, cache, mock_redis):
+        """Test a miss loads the projection once and writes it through."""
+        principal = _principal()
+        row = MagicMock()
+        row._asdict.return_value = {
+            field: getattr(principal, field) for field in principal.__dataclass_fields__
+        }
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(first=MagicMock(return_value=row))
+
+        assert await cache.get(principal.id, db) == principal
+        assert await cache.get(principal.id, db) == principal
+
+        assert db.execute.call_count == 1
+        mock_redis.setex.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_redis_hit(self, cache, mock_redis):
+        """Test principals cached by another replica skip the database."""
+        principal = _principal()
+        mock_redis.get.return_value = principal.to_json()
+        db = AsyncMock()
+
+        assert await cache.get(principal.id, db) == principal
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unknown_user(self, cache, mock_redis):
+        """Test missing users return None."""
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(first=MagicMock(return_value=None))
+
+        assert await cache.get(uuid.uuid4(), db) is None
+        assert await cache.get("not-a-uuid", db) is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self, cache, mock_redis):
+        """Test invalidation drops both levels."""
+        principal = _principal()
+        await cache._write(principal)
+
+        await cache.invalidate(principal.id)
+
+        assert str(principal.id) not in cache._entries
+        mock_redis.delete.assert_called_once_with(f"principal:{principal.id}")
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self, cache, mock_redis):
+        """Test least recently used entries are evicted when full."""
+        principals = [_principal() for _ in range(3)]
+        for principal in principals:
+            await cache._write(principal)
+
+        assert list(cache._entries) == [str(p.id) for p in principals[1:]]
@@ -0,0 +1,102 @@
+"""
+Unit Tests for Rate Limiting
+============================
+Test the Redis GCRA limiter, composite keys and per-user overrides
+"""
+
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.core.rate_limit import RateLimiter, parse_rate_limit, rate_limit
+from fastapi import HTTPException, Request
+
+
+@pytest.fixture
+def mock_redis():
+    """Patch the Redis client used by the limiter."""
+    with patch("app.core.rate_limit.redis_client") as redis:
+        redis.gcra_hit = AsyncMock(return_value=(True, 4, 0.0))
+        yield redis
+
+
+def _request(ip: str = "10.0.0.1") -> Request:
+    request = MagicMock(spec=Request)
+    request.client.host = ip
+    return request
+
+
+@pytest.mark.unit
+class TestParseRateLimit:
+    """Test rate limit strings."""
+
+    def test_formats(self):
+        """Test supported notations."""
+        assert parse_rate_limit("5/hour") == (5, 3600)
+        assert parse_rate_limit("10/5minutes") == (10, 300)
+        assert parse_rate_limit("100 per minute") == (100, 60)
+
+    def test_invalid(self):
+        """Test malformed limits are rejected."""
+        with pytest.raises(ValueError):
+            parse_rate_limit("lots")
+
+
+@pytest.mark.unit
+class TestRateLimiter:
+    """Test limiter behaviour."""
+
+    @pytest.mark.asyncio
+    async def test_allowed(self, mock_redis):
+        """Test allowed requests pass with a composite key."""
+        await RateLimiter().hit("login", ["ip:10.0.0.1", "user:42"], 5, 60)
+
+        mock_redis.gcra_hit.assert_called_once_with("ratelimit:login:ip:10.0.0.1:user:42", 5, 60)
+
+    @pytest.mark.asyncio
+    async def test_denied(self, mock_redis):
+        """Test denied requests raise 429 with Retry-After."""
+        mock_redis.gcra_hit.return_value = (False, 0, 12.3)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await RateLimiter().hit("login", ["ip:10.0.0.1"], 5, 60)
+
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers["Retry-After"] == "13"
+
+    @pytest.mark.asyncio
+    async def test_redis_unavailable_allows(self, mock_redis):
+        """Test the limiter fails open."""
+        mock_redis.gcra_hit.return_value = None
+
+        await RateLimiter().hit("login", ["ip:10.0.0.1"], 5, 60)
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, mock_redis):
+        """Test a disabled limiter never calls Redis."""
+        await RateLimiter(enabled=False).hit("login", ["ip:10.0.0.1"], 5, 60)
+
+        mock_redis.gcra_hit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_user_override(self, mock_redis):
+        """Test api_rate_limit_override replaces the default user limit."""
+        user_id = uuid.uuid4()
+
+        await RateLimiter().hit_user(user_id, override=1000)
+
+        mock_redis.gcra_hit.assert_called_once_with(f"ratelimit:api:user:{user_id}", 1000, 60)
+
+    @pytest.mark.asyncio
+    async def test_decorator_composite_key(self, mock_redis):
+        """Test the decorator keys by endpoint, IP and user."""
+        user = MagicMock(id="u1")
+
+        @rate_limit("3/hour")
+        async def forgot_password(request: Request, current_user=None):
+            return "ok"
+
+        assert await forgot_password(request=_request(), current_user=user) == "ok"
+        mock_redis.gcra_hit.assert_called_once_with(
+            "ratelimit:forgot_password:ip:10.0.0.1:user:u1", 3, 3600
+        )
@@ -0,0 +1,154 @@
+"""
+Unit Tests for Reaper Worker
+============================
+Test partition rotation and batched token reaping
+"""
+
+from datetime import date, datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.workers.reaper_worker import (
+    TOKEN_TABLES,
+    ReaperWorker,
+    next_month,
+    partition_month,
+    partition_name,
+)
+
+
+def _engine_mock():
+    """Create engine whose connections record executed SQL."""
+    conn = AsyncMock()
+    conn.execution_options = AsyncMock(return_value=conn)
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=conn)
+    context.__aexit__ = AsyncMock(return_value=False)
+    engine = MagicMock()
+    engine.begin.return_value = context
+    engine.connect.return_value = context
+    return engine, conn
+
+
+@pytest.mark.unit
+class TestPartitionNames:
+    """Test monthly partition naming."""
+
+    def test_round_trip(self):
+        """Test partition names map back to their month."""
+        assert partition_name(date(2026, 3, 1)) == "sessions_y2026m03"
+        assert partition_month("sessions_y2026m03") == date(2026, 3, 1)
+        assert partition_month("sessions_default") is None
+
+    def test_next_month_wraps_year(self):
+        """Test December rolls over to January."""
+        assert next_month(date(2026, 12, 1)) == date(2027, 1, 1)
+
+
+@pytest.mark.unit
+class TestReaperWorker:
+    """Test retention tasks."""
+
+    @pytest.mark.asyncio
+    async def test_ensure_partitions_creates_missing(self):
+        """Test only missing months ahead are created."""
+        worker = ReaperWorker(months_ahead=2)
+        engine, conn = _engine_mock()
+
+        with (
+            patch.object(worker, "_list_partitions", AsyncMock(return_value=["sessions_y2026m11"])),
+            patch("app.workers.reaper_worker.engine", engine),
+        ):
+            assert await worker.ensure_partitions(date(2026, 11, 17)) == 2
+
+        statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+        assert "sessions_y2026m12 PARTITION OF sessions" in statements[0]
+        assert "FROM ('2027-01-01') TO ('2027-02-01')" in statements[1]
+
+    @pytest.mark.asyncio
+    async def test_retire_partitions(self):
+        """Test partitions fully past retention are detached and archived."""
+        worker = ReaperWorker(archive=True)
+        engine, conn = _engine_mock()
+        partitions = ["sessions_y2026m01", "sessions_y2026m02", "sessions_default"]
+
+        with (
+            patch.object(worker, "_list_partitions", AsyncMock(return_value=partitions)),
+            patch("app.workers.reaper_worker.engine", engine),
+        ):
+            retired = await worker.retire_partitions(datetime(2026, 2, 15, tzinfo=timezone.utc))
+
+        assert retired == 1
+        statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+        # No CONCURRENTLY (rejected with a DEFAULT partition), one transaction
+        assert statements == [
+            "ALTER TABLE sessions DETACH PARTITION sessions_y2026m01",
+            "ALTER TABLE sessions_y2026m01 SET SCHEMA archive",
+        ]
+        engine.begin.assert_called_once()
+        engine.connect.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_run_once_isolates_failing_steps(self):
+        """Test a failing step does not stop token and default-partition reaping."""
+        worker = ReaperWorker()
+
+        with (
+            patch.object(worker, "ensure_partitions", AsyncMock(return_value=0)),
+            patch.object(worker, "retire_partitions", AsyncMock(side_effect=RuntimeError("x"))),
+            patch.object(worker, "reap_tokens", AsyncMock(return_value=3)) as reap_tokens,
+            patch.object(worker, "reap_default_sessions", AsyncMock(return_value=1)),
+        ):
+            summary = await worker.run_once()
+
+        assert "partitions_retired" not in summary
+        assert summary["password_reset_tokens"] == 3
+        assert summary["sessions_default"] == 1
+        assert [call.args[0] for call in reap_tokens.await_args_list] == list(TOKEN_TABLES)
+
+    @pytest.mark.asyncio
+    async def test_reap_tokens_in_batches(self):
+        """Test tokens are archived one short transaction per batch."""
+        worker = ReaperWorker(batch_size=2, archive=True)
+        db = AsyncMock()
+        db.execute.side_effect = [
+            MagicMock(scalar=MagicMock(return_value=2)),
+            MagicMock(scalar=MagicMock(return_value=1)),
+        ]
+        factory = MagicMock()
+        factory.return_value.__aenter__ = AsyncMock(return_value=db)
+        factory.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        with patch("app.workers.reaper_worker.AsyncSessionLocal", factory):
+            total = await worker.reap_tokens("password_reset_tokens", datetime.now(timezone.utc))
+
+        assert total == 3
+        assert db.commit.await_count == 2
+        sql = str(db.execute.call_args.args[0])
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "INSERT INTO archive.password_reset_tokens" in sql
+
+    @pytest.mark.asyncio
+    async def test_reap_tokens_rejects_unknown_table(self):
+        """Test only allow-listed token tables are interpolated into SQL."""
+        with pytest.raises(ValueError):
+            await ReaperWorker().reap_tokens("users; --", datetime.now(timezone.utc))
+
+    @pytest.mark.asyncio
+    async def test_single_replica_per_interval(self):
+        """Test the loop skips the run when another replica holds the lock."""
+        worker = ReaperWorker(interval=1)
+        worker._running = True
+
+        async def stop(_):
+            worker._running = False
+
+        with (
+            patch("app.workers.reaper_worker.redis_client") as mock_redis,
+            patch("app.workers.reaper_worker.asyncio.sleep", side_effect=stop),
+            patch.object(worker, "run_once", AsyncMock()) as run_once,
+        ):
+            mock_redis.set_if_absent = AsyncMock(return_value=False)
+            await worker._run()
+
+        run_once.assert_not_awaited()
@@ -0,0 +1,263 @@
+"""
+Unit Tests for Redis Client
+===========================
+Test pipelined and scripted session primitives, circuit breaker and batch helpers
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.core.redis import ROTATE_REFRESH_SCRIPT, CircuitBreaker, RedisClient, RedisUnavailable
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+
+@pytest.fixture
+def client():
+    """Create Redis client wrapper with a mocked connection."""
+    client = RedisClient()
+    client._client = MagicMock()
+    return client
+
+
+@pytest.mark.unit
+class TestSessionPrimitives:
+    """Test session primitives cost a single round trip."""
+
+    @pytest.mark.asyncio
+    async def test_store_session_uses_one_transaction(self, client):
+        """Test both session keys are written in one MULTI/EXEC."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[True, True])
+        client._client.pipeline.return_value = pipe
+
+        assert await client.store_session("a", "r", "user", 900, 3600) is True
+
+        client._client.pipeline.assert_called_once_with(transaction=True)
+        pipe.set.assert_any_call("session:access:a", "user", ex=900)
+        pipe.set.assert_any_call("session:refresh:r", "user", ex=3600)
+        pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_revoke_sessions_batches(self, client):
+        """Test bulk revocation sends one pipeline execute per batch."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[])
+        client._client.pipeline.return_value = pipe
+        pairs = [(f"a{i}", f"r{i}") for i in range(5)]
+
+        assert await client.revoke_sessions(pairs, 3600, batch_size=2) is True
+
+        client._client.pipeline.assert_called_once_with(transaction=False)
+        assert pipe.execute.await_count == 3
+        assert pipe.delete.call_count == 5
+        assert pipe.set.call_count == 10
+
+    @pytest.mark.asyncio
+    async def test_rotate_refresh_token(self, client):
+        """Test rotation runs one script with old and new keys."""
+        script = AsyncMock(return_value=1)
+        client._client.register_script.return_value = script
+
+        rotated = await client.rotate_refresh_token(
+            old_access_jti="a1",
+            old_refresh_jti="r1",
+            new_access_jti="a2",
+            new_refresh_jti="r2",
+            user_id="user",
+            access_ttl=900,
+            refresh_ttl=3600,
+            blacklist_ttl=3600,
+        )
+
+        assert rotated is True
+        client._client.register_script.assert_called_once_with(ROTATE_REFRESH_SCRIPT)
+        script.assert_awaited_once_with(
+            keys=[
+                "session:refresh:r1",
+                "session:access:a1",
+                "blacklist:access:a1",
+                "blacklist:refresh:r1",
+                "session:access:a2",
+                "session:refresh:r2",
+                "session_epoch:user",
+            ],
+            args=["user", 900, 3600, 3600, 0],
+        )
+
+    @pytest.mark.asyncio
+    async def test_rotate_refresh_token_already_used(self, client):
+        """Test a consumed refresh token is reported as not rotated."""
+        client._client.register_script.return_value = AsyncMock(return_value=0)
+
+        assert (
+            await client.rotate_refresh_token("a1", "r1", "a2", "r2", "user", 900, 3600, 3600)
+            is False
+        )
+
+    @pytest.mark.asyncio
+    async def test_scripts_registered_once(self, client):
+        """Test scripts are registered once and reused (EVALSHA)."""
+        client._client.register_script.return_value = AsyncMock(return_value=2)
+
+        assert await client.revoke_session("a", "r", 3600) is True
+        assert await client.revoke_session("b", "s", 3600) is True
+
+        client._client.register_script.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_check_session(self, client):
+        """Test session existence and epoch are read in one round trip."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[1, "3"])
+        client._client.pipeline.return_value = pipe
+
+        assert await client.check_session("a", "user") == (True, 3)
+        pipe.exists.assert_called_once_with("session:access:a")
+        pipe.get.assert_called_once_with("session_epoch:user")
+
+    @pytest.mark.asyncio
+    async def test_bump_session_epochs(self, client):
+        """Test epochs of many users are incremented in one pipeline."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[1, 7])
+        client._client.pipeline.return_value = pipe
+
+        assert await client.bump_session_epochs(["u1", "u2"]) == {"u1": 1, "u2": 7}
+        pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_bump_session_epochs_is_strict(self, client):
+        """Test a failed epoch bump raises instead of silently revoking nothing."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(side_effect=RedisConnectionError("down"))
+        client._client.pipeline.return_value = pipe
+
+        with pytest.raises(RedisUnavailable):
+            await client.bump_session_epochs(["u1"])
+
+    @pytest.mark.asyncio
+    async def test_sliding_window_hit(self, client):
+        """Test every counter is updated by one script call."""
+        script = AsyncMock(return_value=[2, 9])
+        client._client.register_script.return_value = script
+
+        assert await client.sliding_window_hit(["u", "ip"], 900) == [2, 9]
+        assert script.call_args.kwargs["keys"] == ["u", "ip"]
+        assert script.call_args.kwargs["args"][0] == 900000
+
+    @pytest.mark.asyncio
+    async def test_gcra_hit(self, client):
+        """Test GCRA passes the emission interval and burst."""
+        script = AsyncMock(return_value=[0, 0, 1500])
+        client._client.register_script.return_value = script
+
+        assert await client.gcra_hit("k", 10, 60) == (False, 0, 1.5)
+        script.assert_awaited_once_with(keys=["k"], args=[6000, 10])
+
+    @pytest.mark.asyncio
+    async def test_record_session_activity(self, client):
+        """Test activity is written to both sorted sets in one round trip."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[1, 1])
+        client._client.pipeline.return_value = pipe
+
+        assert await client.record_session_activity({"a": 100.0}) is True
+
+        pipe.zadd.assert_any_call("session_activity", {"a": 100.0}, gt=True)
+        pipe.zadd.assert_any_call("session_activity:dirty", {"a": 100.0}, gt=True)
+        pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_pop_idle_sessions(self, client):
+        """Test idle sessions are popped atomically and scores dropped."""
+        script = AsyncMock(return_value=["a", "10", "b", "20"])
+        client._client.register_script.return_value = script
+
+        assert await client.pop_idle_sessions(50.0, 100) == ["a", "b"]
+        script.assert_awaited_once_with(keys=["session_activity"], args=[50.0, 100])
+
+    @pytest.mark.asyncio
+    async def test_unavailable(self):
+        """Test primitives fail closed without a connection."""
+        client = RedisClient()
+
+        assert await client.store_session("a", "r", "user", 900, 3600) is False
+        assert await client.revoke_session("a", "r", 3600) is False
+        assert await client.sliding_window_hit(["u", "ip"], 900) == [0, 0]
+        assert await client.gcra_hit("k", 10, 60) is None
+        assert await client.record_session_activity({"a": 1.0}) is False
+        assert await client.pop_dirty_session_activity(10) == []
+        assert await client.pop_idle_sessions(1.0, 10) == []
+        assert (
+            await client.rotate_refresh_token("a1", "r1", "a2", "r2", "user", 900, 3600, 3600)
+            is False
+        )
+
+
+@pytest.mark.unit
+class TestResilience:
+    """Test circuit breaker, strict reads and batch helpers."""
+
+    @pytest.mark.asyncio
+    async def test_circuit_opens_and_fails_fast(self, client):
+        """Test consecutive connection errors open the circuit and skip Redis."""
+        client._breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        client._client.get = AsyncMock(side_effect=RedisConnectionError("down"))
+
+        assert await client.get("k") is None
+        assert await client.get("k") is None
+        assert client.circuit_state == "open"
+
+        assert await client.get("k") is None
+        assert client._client.get.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_circuit_half_open_recovers(self, client):
+        """Test the first successful call after the reset timeout closes the circuit."""
+        client._breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        client._client.get = AsyncMock(side_effect=[RedisConnectionError("down"), "v"])
+
+        assert await client.get("k") is None
+        assert client.circuit_state == "half_open"
+        assert await client.get("k") == "v"
+        assert client.circuit_state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_strict_distinguishes_missing_from_down(self, client):
+        """Test strict reads return None for missing keys but raise when Redis is down."""
+        client._client.get = AsyncMock(return_value=None)
+        assert await client.get("k", strict=True) is None
+
+        client._client.get = AsyncMock(side_effect=RedisTimeoutError("slow"))
+        with pytest.raises(RedisUnavailable):
+            await client.get("k", strict=True)
+
+    @pytest.mark.asyncio
+    async def test_check_session_raises_when_down(self):
+        """Test session checks never report "revoked" because Redis is down."""
+        with pytest.raises(RedisUnavailable):
+            await RedisClient().check_session("a", "user")
+
+    @pytest.mark.asyncio
+    async def test_mget(self, client):
+        """Test many keys are read in one round trip."""
+        client._client.mget = AsyncMock(return_value=["1", None])
+
+        assert await client.mget(["a", "b"]) == ["1", None]
+        assert await client.mget([]) == []
+        client._client.mget.assert_awaited_once_with(["a", "b"])
+
+    @pytest.mark.asyncio
+    async def test_mset_with_expiry_pipelines(self, client):
+        """Test expiring bulk writes are pipelined SET EX commands."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[True, True])
+        client._client.pipeline.return_value = pipe
+
+        assert await client.mset({"a": "1", "b": "2"}, expire=60) is True
+
+        client._client.pipeline.assert_called_once_with(transaction=False)
+        pipe.set.assert_any_call("a", "1", ex=60)
+        pipe.set.assert_any_call("b", "2", ex=60)
+        pipe.execute.assert_awaited_once()
@@ -0,0 +1,182 @@
+"""
+Unit Tests for Revocation Cache
+===============================
+Test local allow/deny caching of access token JTIs and pub/sub invalidation
+"""
+
+import json
+import time
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.services.revocation_cache import RevocationCache
+
+
+@pytest.fixture
+def cache():
+    """Create a listening revocation cache."""
+    cache = RevocationCache(max_entries=3, ttl_seconds=60, channel="test:revocations")
+    cache._listening = True
+    return cache
+
+
+@pytest.mark.unit
+class TestRevocationCache:
+    """Test revocation cache behaviour."""
+
+    def test_miss_then_hit(self, cache):
+        """Test stored Redis results are served from memory."""
+        jti = str(uuid.uuid4())
+
+        assert cache.lookup(jti) is None
+
+        cache.store(jti, True, time.time() + 900)
+        assert cache.lookup(jti) is True
+
+    def test_allow_not_served_when_not_listening(self, cache):
+        """Test allow entries are ignored while revocations could be missed."""
+        jti = str(uuid.uuid4())
+        cache.store(jti, True, time.time() + 900)
+
+        cache._listening = False
+        assert cache.lookup(jti) is None
+
+    def test_deny_served_when_not_listening(self, cache):
+        """Test deny entries are always served."""
+        jti = str(uuid.uuid4())
+        cache.store(jti, False, time.time() + 900)
+
+        cache._listening = False
+        assert cache.lookup(jti) is False
+
+    def test_store_never_outlives_token(self, cache):
+        """Test entries for expired tokens are not cached."""
+        jti = str(uuid.uuid4())
+        cache.store(jti, True, time.time() - 1)
+
+        assert cache.lookup(jti) is None
+
+    def test_entry_expires(self, cache):
+        """Test entries expire after their TTL."""
+        jti = str(uuid.uuid4())
+        cache.store(jti, True, time.time() + 900)
+
+        with patch(
+            "app.services.revocation_cache.time.monotonic", return_value=time.monotonic() + 61
+        ):
+            assert cache.lookup(jti) is None
+
+    def test_invalidate_overrides_allow(self, cache):
+        """Test explicit revocation turns an allow entry into a deny."""
+        jti = str(uuid.uuid4())
+        cache.store(jti, True, time.time() + 900)
+
+        cache.invalidate([jti])
+
+        assert cache.lookup(jti) is False
+
+    def test_allow_never_replaces_deny(self, cache):
+        """Test a late allow result cannot resurrect a revoked token."""
+        jti = str(uuid.uuid4())
+        cache.invalidate([jti])
+
+        cache.store(jti, True, time.time() + 900)
+
+        assert cache.lookup(jti) is False
+
+    def test_revocation_during_check_vetoes_it(self, cache):
+        """Test a broadcast arriving while a Redis check is in flight wins."""
+        jti = str(uuid.uuid4())
+        read = cache.begin_read(jti)
+
+        cache._handle_message(json.dumps({"jtis": [jti]}))
+        cache._entries.clear()  # e.g. evicted before the stale reply lands
+
+        assert cache.finish_read(jti, read, True, time.time() + 900) is False
+        assert cache.lookup(jti) is None
+        assert cache._pending == {}
+
+    def test_listener_lost_during_check_not_cached(self, cache):
+        """Test a check spanning a listener drop is returned but not cached."""
+        jti = str(uuid.uuid4())
+        read = cache.begin_read(jti)
+
+        cache._on_listener_lost()
+        cache._listening = True
+
+        assert cache.finish_read(jti, read, True, time.time() + 900) is True
+        assert cache.lookup(jti) is None
+
+    def test_lru_eviction(self, cache):
+        """Test the cache stays bounded."""
+        jtis = [str(uuid.uuid4()) for _ in range(4)]
+        for jti in jtis:
+            cache.store(jti, True, time.time() + 900)
+
+        assert len(cache._entries) == 3
+        assert cache.lookup(jtis[0]) is None
+        assert cache.lookup(jtis[3]) is True
+
+    def test_listener_lost_drops_allow_entries(self, cache):
+        """Test losing the subscription forgets allow entries only."""
+        allowed, denied = str(uuid.uuid4()), str(uuid.uuid4())
+        cache.store(allowed, True, time.time() + 900)
+        cache.invalidate([denied])
+
+        cache._on_listener_lost()
+        cache._listening = True
+
+        assert cache.lookup(allowed) is None
+        assert cache.lookup(denied) is False
+
+    def test_handle_pubsub_message(self, cache):
+        """Test revocation broadcasts invalidate local entries."""
+        jti = str(uuid.uuid4())
+        cache.store(jti, True, time.time() + 900)
+
+        cache._handle_message(json.dumps({"jtis": [jti]}))
+        cache._handle_message("not-json")
+
+        assert cache.lookup(jti) is False
+
+    @pytest.mark.asyncio
+    async def test_publish_revocation(self, cache):
+        """Test revocations are applied locally and broadcast."""
+        jti = uuid.uuid4()
+
+        with patch("app.services.revocation_cache.redis_client") as mock_redis:
+            mock_redis.publish = AsyncMock(return_value=2)
+            await cache.publish_revocation([jti])
+
+        mock_redis.publish.assert_called_once_with(
+            "test:revocations", json.dumps({"jtis": [str(jti)]})
+        )
+        assert cache.lookup(str(jti)) is False
+
+    def test_epoch_floor(self, cache):
+        """Test tokens older than a session epoch bump are superseded."""
+        user_id = str(uuid.uuid4())
+        assert cache.is_superseded(user_id, 0) is False
+
+        cache.advance_epochs({user_id: 2})
+        cache.advance_epochs({user_id: 1})
+
+        assert cache.is_superseded(user_id, 1) is True
+        assert cache.is_superseded(user_id, 2) is False
+
+    def test_handle_epoch_message(self, cache):
+        """Test epoch broadcasts are applied."""
+        user_id = str(uuid.uuid4())
+
+        cache._handle_message(json.dumps({"epochs": {user_id: 4}}))
+
+        assert cache.is_superseded(user_id, 3) is True
+
+    def test_disabled_cache(self):
+        """Test a disabled cache never answers."""
+        cache = RevocationCache(enabled=False)
+        jti = str(uuid.uuid4())
+        cache.invalidate([jti])
+
+        assert cache.lookup(jti) is None
@@ -0,0 +1,119 @@
+"""
+Unit Tests for Session Activity Tracking
+========================================
+Test the write-behind activity buffer and the idle timeout worker
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.services.activity_tracker import ActivityTracker
+from app.workers.session_activity_worker import SessionActivityWorker
+
+
+@pytest.fixture
+def mock_db():
+    """Patch the worker session factory."""
+    db = AsyncMock()
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=db)
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    with patch("app.workers.session_activity_worker.AsyncSessionLocal", factory):
+        yield db
+
+
+@pytest.mark.unit
+class TestActivityTracker:
+    """Test in-process activity buffer."""
+
+    @pytest.mark.asyncio
+    async def test_touches_coalesce(self):
+        """Test repeated touches of a session are flushed once."""
+        tracker = ActivityTracker(max_entries=10)
+        for _ in range(5):
+            tracker.touch("a")
+        tracker.touch("b")
+
+        with patch("app.services.activity_tracker.redis_client") as mock_redis:
+            mock_redis.record_session_activity = AsyncMock(return_value=True)
+            assert await tracker.flush() == 2
+            assert await tracker.flush() == 0
+
+        touches = mock_redis.record_session_activity.call_args.args[0]
+        assert set(touches) == {"a", "b"}
+        mock_redis.record_session_activity.assert_awaited_once()
+
+    def test_buffer_is_bounded(self):
+        """Test new sessions are dropped when the buffer is full."""
+        tracker = ActivityTracker(max_entries=2)
+        tracker.touch("a")
+        tracker.touch("b")
+        tracker.touch("c")
+        tracker.touch("a")
+
+        assert set(tracker._buffer) == {"a", "b"}
+
+    @pytest.mark.asyncio
+    async def test_flush_redis_unavailable(self):
+        """Test a failed flush does not grow the buffer."""
+        tracker = ActivityTracker(max_entries=10)
+        tracker.touch("a")
+
+        with patch("app.services.activity_tracker.redis_client") as mock_redis:
+            mock_redis.record_session_activity = AsyncMock(return_value=False)
+            assert await tracker.flush() == 0
+
+        assert tracker._buffer == {}
+
+
+@pytest.mark.unit
+class TestSessionActivityWorker:
+    """Test activity flush and idle revocation."""
+
+    @pytest.mark.asyncio
+    async def test_flush_activity_batches(self, mock_db):
+        """Test pending activity is written with one statement per batch."""
+        worker = SessionActivityWorker(interval=1, batch_size=2, idle_timeout_minutes=60)
+
+        with patch("app.workers.session_activity_worker.redis_client") as mock_redis:
+            mock_redis.pop_dirty_session_activity = AsyncMock(
+                side_effect=[[("a", 100.0), ("b", 200.0)], [("c", 300.0)]]
+            )
+            assert await worker.flush_activity() == 3
+
+        assert mock_db.execute.await_count == 2
+        params = mock_db.execute.call_args_list[0].args[1]
+        assert [p["b_jti"] for p in params] == ["a", "b"]
+        assert mock_db.commit.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_sweep_revokes_idle_sessions(self, mock_db):
+        """Test idle sessions are revoked by access JTI."""
+        worker = SessionActivityWorker(interval=1, batch_size=100, idle_timeout_minutes=60)
+
+        with (
+            patch("app.workers.session_activity_worker.redis_client") as mock_redis,
+            patch("app.workers.session_activity_worker.jwt_service") as mock_jwt,
+        ):
+            mock_redis.pop_idle_sessions = AsyncMock(return_value=["a", "b"])
+            mock_jwt.revoke_sessions_by_access_jti = AsyncMock(return_value=2)
+            assert await worker.sweep_idle_sessions() == 2
+
+        mock_jwt.revoke_sessions_by_access_jti.assert_awaited_once_with(
+            ["a", "b"], mock_db, reason="idle_timeout"
+        )
+
+    @pytest.mark.asyncio
+    async def test_sweep_disabled_only_forgets(self, mock_db):
+        """Test a disabled idle timeout only drops expired activity entries."""
+        worker = SessionActivityWorker(interval=1, batch_size=100, idle_timeout_minutes=0)
+
+        with (
+            patch("app.workers.session_activity_worker.redis_client") as mock_redis,
+            patch("app.workers.session_activity_worker.jwt_service") as mock_jwt,
+        ):
+            mock_redis.pop_idle_sessions = AsyncMock(return_value=["a"])
+            mock_jwt.revoke_sessions_by_access_jti = AsyncMock()
+            assert await worker.sweep_idle_sessions() == 0
+
+        mock_jwt.revoke_sessions_by_access_jti.assert_not_awaited()
@@ -0,0 +1,163 @@
+"""
+Unit Tests for Asymmetric JWT Signing
+=====================================
+Test keyring rotation, JWKS publication and local verification
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.core.signing_keys import SigningKeyStore, generate_private_key
+from jose import JWTError, jwt
+from utils.jwt_verifier import JWKSVerifier
+
+
+@pytest.fixture(scope="module")
+def private_keys():
+    """Generate two RSA keys (old and new)."""
+    return {"old": generate_private_key("RS256"), "new": generate_private_key("RS256")}
+
+
+@pytest.fixture
+def key_store(private_keys):
+    """Create keyring signing with the new key."""
+    store = SigningKeyStore("RS256")
+    store.load(private_keys, active_kid="new")
+    return store
+
+
+def _payload(token_type: str = "access") -> dict:
+    return {
+        "sub": str(uuid.uuid4()),
+        "jti": str(uuid.uuid4()),
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=15),
+        "type": token_type,
+    }
+
+
+@pytest.mark.unit
+class TestSigningKeyStore:
+    """Test signing keyring."""
+
+    def test_encode_sets_kid(self, key_store):
+        """Test tokens carry the active key ID."""
+        token = key_store.encode(_payload())
+
+        assert jwt.get_unverified_header(token)["kid"] == "new"
+        assert key_store.decode(token)["type"] == "access"
+
+    def test_rotation_keeps_old_tokens_valid(self, private_keys):
+        """Test tokens signed before a rotation still verify."""
+        store = SigningKeyStore("RS256")
+        store.load(private_keys, active_kid="old")
+        token = store.encode(_payload())
+
+        store.load(private_keys, active_kid="new")
+
+        assert store.decode(token)["type"] == "access"
+        assert jwt.get_unverified_header(store.encode(_payload()))["kid"] == "new"
+
+    def test_unknown_kid_rejected(self, key_store):
+        """Test tokens signed by a key outside the ring are rejected."""
+        stranger = SigningKeyStore("RS256")
+        stranger.load({"other": generate_private_key("RS256")})
+
+        with pytest.raises(JWTError):
+            key_store.decode(stranger.encode(_payload()))
+
+    def test_jwks_contains_only_public_material(self, key_store):
+        """Test JWKS publishes every key without private parameters."""
+        keys = key_store.jwks()["keys"]
+
+        assert {key["kid"] for key in keys} == {"old", "new"}
+        for key in keys:
+            assert key["kty"] == "RSA"
+            assert key["use"] == "sig"
+            assert "d" not in key
+
+    def test_invalid_configuration(self, private_keys):
+        """Test misconfigured keyrings are refused."""
+        with pytest.raises(ValueError):
+            SigningKeyStore("RS256").load({})
+        with pytest.raises(ValueError):
+            SigningKeyStore("RS256").load(private_keys, active_kid="missing")
+        with pytest.raises(ValueError):
+            SigningKeyStore("HS256").load(private_keys)
+
+    @pytest.mark.parametrize("environment", ["staging", "production"])
+    def test_missing_keys_fail_fast_outside_dev(self, environment):
+        """Test no ephemeral key is generated outside development and test."""
+        with patch("app.core.signing_keys.settings") as mock_settings:
+            mock_settings.JWT_SIGNING_KEYS = {}
+            mock_settings.ENVIRONMENT = environment
+
+            with pytest.raises(ValueError):
+                SigningKeyStore("RS256").active_kid
+
+    def test_missing_keys_ephemeral_in_development(self):
+        """Test development signs with a generated key when Vault has none."""
+        with patch("app.core.signing_keys.settings") as mock_settings:
+            mock_settings.JWT_SIGNING_KEYS = {}
+            mock_settings.JWT_ACTIVE_KID = None
+            mock_settings.ENVIRONMENT = "development"
+            store = SigningKeyStore("RS256")
+
+            assert store.decode(store.encode(_payload()))["type"] == "access"
+
+    def test_ec_keys(self):
+        """Test ES256 keyrings."""
+        store = SigningKeyStore("ES256")
+        store.load({"ec": generate_private_key("ES256")})
+
+        assert store.decode(store.encode(_payload()))["type"] == "access"
+        assert store.jwks()["keys"][0]["kty"] == "EC"
+
+
+@pytest.mark.unit
+class TestJWKSVerifier:
+    """Test shared local verifier."""
+
+    @pytest.mark.asyncio
+    async def test_verify_locally(self, key_store):
+        """Test verifier validates tokens with a single JWKS fetch."""
+        verifier = JWKSVerifier(jwks_url="http://auth/jwks")
+
+        with patch.object(
+            verifier, "_fetch_jwks", AsyncMock(return_value=key_store.jwks())
+        ) as fetch:
+            for _ in range(3):
+                payload = await verifier.verify(key_store.encode(_payload()))
+                assert payload["type"] == "access"
+
+        assert fetch.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_forces_refresh(self, private_keys):
+        """Test a rotated-in key triggers one JWKS refresh."""
+        store = SigningKeyStore("RS256")
+        store.load({"old": private_keys["old"]})
+        verifier = JWKSVerifier(jwks_url="http://auth/jwks", min_refresh_interval=0)
+
+        fetch = AsyncMock(return_value=store.jwks())
+        with patch.object(verifier, "_fetch_jwks", fetch):
+            await verifier.verify(store.encode(_payload()))
+
+            store.load(private_keys, active_kid="new")
+            fetch.return_value = store.jwks()
+            payload = await verifier.verify(store.encode(_payload()))
+
+        assert payload["type"] == "access"
+        assert fetch.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_rejects_wrong_type_and_algorithm(self, key_store):
+        """Test refresh tokens and HMAC tokens are rejected."""
+        verifier = JWKSVerifier(jwks_url="http://auth/jwks")
+
+        with patch.object(verifier, "_fetch_jwks", AsyncMock(return_value=key_store.jwks())):
+            with pytest.raises(JWTError):
+                await verifier.verify(key_store.encode(_payload("refresh")))
+            with pytest.raises(JWTError):
+                await verifier.verify(jwt.encode(_payload(), "secret", algorithm="HS256"))
@@ -0,0 +1,53 @@
+"""
+Unit Tests for User Search
+==========================
+Test exact-match fast paths and ranked trigram search
+"""
+
+import pytest
+from app.services.user_search import build_user_search, escape_like
+from sqlalchemy.dialects import postgresql
+
+
+def _sql(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.unit
+class TestUserSearch:
+    """Test search term classification."""
+
+    def test_email_exact(self):
+        """Test email addresses use the lower(email) index."""
+        search = build_user_search("  Mario.Rossi@Example.com ")
+
+        assert search.exact is True
+        assert _sql(search.condition) == "lower(users.email) = %(lower_1)s"
+        assert search.condition.right.value == "mario.rossi@example.com"
+
+    def test_tax_code_exact(self):
+        """Test tax codes use the upper(tax_code) index in any case."""
+        search = build_user_search("rssmra85t10a562s")
+
+        assert search.exact is True
+        assert _sql(search.condition) == "upper(users.tax_code) = %(upper_1)s"
+        assert search.condition.right.value == "RSSMRA85T10A562S"
+
+    def test_free_text_ranked(self):
+        """Test other terms match professional_id or trigram columns, ranked."""
+        search = build_user_search("rossi")
+
+        assert search.exact is False
+        condition = _sql(search.condition)
+        assert "users.professional_id = " in condition
+        for column in ("email", "full_name", "company_name"):
+            assert f"users.{column} ILIKE" in condition
+        assert "similarity(users.full_name" in _sql(search.rank)
+
+    def test_wildcards_escaped(self):
+        """Test LIKE wildcards in the term match literally."""
+        assert escape_like("50%_off\\") == "50\\%\\_off\\\\"
+        search = build_user_search("a_b")
+        params = search.condition.compile(dialect=postgresql.dialect()).params
+
+        assert "%a\\_b%" in params.values()
@@ -0,0 +1,189 @@
+"""
+Unit Tests for Vault Secret Caching
+===================================
+Test prefetching, stale-while-revalidate, path-level caching and batch transit
+"""
+
+import base64
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from utils.vault_client import AsyncTransitClient, AsyncVaultClient, VaultClient
+
+
+@pytest.fixture
+def cache():
+    """Create async Vault cache with a stubbed fetch."""
+    cache = AsyncVaultClient(paths=["auth-service", "shared"], vault_token="t", cache_ttl=60)
+    cache._fetch = AsyncMock(
+        side_effect=lambda path: {"auth-service": {"a": "1"}, "shared": {"a": "x", "b": "2"}}[path]
+    )
+    return cache
+
+
+@pytest.mark.unit
+class TestAsyncVaultClient:
+    """Test async secret cache."""
+
+    @pytest.mark.asyncio
+    async def test_prefetch_then_memory_only(self, cache):
+        """Test each path is fetched once and lookups follow path order."""
+        await cache.prefetch()
+
+        assert cache.is_loaded
+        assert cache.get("a") == "1"
+        assert cache.get("b") == "2"
+        assert cache.get("missing", "d") == "d"
+        assert cache._fetch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_and_refresh_scheduled(self, cache):
+        """Test expired paths keep answering while a refresh is requested."""
+        await cache.prefetch()
+        cache._fetched_at["shared"] -= 120
+        cache._refresh_at["shared"] = time.monotonic() + 1000
+
+        assert cache.get("b") == "2"
+        assert cache._refresh_at["shared"] <= time.monotonic()
+        assert cache._wakeup.is_set()
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_value_with_backoff(self, cache):
+        """Test Vault outages keep the last value and back off retries."""
+        await cache.prefetch()
+        cache._fetch = AsyncMock(side_effect=RuntimeError("sealed"))
+
+        assert await cache.refresh("shared") is False
+        first_retry = cache._refresh_at["shared"] - time.monotonic()
+        assert await cache.refresh("shared") is False
+        second_retry = cache._refresh_at["shared"] - time.monotonic()
+
+        assert cache.get("b") == "2"
+        assert second_retry > first_retry
+
+    @pytest.mark.asyncio
+    async def test_forbidden_path_counts_as_loaded(self):
+        """Test a path the token may not read is empty instead of retried forever."""
+        bodies = {
+            "auth-service": (200, {"data": {"data": {"a": "1"}}}),
+            "shared": (403, {"errors": ["permission denied"]}),
+        }
+
+        async def get(url):
+            status, body = bodies[url.rsplit("/", 1)[1]]
+            return httpx.Response(status, json=body, request=httpx.Request("GET", url))
+
+        cache = AsyncVaultClient(paths=["auth-service", "shared"], vault_token="t")
+        cache._http = MagicMock()
+        cache._http.get = get
+
+        await cache.prefetch()
+
+        assert cache.is_loaded
+        assert cache.get("a") == "1"
+        assert "shared" not in cache._failures
+
+    @pytest.mark.asyncio
+    async def test_jittered_refresh_before_expiry(self, cache):
+        """Test refreshes are scheduled within the jitter window before the TTL."""
+        for _ in range(20):
+            await cache.refresh("shared")
+            delay = cache._refresh_at["shared"] - cache._fetched_at["shared"]
+            assert cache.cache_ttl * (1 - cache.jitter) <= delay <= cache.cache_ttl
+
+
+@pytest.mark.unit
+class TestVaultClientCache:
+    """Test synchronous client path cache."""
+
+    def test_get_secrets_reads_each_path_once(self):
+        """Test many keys cost at most one read per path until the TTL expires."""
+        with patch("utils.vault_client.hvac.Client") as client_class:
+            hvac_client = MagicMock()
+            hvac_client.is_authenticated.return_value = True
+            hvac_client.secrets.kv.v2.read_secret_version.side_effect = lambda path, **_: {
+                "data": {"data": {"auth-service": {"a": "1"}, "shared": {"b": "2"}}[path]}
+            }
+            client_class.return_value = hvac_client
+            vault = VaultClient(vault_path="secret/data/auth-service", cache_ttl=60)
+
+        assert vault.get_secrets(["a", "b", "a", "b"]) == {"a": "1", "b": "2"}
+        assert hvac_client.secrets.kv.v2.read_secret_version.call_count == 2
+
+        vault.clear_cache()
+        vault.get_secret("a")
+        assert hvac_client.secrets.kv.v2.read_secret_version.call_count == 3
+
+
+def _transit_handler(requests):
+    """Fake transit batch endpoint ("bad" items fail individually)."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        batch = json.loads(request.content)["batch_input"]
+        requests.append(len(batch))
+        results = []
+        for item in batch:
+            if "ciphertext" in item:
+                if item["ciphertext"] == "bad":
+                    results.append({"error": "invalid ciphertext"})
+                else:
+                    results.append({"plaintext": item["ciphertext"].removeprefix("vault:v1:")})
+            else:
+                results.append({"ciphertext": f"vault:v1:{item['plaintext']}"})
+        status = 400 if any("error" in r for r in results) else 200
+        return httpx.Response(status, json={"data": {"batch_results": results}})
+
+    return handler
+
+
+@pytest.mark.unit
+class TestAsyncTransitClient:
+    """Test batch transit operations."""
+
+    @pytest.mark.asyncio
+    async def test_round_trip_in_chunks_and_order(self):
+        """Test values are chunked, results keep input order."""
+        requests = []
+        client = AsyncTransitClient(
+            vault_token="t", batch_size=4, transport=httpx.MockTransport(_transit_handler(requests))
+        )
+        values = [f"field {i}" for i in range(10)]
+
+        encrypted = await client.encrypt_many(values)
+        decrypted = await client.decrypt_many([result.value for result in encrypted])
+        await client.close()
+
+        assert [result.value for result in decrypted] == values
+        assert sorted(requests) == [2, 2, 4, 4, 4, 4]
+
+    @pytest.mark.asyncio
+    async def test_per_item_errors(self):
+        """Test one bad ciphertext does not fail its chunk."""
+        client = AsyncTransitClient(
+            vault_token="t", transport=httpx.MockTransport(_transit_handler([]))
+        )
+        good = "vault:v1:" + base64.b64encode(b"ok").decode()
+
+        results = await client.decrypt_many([good, "bad", good])
+        await client.close()
+
+        assert [result.ok for result in results] == [True, False, True]
+        assert results[1].error == "invalid ciphertext"
+        assert results[2].value == "ok"
+
+    @pytest.mark.asyncio
+    async def test_chunk_failure_maps_to_items(self):
+        """Test a failed request reports an error for each of its items."""
+
+        def handler(request):
+            return httpx.Response(403, json={"errors": ["permission denied"]})
+
+        client = AsyncTransitClient(vault_token="t", transport=httpx.MockTransport(handler))
+
+        results = await client.encrypt_many(["a", "b"])
+        await client.close()
+
+        assert [result.error for result in results] == ["permission denied"] * 2
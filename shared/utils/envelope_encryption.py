@@ -0,0 +1,401 @@
+"""
+Envelope Encryption for RefertoSicuro v2
+========================================
+Local AES-GCM encryption of sensitive payloads (medical reports) with data
+keys generated and wrapped by Vault transit
+"""
+
+import asyncio
+import base64
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+try:
+    from prometheus_client import Counter
+except ImportError:  # metrics are optional for services without prometheus-client
+    Counter = None
+
+logger = logging.getLogger(__name__)
+
+# env:v1:<base64 wrapped DEK>:<base64 nonce + ciphertext + tag>
+ENVELOPE_PREFIX = "env:v1:"
+NONCE_BYTES = 12
+WRAPPED_VERSION = re.compile(r"^vault:v(\d+):")
+
+if Counter is not None:
+    envelope_datakeys_total = Counter(
+        "vault_envelope_datakeys_total",
+        "Data keys generated through Vault transit",
+        ["key"],
+    )
+    envelope_dek_cache_total = Counter(
+        "vault_envelope_dek_cache_total",
+        "Unwrapped data key lookups for decryption",
+        ["key", "result"],  # result: hit, miss
+    )
+    envelope_rewraps_total = Counter(
+        "vault_envelope_rewraps_total",
+        "Envelopes re-wrapped to the latest transit key version",
+        ["key"],
+    )
+else:
+    envelope_datakeys_total = None
+    envelope_dek_cache_total = None
+    envelope_rewraps_total = None
+
+
+class EnvelopeError(Exception):
+    """Envelope is malformed or cannot be decrypted."""
+
+
+@dataclass
+class DataKey:
+    """Unwrapped data encryption key and its Vault-wrapped form."""
+
+    plaintext: bytes
+    wrapped: str
+    created_at: float
+    uses: int = 0
+
+    @property
+    def version(self) -> int:
+        """Transit key version that wrapped this DEK."""
+        return wrapped_key_version(self.wrapped)
+
+
+def wrapped_key_version(wrapped: str) -> int:
+    """
+    Get the transit key version of a Vault ciphertext.
+
+    Args:
+        wrapped: Vault ciphertext (`vault:vN:...`)
+
+    Returns:
+        Key version
+
+    Raises:
+        EnvelopeError: If the ciphertext is not a Vault ciphertext
+    """
+    match = WRAPPED_VERSION.match(wrapped)
+    if not match:
+        raise EnvelopeError("Wrapped data key is not a Vault ciphertext")
+    return int(match.group(1))
+
+
+class EnvelopeEncryptor:
+    """
+    Envelope encryption with cached data keys.
+
+    - Encryption uses one current DEK from `transit/datakey/plaintext`,
+      replaced after `max_key_uses` encryptions or `max_key_age` seconds
+    - Each envelope stores its wrapped DEK; unwrapped DEKs for decryption are
+      kept in a bounded LRU for `max_key_age` seconds, so Vault sees one
+      `transit/decrypt` per DEK instead of one call per value
+    - Payloads are encrypted locally with AES-256-GCM; optional associated
+      data (e.g. "report:<id>:input_text") binds a ciphertext to its field
+    - After `rotate_key`, envelopes wrapped by older key versions are
+      reported by `needs_rewrap` and fixed with `rewrap`, which re-wraps
+      only the DEK (`transit/rewrap`) without touching the payload
+    """
+
+    def __init__(
+        self,
+        key_name: str = "personal-data",
+        vault_addr: Optional[str] = None,
+        vault_token: Optional[str] = None,
+        max_key_uses: int = 100_000,
+        max_key_age: float = 300.0,
+        max_cached_keys: int = 1024,
+        timeout: float = 5.0,
+    ):
+        """
+        Initialize envelope encryptor.
+
+        Args:
+            key_name: Transit key wrapping the data keys
+            vault_addr: Vault server address
+            vault_token: Authentication token
+            max_key_uses: Encryptions per data key (well below the 2^32 random nonce limit)
+            max_key_age: Seconds a data key is used or kept unwrapped in memory
+            max_cached_keys: Unwrapped data keys kept for decryption
+            timeout: HTTP timeout for Vault requests
+        """
+        self.key_name = key_name
+        vault_addr = vault_addr or os.getenv("VAULT_ADDR", "http://localhost:8200")
+        self.vault_addr = vault_addr.rstrip("/")
+        self.vault_token = vault_token or os.getenv("VAULT_TOKEN")
+        self.max_key_uses = max_key_uses
+        self.max_key_age = max_key_age
+        self.max_cached_keys = max_cached_keys
+        self.timeout = timeout
+
+        self._current: Optional[DataKey] = None
+        self._current_lock = asyncio.Lock()
+        # wrapped DEK -> (plaintext DEK, monotonic expiry)
+        self._unwrapped: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._unwrapping: Dict[str, asyncio.Future] = {}
+        self._latest_version: Optional[int] = None
+        self._http: Optional[httpx.AsyncClient] = None
+
+    async def close(self) -> None:
+        """Close the HTTP client and forget every data key."""
+        self._current = None
+        self._unwrapped.clear()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def encrypt(self, plaintext: str, context: Optional[str] = None) -> str:
+        """
+        Encrypt a value locally with the current data key.
+
+        Args:
+            plaintext: Value to encrypt
+            context: Associated data that must be supplied again to decrypt
+
+        Returns:
+            Envelope string
+        """
+        key = await self._data_key()
+        nonce = os.urandom(NONCE_BYTES)
+        ciphertext = AESGCM(key.plaintext).encrypt(nonce, plaintext.encode(), _aad(context))
+        return self._pack(key.wrapped, nonce + ciphertext)
+
+    async def decrypt(self, envelope: str, context: Optional[str] = None) -> str:
+        """
+        Decrypt an envelope (one Vault call per data key not in memory).
+
+        Args:
+            envelope: Envelope string from `encrypt`
+            context: Associated data used at encryption
+
+        Returns:
+            Decrypted value
+
+        Raises:
+            EnvelopeError: If the envelope is malformed or fails authentication
+        """
+        wrapped, payload = self._unpack(envelope)
+        key = await self._unwrap(wrapped)
+        try:
+            plaintext = AESGCM(key).decrypt(
+                payload[:NONCE_BYTES], payload[NONCE_BYTES:], _aad(context)
+            )
+        except Exception as e:
+            raise EnvelopeError("Envelope authentication failed") from e
+        return plaintext.decode()
+
+    async def needs_rewrap(self, envelope: str) -> bool:
+        """
+        Check whether an envelope's data key was wrapped by an older key version.
+
+        Args:
+            envelope: Envelope string
+
+        Returns:
+            True if `rewrap` should be applied (and the result stored)
+        """
+        wrapped, _ = self._unpack(envelope)
+        return wrapped_key_version(wrapped) < await self.latest_version()
+
+    async def rewrap(self, envelope: str) -> str:
+        """
+        Re-wrap an envelope's data key with the latest key version.
+
+        The payload is left untouched; only the wrapped DEK changes.
+
+        Args:
+            envelope: Envelope string
+
+        Returns:
+            Envelope with the re-wrapped data key
+        """
+        wrapped, payload = self._unpack(envelope)
+        response = await self._transit(f"rewrap/{self.key_name}", {"ciphertext": wrapped})
+        rewrapped = response["ciphertext"]
+
+        # The DEK itself is unchanged, keep it unwrapped under the new name
+        cached = self._unwrapped.get(wrapped)
+        if cached is not None:
+            self._remember(rewrapped, cached[0])
+        if envelope_rewraps_total is not None:
+            envelope_rewraps_total.labels(key=self.key_name).inc()
+        return self._pack(rewrapped, payload)
+
+    async def latest_version(self, refresh: bool = False) -> int:
+        """
+        Get the latest version of the transit key.
+
+        Args:
+            refresh: Re-read it from Vault
+
+        Returns:
+            Latest key version
+        """
+        if self._latest_version is None or refresh:
+            response = await self._request("GET", f"/v1/transit/keys/{self.key_name}")
+            self._latest_version = int(response["latest_version"])
+        return self._latest_version
+
+    async def rotate_key(self) -> int:
+        """
+        Rotate the transit key; new data keys are wrapped by the new version.
+
+        Existing envelopes stay readable and are re-wrapped lazily.
+
+        Returns:
+            New latest key version
+        """
+        await self._request("POST", f"/v1/transit/keys/{self.key_name}/rotate")
+        async with self._current_lock:
+            self._current = None
+        version = await self.latest_version(refresh=True)
+        logger.info(f"Rotated transit key {self.key_name} to version {version}")
+        return version
+
+    async def _data_key(self) -> DataKey:
+        """Get the current data key, generating a new one when exhausted."""
+        async with self._current_lock:
+            key = self._current
+            if (
+                key is None
+                or key.uses >= self.max_key_uses
+                or time.monotonic() - key.created_at >= self.max_key_age
+            ):
+                response = await self._transit(f"datakey/plaintext/{self.key_name}", {"bits": 256})
+                key = DataKey(
+                    plaintext=base64.b64decode(response["plaintext"]),
+                    wrapped=response["ciphertext"],
+                    created_at=time.monotonic(),
+                )
+                self._current = key
+                self._remember(key.wrapped, key.plaintext)
+                if self._latest_version is None or key.version > self._latest_version:
+                    self._latest_version = key.version
+                if envelope_datakeys_total is not None:
+                    envelope_datakeys_total.labels(key=self.key_name).inc()
+            key.uses += 1
+            return key
+
+    async def _unwrap(self, wrapped: str) -> bytes:
+        """Get the plaintext of a wrapped data key, from memory if possible."""
+        cached = self._unwrapped.get(wrapped)
+        if cached is not None and cached[1] > time.monotonic():
+            self._unwrapped.move_to_end(wrapped)
+            self._count_lookup("hit")
+            return cached[0]
+        self._count_lookup("miss")
+
+        # Concurrent decryptions under the same data key share one Vault call
+        pending = self._unwrapping.get(wrapped)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The owner was cancelled before Vault answered; unwrap ourselves
+                return await self._unwrap(wrapped)
+
+        future = asyncio.get_running_loop().create_future()
+        self._unwrapping[wrapped] = future
+        try:
+            response = await self._transit(f"decrypt/{self.key_name}", {"ciphertext": wrapped})
+            key = base64.b64decode(response["plaintext"])
+            self._remember(wrapped, key)
+            future.set_result(key)
+            return key
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve it so an unawaited future does not log a warning
+            future.exception()
+            raise
+        finally:
+            # Never leave waiters on an unresolved future (e.g. owner cancelled)
+            if not future.done():
+                future.cancel()
+            del self._unwrapping[wrapped]
+
+    def _remember(self, wrapped: str, key: bytes) -> None:
+        """Keep an unwrapped data key, evicting the least recently used ones."""
+        self._unwrapped[wrapped] = (key, time.monotonic() + self.max_key_age)
+        self._unwrapped.move_to_end(wrapped)
+        while len(self._unwrapped) > self.max_cached_keys:
+            self._unwrapped.popitem(last=False)
+
+    def _count_lookup(self, result: str) -> None:
+        """Count a data key cache lookup."""
+        if envelope_dek_cache_total is not None:
+            envelope_dek_cache_total.labels(key=self.key_name, result=result).inc()
+
+    async def _transit(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST to a transit endpoint and return its `data`."""
+        return await self._request("POST", f"/v1/transit/{endpoint}", payload)
+
+    async def _request(
+        self, method: str, url: str, payload: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Call the Vault HTTP API and return the response `data`."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.vault_addr,
+                headers={"X-Vault-Token": self.vault_token or ""},
+                timeout=self.timeout,
+            )
+        response = await self._http.request(method, url, json=payload)
+        response.raise_for_status()
+        if response.status_code == 204:
+            return {}
+        return response.json().get("data", {})
+
+    @staticmethod
+    def _pack(wrapped: str, payload: bytes) -> str:
+        """Serialize an envelope."""
+        return (
+            ENVELOPE_PREFIX
+            + base64.urlsafe_b64encode(wrapped.encode()).decode()
+            + ":"
+            + base64.urlsafe_b64encode(payload).decode()
+        )
+
+    @staticmethod
+    def _unpack(envelope: str) -> Tuple[str, bytes]:
+        """Parse an envelope into its wrapped data key and payload."""
+        if not envelope.startswith(ENVELOPE_PREFIX):
+            raise EnvelopeError("Not an envelope")
+        try:
+            wrapped, payload = envelope[len(ENVELOPE_PREFIX) :].split(":")
+            wrapped = base64.urlsafe_b64decode(wrapped).decode()
+            payload = base64.urlsafe_b64decode(payload)
+        except ValueError as e:
+            raise EnvelopeError("Malformed envelope") from e
+        if len(payload) <= NONCE_BYTES:
+            raise EnvelopeError("Malformed envelope")
+        return wrapped, payload
+
+
+def _aad(context: Optional[str]) -> Optional[bytes]:
+    """Associated data for AES-GCM."""
+    return context.encode() if context is not None else None
+
+
+# Example usage for report fields:
+"""
+from utils.envelope_encryption import EnvelopeEncryptor
+
+encryptor = EnvelopeEncryptor(key_name="reports")
+
+report.input_text = await encryptor.encrypt(text, context=f"report:{report.id}:input_text")
+
+text = await encryptor.decrypt(report.input_text, context=f"report:{report.id}:input_text")
+if await encryptor.needs_rewrap(report.input_text):
+    report.input_text = await encryptor.rewrap(report.input_text)
+"""
@@ -0,0 +1,174 @@
+"""
+JWT Verifier for RefertoSicuro v2
+=================================
+Local verification of Auth Service tokens against its published JWKS
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+from jose import JWTError, jwt
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSVerifier:
+    """
+    Verifies Auth Service JWTs locally using a cached JWKS.
+
+    The key set is fetched once and refreshed after `cache_ttl` seconds, or
+    immediately when a token references an unknown `kid` (key rotation).
+    Forced refreshes are throttled by `min_refresh_interval` so tokens with
+    bogus key IDs cannot be used to hammer the Auth Service. If a refresh
+    fails, the previously cached keys keep being used.
+
+    Note: local verification checks signature, expiry and token type only.
+    Revocation (logout) is enforced by the Auth Service within the access
+    token lifetime.
+    """
+
+    def __init__(
+        self,
+        jwks_url: Optional[str] = None,
+        algorithms: Optional[List[str]] = None,
+        cache_ttl: int = 300,
+        min_refresh_interval: int = 30,
+        timeout: float = 5.0,
+    ):
+        """
+        Initialize JWKS verifier.
+
+        Args:
+            jwks_url: Auth Service JWKS endpoint
+            algorithms: Accepted signing algorithms
+            cache_ttl: Seconds before the key set is refreshed
+            min_refresh_interval: Minimum seconds between forced refreshes
+            timeout: HTTP timeout for JWKS fetches
+        """
+        self.jwks_url = jwks_url or os.getenv(
+            "AUTH_JWKS_URL", "http://auth-service:8010/.well-known/jwks.json"
+        )
+        self.algorithms = algorithms or ["RS256", "ES256"]
+        self.cache_ttl = cache_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _fetch_jwks(self) -> Dict[str, Any]:
+        """Download the key set from the Auth Service."""
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.get(self.jwks_url)
+            response.raise_for_status()
+            return response.json()
+
+    async def refresh(self, force: bool = False) -> None:
+        """
+        Refresh the cached key set if stale.
+
+        Args:
+            force: Refresh even if the cache is fresh (rate limited)
+        """
+        async with self._lock:
+            age = time.monotonic() - self._fetched_at
+            if self._keys and age < (self.min_refresh_interval if force else self.cache_ttl):
+                return
+            if not self._keys and self._fetched_at and age < self.min_refresh_interval:
+                raise JWTError("Signing keys unavailable")
+
+            try:
+                jwks = await self._fetch_jwks()
+                self._keys = {key["kid"]: key for key in jwks.get("keys", []) if "kid" in key}
+                logger.debug(f"JWKS refreshed ({len(self._keys)} keys)")
+            except Exception as e:
+                logger.error(f"Failed to refresh JWKS from {self.jwks_url}: {e}")
+                if not self._keys:
+                    raise JWTError("Signing keys unavailable") from e
+            finally:
+                self._fetched_at = time.monotonic()
+
+    async def get_key(self, kid: Optional[str]) -> Dict[str, Any]:
+        """
+        Get the public key for a key ID.
+
+        Args:
+            kid: Key ID from the token header
+
+        Returns:
+            Public JWK
+
+        Raises:
+            JWTError: If the key is unknown
+        """
+        await self.refresh()
+        if kid not in self._keys:
+            await self.refresh(force=True)
+        if kid not in self._keys:
+            raise JWTError(f"Unknown signing key: {kid}")
+        return self._keys[kid]
+
+    async def verify(self, token: str, token_type: str = "access") -> Dict[str, Any]:
+        """
+        Verify a token locally.
+
+        Args:
+            token: Encoded JWT
+            token_type: Expected `type` claim
+
+        Returns:
+            Token claims
+
+        Raises:
+            JWTError: If the token is invalid, expired or of the wrong type
+        """
+        header = jwt.get_unverified_header(token)
+        if header.get("alg") not in self.algorithms:
+            raise JWTError(f"Algorithm not allowed: {header.get('alg')}")
+
+        key = await self.get_key(header.get("kid"))
+        payload = jwt.decode(token, key, algorithms=self.algorithms)
+
+        if payload.get("type") != token_type:
+            raise JWTError(f"Invalid token type: {payload.get('type')}")
+
+        return payload
+
+
+# Singleton instance for easy import
+_jwt_verifier: Optional[JWKSVerifier] = None
+
+
+def get_jwt_verifier() -> JWKSVerifier:
+    """
+    Get the process-wide JWKS verifier.
+
+    Returns:
+        JWKSVerifier instance
+    """
+    global _jwt_verifier
+    if _jwt_verifier is None:
+        _jwt_verifier = JWKSVerifier()
+    return _jwt_verifier
+
+
+# Example usage in a FastAPI service:
+"""
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError
+from utils.jwt_verifier import get_jwt_verifier
+
+bearer = HTTPBearer()
+
+async def get_token_payload(credentials: HTTPAuthorizationCredentials = Depends(bearer)):
+    try:
+        return await get_jwt_verifier().verify(credentials.credentials)
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+"""
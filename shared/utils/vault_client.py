@@ -4,15 +4,47 @@ HashiCorp Vault Client for RefertoSicuro v2
 Secure secret management for compliance
 """
 
+import asyncio
+import base64
 import os
 import logging
-from typing import Any, Dict, Optional
-from functools import lru_cache
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import httpx
 import hvac
 from hvac.exceptions import InvalidPath, Forbidden, VaultError
 
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:  # metrics are optional for services without prometheus-client
+    Counter = Gauge = Histogram = None
+
 logger = logging.getLogger(__name__)
 
+if Gauge is not None:
+    vault_secret_cache_age_seconds = Gauge(
+        "vault_secret_cache_age_seconds",
+        "Seconds since a Vault secret path was last fetched",
+        ["path"],
+    )
+    vault_refresh_duration_seconds = Histogram(
+        "vault_refresh_duration_seconds",
+        "Vault secret path fetch latency",
+        ["path"],
+        buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0],
+    )
+    vault_refresh_failures_total = Counter(
+        "vault_refresh_failures_total",
+        "Failed Vault secret path fetches (stale values kept)",
+        ["path"],
+    )
+else:
+    vault_secret_cache_age_seconds = None
+    vault_refresh_duration_seconds = None
+    vault_refresh_failures_total = None
+
 
 class VaultClient:
     """
@@ -41,6 +73,9 @@ class VaultClient:
         self.vault_path = vault_path or os.getenv("VAULT_PATH", "secret/data/shared")
         self.cache_ttl = cache_ttl
 
+        # KV path -> (secrets, monotonic expiry)
+        self._path_cache: Dict[str, Tuple[Dict[str, Any], float]] = {}
+
         # Initialize client
         self.client = hvac.Client(url=self.vault_addr, token=self.vault_token)
 
@@ -62,7 +97,33 @@ class VaultClient:
             logger.error(f"Vault connection error: {e}")
             return False
 
-    @lru_cache(maxsize=128)
+    def _read_path(self, path: str) -> Dict[str, Any]:
+        """
+        Read a whole KV v2 path, cached for `cache_ttl` seconds.
+
+        Args:
+            path: Path below the `secret` mount
+
+        Returns:
+            Secrets at the path (empty if missing)
+        """
+        cached = self._path_cache.get(path)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        try:
+            response = self.client.secrets.kv.v2.read_secret_version(
+                path=path,
+                mount_point="secret",
+            )
+            secrets = response.get("data", {}).get("data", {})
+        except (InvalidPath, Forbidden):
+            logger.warning(f"Secret path not found in Vault: {path}")
+            secrets = {}
+
+        self._path_cache[path] = (secrets, time.monotonic() + self.cache_ttl)
+        return secrets
+
     def get_secret(self, key: str, default: Optional[str] = None) -> Optional[str]:
         """
         Get a secret value from Vault or environment.
@@ -74,53 +135,21 @@ class VaultClient:
         Returns:
             Secret value or default
         """
-        # Try Vault first
+        # Try Vault first (service-specific path, then shared secrets)
         if self.client:
             try:
-                # Get from service-specific path
-                response = self.client.secrets.kv.v2.read_secret_version(
-                    path=self.vault_path.replace("secret/data/", ""),
-                    mount_point="secret",
-                )
-                secrets = response.get("data", {}).get("data", {})
-
-                if key in secrets:
-                    return secrets[key]
-
-                # Try shared secrets
-                shared_response = self.client.secrets.kv.v2.read_secret_version(
-                    path="shared",
-                    mount_point="secret",
-                )
-                shared_secrets = shared_response.get("data", {}).get("data", {})
-
-                if key in shared_secrets:
-                    return shared_secrets[key]
-
-            except (InvalidPath, Forbidden) as e:
-                logger.warning(f"Secret not found in Vault: {key}")
+                for path in (self.vault_path.replace("secret/data/", ""), "shared"):
+                    secrets = self._read_path(path)
+                    if key in secrets:
+                        return secrets[key]
             except VaultError as e:
                 logger.error(f"Vault error retrieving secret {key}: {e}")
 
-        # Fallback to environment variable
-        env_key = key.upper()
-        env_value = os.getenv(env_key)
-
-        if env_value:
-            logger.debug(f"Using environment variable for {key}")
-            return env_value
-
-        # Use default if provided
-        if default:
-            logger.debug(f"Using default value for {key}")
-            return default
-
-        logger.warning(f"Secret not found: {key}")
-        return None
+        return fallback_secret(key, default)
 
     def get_secrets(self, keys: list) -> Dict[str, Optional[str]]:
         """
-        Get multiple secrets at once.
+        Get multiple secrets at once (each path is read at most once).
 
         Args:
             keys: List of secret keys
@@ -182,6 +211,10 @@ class VaultClient:
         """
         Encrypt data using Vault's transit engine.
 
+        One Vault round trip per value; use utils.envelope_encryption for
+        high-volume payloads such as report texts, or
+        AsyncTransitClient.encrypt_many for bulk jobs.
+
         Args:
             plaintext: Data to encrypt
             key_name: Encryption key name in transit engine
@@ -212,6 +245,9 @@ class VaultClient:
         """
         Decrypt data using Vault's transit engine.
 
+        One Vault round trip per value; bulk jobs (exports, migrations)
+        should use AsyncTransitClient.decrypt_many.
+
         Args:
             ciphertext: Encrypted data
             key_name: Encryption key name in transit engine
@@ -242,6 +278,9 @@ class VaultClient:
         """
         Rotate an encryption key in Vault.
 
+        Envelopes from utils.envelope_encryption stay readable and are
+        re-wrapped lazily (see EnvelopeEncryptor.needs_rewrap).
+
         Args:
             key_name: Key to rotate
 
@@ -282,11 +321,365 @@ class VaultClient:
         return None
 
     def clear_cache(self):
-        """Clear the LRU cache for secrets."""
-        self.get_secret.cache_clear()
+        """Clear the cache for secrets."""
+        self._path_cache.clear()
         logger.info("Secret cache cleared")
 
 
+def fallback_secret(key: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Resolve a secret missing from Vault from the environment or a default.
+
+    Args:
+        key: Secret key name (environment variable is the upper-cased key)
+        default: Default value if not found
+
+    Returns:
+        Secret value or default
+    """
+    env_value = os.getenv(key.upper())
+    if env_value:
+        logger.debug(f"Using environment variable for {key}")
+        return env_value
+
+    if default:
+        logger.debug(f"Using default value for {key}")
+        return default
+
+    logger.warning(f"Secret not found: {key}")
+    return None
+
+
+class AsyncVaultClient:
+    """
+    Non-blocking Vault KV v2 cache for request paths.
+
+    - `start()` prefetches whole secret paths concurrently, then a background
+      task refreshes each path shortly before its TTL expires (jittered so
+      replicas don't refresh in lockstep)
+    - `get()` only reads memory: expired values keep being served while a
+      refresh runs (stale-while-revalidate), and failed refreshes keep the
+      last known value and retry with backoff
+    - Reports cache age, refresh latency and failures as Prometheus metrics
+      (when prometheus-client is installed)
+    """
+
+    def __init__(
+        self,
+        paths: List[str],
+        vault_addr: Optional[str] = None,
+        vault_token: Optional[str] = None,
+        cache_ttl: int = 300,
+        jitter: float = 0.1,
+        retry_interval: float = 5.0,
+        timeout: float = 5.0,
+    ):
+        """
+        Initialize async Vault client.
+
+        Args:
+            paths: KV v2 paths below the `secret` mount, in lookup order
+            vault_addr: Vault server address
+            vault_token: Authentication token
+            cache_ttl: Seconds a fetched path is considered fresh
+            jitter: Fraction of the TTL randomly taken off each refresh time
+            retry_interval: Initial delay before retrying a failed refresh
+            timeout: HTTP timeout for Vault requests
+        """
+        self.paths = list(paths)
+        self.vault_addr = (vault_addr or os.getenv("VAULT_ADDR", "http://localhost:8200")).rstrip("/")
+        self.vault_token = vault_token or os.getenv("VAULT_TOKEN")
+        self.cache_ttl = cache_ttl
+        self.jitter = jitter
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+
+        # path -> secrets, monotonic fetch time, monotonic next refresh
+        self._secrets: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at: Dict[str, float] = {}
+        self._refresh_at: Dict[str, float] = {}
+        self._failures: Dict[str, int] = {}
+        self._http: Optional[httpx.AsyncClient] = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether every path has been fetched at least once."""
+        return all(path in self._secrets for path in self.paths)
+
+    async def start(self) -> None:
+        """Prefetch every path, then keep them fresh in the background."""
+        if self._task is not None:
+            return
+        if not self.vault_token:
+            logger.warning("No Vault token configured, async secret cache disabled")
+            return
+        self._http = httpx.AsyncClient(
+            base_url=self.vault_addr,
+            headers={"X-Vault-Token": self.vault_token},
+            timeout=self.timeout,
+        )
+        await self.prefetch()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Vault secret cache started ({len(self.paths)} paths)")
+
+    async def stop(self) -> None:
+        """Stop background refreshes."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def prefetch(self) -> None:
+        """Fetch every path concurrently."""
+        await asyncio.gather(*(self.refresh(path) for path in self.paths))
+
+    async def refresh(self, path: str) -> bool:
+        """
+        Fetch one path, keeping the previous value on failure.
+
+        Args:
+            path: KV v2 path
+
+        Returns:
+            Whether the fetch succeeded
+        """
+        start = time.monotonic()
+        try:
+            secrets = await self._fetch(path)
+        except Exception as e:
+            failures = self._failures.get(path, 0) + 1
+            self._failures[path] = failures
+            backoff = min(self.retry_interval * 2 ** (failures - 1), self.cache_ttl)
+            self._refresh_at[path] = time.monotonic() + backoff
+            if vault_refresh_failures_total is not None:
+                vault_refresh_failures_total.labels(path=path).inc()
+            logger.error(f"Vault refresh of {path} failed (retry in {backoff:.0f}s): {e}")
+            return False
+        finally:
+            if vault_refresh_duration_seconds is not None:
+                vault_refresh_duration_seconds.labels(path=path).observe(time.monotonic() - start)
+
+        now = time.monotonic()
+        self._secrets[path] = secrets
+        self._fetched_at[path] = now
+        self._failures.pop(path, None)
+        self._refresh_at[path] = now + self.cache_ttl * (1 - self.jitter * random.random())
+        self._report_age()
+        return True
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        Get a secret from memory (never performs I/O).
+
+        Args:
+            key: Secret key name
+            default: Value if no cached path has the key
+
+        Returns:
+            Secret value or default
+        """
+        now = time.monotonic()
+        for path in self.paths:
+            secrets = self._secrets.get(path)
+            if secrets is None:
+                continue
+            if now - self._fetched_at[path] > self.cache_ttl and path not in self._failures:
+                # Serve stale and refresh now (failing paths keep their backoff)
+                self._refresh_at[path] = min(self._refresh_at.get(path, now), now)
+                self._wakeup.set()
+            if key in secrets:
+                return secrets[key]
+        return default
+
+    def cache_age(self, path: str) -> Optional[float]:
+        """Seconds since a path was last fetched (None if never)."""
+        fetched_at = self._fetched_at.get(path)
+        return None if fetched_at is None else time.monotonic() - fetched_at
+
+    async def _fetch(self, path: str) -> Dict[str, Any]:
+        """Read a KV v2 path over HTTP (missing or forbidden paths are empty)."""
+        response = await self._http.get(f"/v1/secret/data/{path}")
+        if response.status_code == 404:
+            return {}
+        if response.status_code == 403:
+            # A policy without read access will not change by retrying
+            logger.warning(f"Vault token may not read {path}, treating it as empty")
+            return {}
+        response.raise_for_status()
+        return response.json().get("data", {}).get("data", {})
+
+    async def _run(self) -> None:
+        """Refresh paths as they come due."""
+        while True:
+            now = time.monotonic()
+            due = [path for path in self.paths if self._refresh_at.get(path, now) <= now]
+            if due:
+                await asyncio.gather(*(self.refresh(path) for path in due))
+            self._report_age()
+
+            next_due = min(self._refresh_at.get(path, now) for path in self.paths)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=max(next_due - time.monotonic(), 1.0)
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def _report_age(self) -> None:
+        """Export the age of every cached path."""
+        if vault_secret_cache_age_seconds is None:
+            return
+        for path in self._fetched_at:
+            vault_secret_cache_age_seconds.labels(path=path).set(self.cache_age(path))
+
+
+@dataclass
+class TransitResult:
+    """Outcome of one item of a batch transit operation."""
+
+    value: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the item succeeded."""
+        return self.error is None
+
+
+class AsyncTransitClient:
+    """
+    Batch Vault transit encryption/decryption for bulk jobs.
+
+    - Items are sent as transit `batch_input` in chunks of `batch_size`
+    - Up to `concurrency` chunks are in flight at once over one pooled
+      HTTP session
+    - Results come back in input order; a failing item (or chunk) yields a
+      TransitResult with `error` set instead of failing the whole call
+    """
+
+    def __init__(
+        self,
+        vault_addr: Optional[str] = None,
+        vault_token: Optional[str] = None,
+        batch_size: int = 250,
+        concurrency: int = 4,
+        timeout: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Initialize batch transit client.
+
+        Args:
+            vault_addr: Vault server address
+            vault_token: Authentication token
+            batch_size: Items per transit request
+            concurrency: Transit requests in flight at once
+            timeout: HTTP timeout per transit request
+            transport: Custom HTTP transport (tests, benchmarks)
+        """
+        vault_addr = vault_addr or os.getenv("VAULT_ADDR", "http://localhost:8200")
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self._http = httpx.AsyncClient(
+            base_url=vault_addr.rstrip("/"),
+            headers={"X-Vault-Token": vault_token or os.getenv("VAULT_TOKEN") or ""},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            transport=transport,
+        )
+
+    async def close(self) -> None:
+        """Close the pooled HTTP session."""
+        await self._http.aclose()
+
+    async def encrypt_many(
+        self, plaintexts: Sequence[str], key_name: str = "personal-data"
+    ) -> List[TransitResult]:
+        """
+        Encrypt many values.
+
+        Args:
+            plaintexts: Values to encrypt
+            key_name: Encryption key name in transit engine
+
+        Returns:
+            Ciphertext (or error) per value, in input order
+        """
+        items = [{"plaintext": base64.b64encode(value.encode()).decode()} for value in plaintexts]
+        return await self._run(f"encrypt/{key_name}", items, self._parse_ciphertext)
+
+    async def decrypt_many(
+        self, ciphertexts: Sequence[str], key_name: str = "personal-data"
+    ) -> List[TransitResult]:
+        """
+        Decrypt many values.
+
+        Args:
+            ciphertexts: Vault ciphertexts
+            key_name: Encryption key name in transit engine
+
+        Returns:
+            Plaintext (or error) per value, in input order
+        """
+        items = [{"ciphertext": value} for value in ciphertexts]
+        return await self._run(f"decrypt/{key_name}", items, self._parse_plaintext)
+
+    async def _run(self, endpoint: str, items: List[Dict[str, str]], parse) -> List[TransitResult]:
+        """Send items in concurrent chunks and reassemble the results in order."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send(chunk: List[Dict[str, str]]) -> List[TransitResult]:
+            async with semaphore:
+                return await self._send_chunk(endpoint, chunk, parse)
+
+        chunks = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        results = await asyncio.gather(*(send(chunk) for chunk in chunks))
+        return [result for chunk_results in results for result in chunk_results]
+
+    async def _send_chunk(self, endpoint: str, chunk: List[Dict[str, str]], parse) -> List[TransitResult]:
+        """Send one batch_input request, mapping failures onto its items."""
+        try:
+            response = await self._http.post(f"/v1/transit/{endpoint}", json={"batch_input": chunk})
+            body = response.json() if response.content else {}
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error(f"Vault transit batch {endpoint} failed: {e}")
+            return [TransitResult(error=str(e)) for _ in chunk]
+
+        # Vault answers 400 with per-item results when some items fail
+        batch_results = (body.get("data") or {}).get("batch_results")
+        if not isinstance(batch_results, list) or len(batch_results) != len(chunk):
+            error = "; ".join(body.get("errors") or []) or f"HTTP {response.status_code}"
+            logger.error(f"Vault transit batch {endpoint} failed: {error}")
+            return [TransitResult(error=error) for _ in chunk]
+
+        return [
+            TransitResult(error=item["error"]) if item.get("error") else parse(item)
+            for item in batch_results
+        ]
+
+    @staticmethod
+    def _parse_ciphertext(item: Dict[str, Any]) -> TransitResult:
+        """Result of an encrypted item."""
+        return TransitResult(value=item.get("ciphertext"))
+
+    @staticmethod
+    def _parse_plaintext(item: Dict[str, Any]) -> TransitResult:
+        """Result of a decrypted item (base64 decoded)."""
+        try:
+            return TransitResult(value=base64.b64decode(item.get("plaintext", "")).decode())
+        except ValueError as e:
+            return TransitResult(error=f"Invalid plaintext: {e}")
+
+
 class SecureConfig:
     """
     Secure configuration manager using Vault.
@@ -302,9 +695,27 @@ class SecureConfig:
         """
         self.service_name = service_name
         self.vault = VaultClient(vault_path=f"secret/data/{service_name}")
+        self.cache = AsyncVaultClient(
+            paths=[service_name, "shared"],
+            vault_addr=self.vault.vault_addr,
+            vault_token=self.vault.vault_token,
+            cache_ttl=self.vault.cache_ttl,
+        )
+
+    async def start(self) -> None:
+        """Prefetch secrets so request-time lookups never wait on Vault."""
+        if self.vault.client:
+            await self.cache.start()
+
+    async def stop(self) -> None:
+        """Stop background secret refreshes."""
+        await self.cache.stop()
 
     def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
-        """Get configuration value."""
+        """Get configuration value (from the prefetched cache once started)."""
+        if self.cache.is_loaded:
+            value = self.cache.get(key)
+            return value if value is not None else fallback_secret(key, default)
         return self.vault.get_secret(key, default)
 
     def get_required(self, key: str) -> str:
@@ -312,14 +723,14 @@ class SecureConfig:
         Get required configuration value.
         Raises exception if not found.
         """
-        value = self.vault.get_secret(key)
+        value = self.get(key)
         if value is None:
             raise ValueError(f"Required configuration missing: {key}")
         return value
 
     def get_int(self, key: str, default: int = 0) -> int:
         """Get integer configuration value."""
-        value = self.vault.get_secret(key, str(default))
+        value = self.get(key, str(default))
         try:
             return int(value)
         except (ValueError, TypeError):
@@ -327,7 +738,7 @@ class SecureConfig:
 
     def get_bool(self, key: str, default: bool = False) -> bool:
         """Get boolean configuration value."""
-        value = self.vault.get_secret(key, str(default))
+        value = self.get(key, str(default))
         if isinstance(value, bool):
             return value
         return value.lower() in ("true", "1", "yes", "on")